@@ -0,0 +1,50 @@
+"""Add indexes for admin user list queries
+
+Revision ID: 20260129_add_admin_query_indexes
+Revises: 20260126_add_school_trends
+Create Date: 2026-01-29
+
+관리자 사용자 목록 조회/검색용 인덱스 추가
+- users(created_at DESC, id DESC): 최신순 정렬 + 페이징
+- users.email / users.nickname pg_trgm GIN: ILIKE '%검색어%' 부분 일치 검색
+
+feedbacks/analysis_results/analysis_extensions/exams(user_id),
+pattern_match_history(analysis_id), question_references(source_analysis_id)
+인덱스는 각 테이블 생성 마이그레이션에서 이미 만들어져 있으므로 추가하지 않음.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260129_add_admin_query_indexes"
+down_revision = "20260126_add_school_trends"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create admin query indexes without locking the users table."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY는 트랜잭션 밖에서만 실행 가능
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_created_at_id "
+            "ON users (created_at DESC, id DESC)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_trgm "
+            "ON users USING gin (email gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_nickname_trgm "
+            "ON users USING gin (nickname gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Drop admin query indexes."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_nickname_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_created_at_id")
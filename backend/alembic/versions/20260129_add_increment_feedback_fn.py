@@ -0,0 +1,77 @@
+"""Add increment_feedback_count function
+
+Revision ID: 20260129_add_increment_feedback_fn
+Revises: 20260129_add_admin_query_indexes
+Create Date: 2026-01-29
+
+피드백 제출 시 users.feedback_count 증가, 배지 임계값 확인, badges 추가를
+DB 함수 한 번으로 처리 (BadgeService.increment_feedback_count에서 RPC로 호출)
+- 사용자 행을 FOR UPDATE로 잠근 뒤 갱신하므로 동시 제출 시에도 배지 중복/유실 없음
+- 임계값 목록은 파이썬 배지 정의에서 [[임계값, 배지 ID], ...] 형태로 전달
+- 새로 획득한 배지 ID(없으면 NULL) 반환
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260129_add_increment_feedback_fn"
+down_revision = "20260129_add_admin_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create increment_feedback_count function."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION increment_feedback_count(
+            p_user_id varchar,
+            p_thresholds jsonb
+        )
+        RETURNS text
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_count integer;
+            v_badges jsonb;
+            v_badge text;
+        BEGIN
+            SELECT u.feedback_count + 1, u.badges
+            INTO v_count, v_badges
+            FROM users u
+            WHERE u.id = p_user_id
+            FOR UPDATE;
+
+            IF NOT FOUND THEN
+                RETURN NULL;
+            END IF;
+
+            -- 도달한 임계값 중 아직 없는 가장 높은 배지 1개
+            SELECT t->>1 INTO v_badge
+            FROM jsonb_array_elements(p_thresholds) t
+            WHERE v_count >= (t->>0)::integer
+              AND NOT v_badges @> jsonb_build_array(jsonb_build_object('id', t->>1))
+            ORDER BY (t->>0)::integer DESC
+            LIMIT 1;
+
+            UPDATE users
+            SET feedback_count = v_count,
+                badges = CASE
+                    WHEN v_badge IS NULL THEN badges
+                    ELSE badges || jsonb_build_array(jsonb_build_object(
+                        'id', v_badge,
+                        'earned_at', to_char(now() AT TIME ZONE 'utc', 'YYYY-MM-DD"T"HH24:MI:SS.US')
+                    ))
+                END
+            WHERE id = p_user_id;
+
+            RETURN v_badge;
+        END;
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop increment_feedback_count function."""
+    op.execute("DROP FUNCTION IF EXISTS increment_feedback_count(varchar, jsonb)")
@@ -0,0 +1,183 @@
+"""Denormalize exam_type onto analysis_results
+
+Revision ID: 20260130_add_analysis_exam_type
+Revises: 20260130_add_authorize_extended_fn
+Create Date: 2026-01-30
+
+analysis_results.exam_type 컬럼 추가 (exams.exam_type 복사본)
+- 분석 조회만으로 빈 시험지 여부를 판단하여 시험지 재조회 왕복 제거
+- 기존 행 백필
+- INSERT 시 시험지에서 자동 채움, 시험지 유형 변경 시 트리거로 동기화
+- fn_authorize_extended가 exams 조인 없이 컬럼을 직접 읽도록 재정의
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260130_add_analysis_exam_type"
+down_revision = "20260130_add_authorize_extended_fn"
+branch_labels = None
+depends_on = None
+
+
+# fn_authorize_extended 본문 (분석/시험지 유형 조회 부분만 버전별로 다름)
+_AUTHORIZE_EXTENDED_SQL = """
+CREATE OR REPLACE FUNCTION fn_authorize_extended(
+    p_analysis_id varchar,
+    p_user_id varchar,
+    p_cost integer DEFAULT 2
+)
+RETURNS TABLE (
+    code text,
+    exam_id varchar,
+    exam_type varchar,
+    credits_before integer,
+    credits_remaining integer,
+    is_superuser boolean
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_exam_id varchar;
+    v_exam_type varchar;
+    v_credits integer;
+BEGIN
+    {lookup}
+
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT 'not_found'::text, NULL::varchar, NULL::varchar,
+            NULL::integer, NULL::integer, NULL::boolean;
+        RETURN;
+    END IF;
+
+    IF v_exam_type = 'blank' THEN
+        RETURN QUERY SELECT 'blank_exam'::text, v_exam_id, v_exam_type,
+            NULL::integer, NULL::integer, NULL::boolean;
+        RETURN;
+    END IF;
+
+    -- MASTER는 무제한 (카운터만 증가)
+    UPDATE users u
+    SET monthly_extended_count = u.monthly_extended_count + 1,
+        updated_at = NOW()
+    WHERE u.id = p_user_id AND u.is_superuser
+    RETURNING u.credits INTO v_credits;
+
+    IF FOUND THEN
+        RETURN QUERY SELECT 'ok'::text, v_exam_id, v_exam_type,
+            v_credits, v_credits, true;
+        RETURN;
+    END IF;
+
+    -- 일반 사용자: 잔액이 충분할 때만 차감
+    UPDATE users u
+    SET credits = u.credits - p_cost,
+        monthly_extended_count = u.monthly_extended_count + 1,
+        updated_at = NOW()
+    WHERE u.id = p_user_id AND u.credits >= p_cost
+    RETURNING u.credits INTO v_credits;
+
+    IF NOT FOUND THEN
+        SELECT u.credits INTO v_credits FROM users u WHERE u.id = p_user_id;
+        RETURN QUERY SELECT 'insufficient_credits'::text, v_exam_id, v_exam_type,
+            v_credits, v_credits, false;
+        RETURN;
+    END IF;
+
+    RETURN QUERY SELECT 'ok'::text, v_exam_id, v_exam_type,
+        v_credits + p_cost, v_credits, false;
+END;
+$$
+"""
+
+_LOOKUP_DENORMALIZED = """SELECT a.exam_id, a.exam_type
+    INTO v_exam_id, v_exam_type
+    FROM analysis_results a
+    WHERE a.id = p_analysis_id AND a.user_id = p_user_id;"""
+
+_LOOKUP_JOINED = """SELECT a.exam_id, e.exam_type
+    INTO v_exam_id, v_exam_type
+    FROM analysis_results a
+    LEFT JOIN exams e ON e.id = a.exam_id
+    WHERE a.id = p_analysis_id AND a.user_id = p_user_id;"""
+
+
+def upgrade() -> None:
+    """Add analysis_results.exam_type with sync triggers."""
+    op.add_column(
+        "analysis_results",
+        sa.Column("exam_type", sa.String(20), nullable=True),
+    )
+
+    # 기존 행 백필
+    op.execute(
+        """
+        UPDATE analysis_results a
+        SET exam_type = e.exam_type
+        FROM exams e
+        WHERE a.exam_id = e.id
+        """
+    )
+
+    # INSERT 시 시험지 유형 자동 채움
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION analysis_results_fill_exam_type()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF NEW.exam_type IS NULL THEN
+                SELECT e.exam_type INTO NEW.exam_type FROM exams e WHERE e.id = NEW.exam_id;
+            END IF;
+            RETURN NEW;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_analysis_results_fill_exam_type
+        BEFORE INSERT ON analysis_results
+        FOR EACH ROW EXECUTE FUNCTION analysis_results_fill_exam_type()
+        """
+    )
+
+    # 시험지 유형 변경 시 분석 결과에 반영
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION exams_sync_analysis_exam_type()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            UPDATE analysis_results SET exam_type = NEW.exam_type WHERE exam_id = NEW.id;
+            RETURN NEW;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_exams_sync_analysis_exam_type
+        AFTER UPDATE OF exam_type ON exams
+        FOR EACH ROW
+        WHEN (OLD.exam_type IS DISTINCT FROM NEW.exam_type)
+        EXECUTE FUNCTION exams_sync_analysis_exam_type()
+        """
+    )
+
+    op.execute(_AUTHORIZE_EXTENDED_SQL.replace("{lookup}", _LOOKUP_DENORMALIZED))
+
+
+def downgrade() -> None:
+    """Drop analysis_results.exam_type and sync triggers."""
+    op.execute(_AUTHORIZE_EXTENDED_SQL.replace("{lookup}", _LOOKUP_JOINED))
+
+    op.execute("DROP TRIGGER IF EXISTS trg_exams_sync_analysis_exam_type ON exams")
+    op.execute("DROP FUNCTION IF EXISTS exams_sync_analysis_exam_type()")
+    op.execute("DROP TRIGGER IF EXISTS trg_analysis_results_fill_exam_type ON analysis_results")
+    op.execute("DROP FUNCTION IF EXISTS analysis_results_fill_exam_type()")
+
+    op.drop_column("analysis_results", "exam_type")
@@ -0,0 +1,104 @@
+"""Add fn_authorize_extended function
+
+Revision ID: 20260130_add_authorize_extended_fn
+Revises: 20260129_add_increment_feedback_fn
+Create Date: 2026-01-30
+
+확장 분석 생성 전 단계(분석 소유권 확인 → 시험지 유형 확인 → 크레딧 차감)를
+하나의 함수로 묶어 한 번의 RPC로 처리
+- 소유권/유형 확인과 차감이 같은 트랜잭션에서 수행되어 중복 차감 경쟁 조건 제거
+- 크레딧 차감은 조건부 UPDATE ... RETURNING으로 원자적으로 수행
+- code: ok / not_found / blank_exam / insufficient_credits
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260130_add_authorize_extended_fn"
+down_revision = "20260129_add_increment_feedback_fn"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create fn_authorize_extended function."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION fn_authorize_extended(
+            p_analysis_id varchar,
+            p_user_id varchar,
+            p_cost integer DEFAULT 2
+        )
+        RETURNS TABLE (
+            code text,
+            exam_id varchar,
+            exam_type varchar,
+            credits_before integer,
+            credits_remaining integer,
+            is_superuser boolean
+        )
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_exam_id varchar;
+            v_exam_type varchar;
+            v_credits integer;
+            v_superuser boolean;
+        BEGIN
+            SELECT a.exam_id, e.exam_type
+            INTO v_exam_id, v_exam_type
+            FROM analysis_results a
+            LEFT JOIN exams e ON e.id = a.exam_id
+            WHERE a.id = p_analysis_id AND a.user_id = p_user_id;
+
+            IF NOT FOUND THEN
+                RETURN QUERY SELECT 'not_found'::text, NULL::varchar, NULL::varchar,
+                    NULL::integer, NULL::integer, NULL::boolean;
+                RETURN;
+            END IF;
+
+            IF v_exam_type = 'blank' THEN
+                RETURN QUERY SELECT 'blank_exam'::text, v_exam_id, v_exam_type,
+                    NULL::integer, NULL::integer, NULL::boolean;
+                RETURN;
+            END IF;
+
+            -- MASTER는 무제한 (카운터만 증가)
+            UPDATE users u
+            SET monthly_extended_count = u.monthly_extended_count + 1,
+                updated_at = NOW()
+            WHERE u.id = p_user_id AND u.is_superuser
+            RETURNING u.credits INTO v_credits;
+
+            IF FOUND THEN
+                RETURN QUERY SELECT 'ok'::text, v_exam_id, v_exam_type,
+                    v_credits, v_credits, true;
+                RETURN;
+            END IF;
+
+            -- 일반 사용자: 잔액이 충분할 때만 차감
+            UPDATE users u
+            SET credits = u.credits - p_cost,
+                monthly_extended_count = u.monthly_extended_count + 1,
+                updated_at = NOW()
+            WHERE u.id = p_user_id AND u.credits >= p_cost
+            RETURNING u.credits INTO v_credits;
+
+            IF NOT FOUND THEN
+                SELECT u.credits INTO v_credits FROM users u WHERE u.id = p_user_id;
+                RETURN QUERY SELECT 'insufficient_credits'::text, v_exam_id, v_exam_type,
+                    v_credits, v_credits, false;
+                RETURN;
+            END IF;
+
+            RETURN QUERY SELECT 'ok'::text, v_exam_id, v_exam_type,
+                v_credits + p_cost, v_credits, false;
+        END;
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop fn_authorize_extended function."""
+    op.execute("DROP FUNCTION IF EXISTS fn_authorize_extended(varchar, varchar, integer)")
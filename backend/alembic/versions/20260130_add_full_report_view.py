@@ -0,0 +1,37 @@
+"""Add v_full_report view
+
+Revision ID: 20260130_add_full_report_view
+Revises: 20260130_add_analysis_exam_type
+Create Date: 2026-01-30
+
+통합 보고서 조회용 뷰 (analysis_results LEFT JOIN analysis_extensions)
+- 확장 분석을 extension(JSONB) 컬럼 하나로 제공하여 1회 조회로 보고서 구성
+- 조인 키는 기존 PK(analysis_results.id) / UNIQUE(analysis_extensions.analysis_id) 인덱스 사용
+- analysis_results에 컬럼 추가 시 a.* 확장을 위해 뷰를 DROP 후 다시 생성해야 함
+  (CREATE OR REPLACE는 extension 컬럼 위치 변경을 허용하지 않음)
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260130_add_full_report_view"
+down_revision = "20260130_add_analysis_exam_type"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create v_full_report view."""
+    op.execute(
+        """
+        CREATE OR REPLACE VIEW v_full_report AS
+        SELECT a.*, to_jsonb(e.*) AS extension
+        FROM analysis_results a
+        LEFT JOIN analysis_extensions e ON e.analysis_id = a.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop v_full_report view."""
+    op.execute("DROP VIEW IF EXISTS v_full_report")
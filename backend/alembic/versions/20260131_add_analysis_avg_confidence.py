@@ -0,0 +1,61 @@
+"""Add avg_confidence to analysis_results
+
+Revision ID: 20260131_add_analysis_avg_confidence
+Revises: 20260131_add_consume_analysis_fn
+Create Date: 2026-01-31
+
+문항 분석 신뢰도 평균을 저장 시점에 계산하여 보관
+- 재분석 요청 시 문항 JSON 전체 대신 스칼라 컬럼만 조회
+- 기존 행은 questions JSON에서 백필
+- v_full_report 재생성 (a.* 컬럼 목록 갱신, extension 컬럼 위치가 바뀌므로 DROP 후 생성)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260131_add_analysis_avg_confidence"
+down_revision = "20260131_add_consume_analysis_fn"
+branch_labels = None
+depends_on = None
+
+
+_FULL_REPORT_VIEW_SQL = """
+CREATE OR REPLACE VIEW v_full_report AS
+SELECT a.*, to_jsonb(e.*) AS extension
+FROM analysis_results a
+LEFT JOIN analysis_extensions e ON e.analysis_id = a.id
+"""
+
+
+def upgrade() -> None:
+    """Add avg_confidence column and backfill from questions."""
+    # 뷰가 a.* 컬럼 순서를 고정하므로 컬럼 추가 전에 제거 (upgrade 끝에서 재생성)
+    op.execute("DROP VIEW IF EXISTS v_full_report")
+    op.add_column("analysis_results", sa.Column("avg_confidence", sa.Float(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE analysis_results a
+        SET avg_confidence = s.avg_confidence
+        FROM (
+            SELECT
+                r.id,
+                AVG((q->>'confidence')::float)
+                    FILTER (WHERE jsonb_typeof(q->'confidence') = 'number') AS avg_confidence
+            FROM analysis_results r
+            CROSS JOIN LATERAL jsonb_array_elements(r.questions::jsonb) q
+            GROUP BY r.id
+        ) s
+        WHERE a.id = s.id
+        """
+    )
+
+    op.execute(_FULL_REPORT_VIEW_SQL)
+
+
+def downgrade() -> None:
+    """Drop avg_confidence column."""
+    op.execute("DROP VIEW IF EXISTS v_full_report")
+    op.drop_column("analysis_results", "avg_confidence")
+    op.execute(_FULL_REPORT_VIEW_SQL)
@@ -0,0 +1,35 @@
+"""Add covering index for analysis ownership lookups
+
+Revision ID: 20260131_add_analysis_owner_index
+Revises: 20260131_add_analysis_avg_confidence
+Create Date: 2026-01-31
+
+소유권 확인 조회(id → user_id, exam_id, exam_type)용 커버링 인덱스
+- get_auth_context의 프로젝션 조회를 index-only scan으로 처리 (questions/summary 힙 읽기 제거)
+- 운영 중 테이블 잠금 방지를 위해 CONCURRENTLY로 생성 (트랜잭션 밖에서 실행)
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260131_add_analysis_owner_index"
+down_revision = "20260131_add_analysis_avg_confidence"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create ix_analysis_results_owner covering index."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_analysis_results_owner
+            ON analysis_results (id) INCLUDE (user_id, exam_id, exam_type)
+            """
+        )
+
+
+def downgrade() -> None:
+    """Drop ix_analysis_results_owner covering index."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_analysis_results_owner")
@@ -0,0 +1,70 @@
+"""Add current_score/total_score to analysis_results
+
+Revision ID: 20260131_add_analysis_score_totals
+Revises: 20260130_add_full_report_view
+Create Date: 2026-01-31
+
+문항별 점수 합계를 저장 시점에 미리 계산하여 보관
+- current_score: earned_points 합계 / total_score: 양수 points 합계
+- 점수대별 학습 계획, 시험 대비 전략 요청 시 문항 전체 순회 제거
+- 기존 행은 questions JSON에서 백필
+- v_full_report는 a.*가 생성 시점에 고정되므로 새 컬럼 포함하도록 재생성
+  (새 컬럼이 extension 앞에 끼어 CREATE OR REPLACE가 거부되므로 DROP 후 생성)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260131_add_analysis_score_totals"
+down_revision = "20260130_add_full_report_view"
+branch_labels = None
+depends_on = None
+
+
+_FULL_REPORT_VIEW_SQL = """
+CREATE OR REPLACE VIEW v_full_report AS
+SELECT a.*, to_jsonb(e.*) AS extension
+FROM analysis_results a
+LEFT JOIN analysis_extensions e ON e.analysis_id = a.id
+"""
+
+
+def upgrade() -> None:
+    """Add score total columns and backfill from questions."""
+    # 뷰가 a.* 컬럼 순서를 고정하므로 컬럼 추가 전에 제거 (upgrade 끝에서 재생성)
+    op.execute("DROP VIEW IF EXISTS v_full_report")
+    op.add_column("analysis_results", sa.Column("current_score", sa.Float(), nullable=True))
+    op.add_column("analysis_results", sa.Column("total_score", sa.Float(), nullable=True))
+
+    op.execute(
+        """
+        UPDATE analysis_results a
+        SET current_score = COALESCE(s.current_score, 0),
+            total_score = COALESCE(s.total_score, 0)
+        FROM (
+            SELECT
+                r.id,
+                SUM((q->>'earned_points')::float)
+                    FILTER (WHERE jsonb_typeof(q->'earned_points') = 'number') AS current_score,
+                SUM((q->>'points')::float)
+                    FILTER (WHERE jsonb_typeof(q->'points') = 'number'
+                            AND (q->>'points')::float > 0) AS total_score
+            FROM analysis_results r
+            LEFT JOIN LATERAL jsonb_array_elements(r.questions::jsonb) q ON true
+            GROUP BY r.id
+        ) s
+        WHERE a.id = s.id
+        """
+    )
+
+    op.execute(_FULL_REPORT_VIEW_SQL)
+
+
+def downgrade() -> None:
+    """Drop score total columns."""
+    # 뷰가 컬럼에 의존하므로 먼저 제거 후 컬럼 삭제, 이전 컬럼 목록으로 재생성
+    op.execute("DROP VIEW IF EXISTS v_full_report")
+    op.drop_column("analysis_results", "total_score")
+    op.drop_column("analysis_results", "current_score")
+    op.execute(_FULL_REPORT_VIEW_SQL)
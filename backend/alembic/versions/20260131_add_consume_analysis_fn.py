@@ -0,0 +1,76 @@
+"""Add fn_consume_analysis function
+
+Revision ID: 20260131_add_consume_analysis_fn
+Revises: 20260131_add_analysis_score_totals
+Create Date: 2026-01-31
+
+분석 크레딧 확인/차감을 하나의 함수로 묶어 한 번의 RPC로 처리
+- 잔액 조회 후 차감(check-then-consume) 사이의 동시 요청 중복 차감 제거
+- 크레딧 차감은 조건부 UPDATE ... RETURNING으로 원자적으로 수행
+- MASTER는 차감 없이 사용 횟수만 증가
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260131_add_consume_analysis_fn"
+down_revision = "20260131_add_analysis_score_totals"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create fn_consume_analysis function."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION fn_consume_analysis(
+            p_user_id varchar,
+            p_cost integer DEFAULT 1
+        )
+        RETURNS TABLE (
+            success boolean,
+            credits_before integer,
+            credits_remaining integer,
+            is_superuser boolean
+        )
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_credits integer;
+        BEGIN
+            -- MASTER는 무제한 (카운터만 증가)
+            UPDATE users u
+            SET monthly_analysis_count = u.monthly_analysis_count + 1,
+                updated_at = NOW()
+            WHERE u.id = p_user_id AND u.is_superuser
+            RETURNING u.credits INTO v_credits;
+
+            IF FOUND THEN
+                RETURN QUERY SELECT true, v_credits, v_credits, true;
+                RETURN;
+            END IF;
+
+            -- 일반 사용자: 잔액이 충분할 때만 차감
+            UPDATE users u
+            SET credits = u.credits - p_cost,
+                monthly_analysis_count = u.monthly_analysis_count + 1,
+                updated_at = NOW()
+            WHERE u.id = p_user_id AND u.credits >= p_cost
+            RETURNING u.credits INTO v_credits;
+
+            IF NOT FOUND THEN
+                SELECT u.credits INTO v_credits FROM users u WHERE u.id = p_user_id;
+                RETURN QUERY SELECT false, v_credits, v_credits, false;
+                RETURN;
+            END IF;
+
+            RETURN QUERY SELECT true, v_credits + p_cost, v_credits, false;
+        END;
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop fn_consume_analysis function."""
+    op.execute("DROP FUNCTION IF EXISTS fn_consume_analysis(varchar, integer)")
@@ -0,0 +1,102 @@
+"""Add fn_patch_answers function
+
+Revision ID: 20260131_add_patch_answers_fn
+Revises: 20260131_add_analysis_owner_index
+Create Date: 2026-01-31
+
+정오답 수동 수정을 DB에서 처리하는 함수 추가
+- 수정 대상 문항의 is_correct/earned_points만 변경 (문항 배열 전체 왕복 제거)
+- 소유권 확인, 문항 수정, 점수 합계(current_score/total_score) 갱신을 한 트랜잭션에서 수행
+- code: ok / not_found / forbidden
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260131_add_patch_answers_fn"
+down_revision = "20260131_add_analysis_owner_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create fn_patch_answers function."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION fn_patch_answers(
+            p_analysis_id varchar,
+            p_user_id varchar,
+            p_updates jsonb
+        )
+        RETURNS TABLE (code text, updated_count integer)
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_owner varchar;
+            v_questions jsonb;
+            v_count integer;
+        BEGIN
+            SELECT a.user_id, a.questions::jsonb
+            INTO v_owner, v_questions
+            FROM analysis_results a
+            WHERE a.id = p_analysis_id
+            FOR UPDATE;
+
+            IF NOT FOUND THEN
+                RETURN QUERY SELECT 'not_found'::text, 0;
+                RETURN;
+            END IF;
+
+            IF v_owner <> p_user_id THEN
+                RETURN QUERY SELECT 'forbidden'::text, 0;
+                RETURN;
+            END IF;
+
+            SELECT count(*) INTO v_count
+            FROM jsonb_array_elements(v_questions) q
+            WHERE p_updates ? (q->>'id');
+
+            IF v_count > 0 THEN
+                -- is_correct가 true이면 만점, false이면 0점, null이면 미채점
+                SELECT jsonb_agg(
+                    CASE WHEN p_updates ? (t.q->>'id') THEN
+                        t.q || jsonb_build_object(
+                            'is_correct', p_updates->(t.q->>'id'),
+                            'earned_points', CASE p_updates->>(t.q->>'id')
+                                WHEN 'true' THEN COALESCE(t.q->'points', '0'::jsonb)
+                                WHEN 'false' THEN '0.0'::jsonb
+                                ELSE 'null'::jsonb
+                            END
+                        )
+                    ELSE t.q END
+                    ORDER BY t.ord
+                )
+                INTO v_questions
+                FROM jsonb_array_elements(v_questions) WITH ORDINALITY AS t(q, ord);
+
+                UPDATE analysis_results a
+                SET questions = v_questions::json,
+                    current_score = s.current_score,
+                    total_score = s.total_score
+                FROM (
+                    SELECT
+                        COALESCE(SUM((q->>'earned_points')::float)
+                            FILTER (WHERE jsonb_typeof(q->'earned_points') = 'number'), 0) AS current_score,
+                        COALESCE(SUM((q->>'points')::float)
+                            FILTER (WHERE jsonb_typeof(q->'points') = 'number'
+                                    AND (q->>'points')::float > 0), 0) AS total_score
+                    FROM jsonb_array_elements(v_questions) q
+                ) s
+                WHERE a.id = p_analysis_id;
+            END IF;
+
+            RETURN QUERY SELECT 'ok'::text, v_count;
+        END;
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop fn_patch_answers function."""
+    op.execute("DROP FUNCTION IF EXISTS fn_patch_answers(varchar, varchar, jsonb)")
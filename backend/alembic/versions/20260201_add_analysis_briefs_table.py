@@ -0,0 +1,172 @@
+"""Materialize analysis briefs into analysis_briefs table
+
+Revision ID: 20260201_add_analysis_briefs_table
+Revises: 20260201_add_list_exams_fn
+Create Date: 2026-02-01
+
+분석 요약을 분석 저장 시점에 한 번 계산하여 보관
+- analysis_briefs: 분석 1건당 1행 (v_analysis_briefs와 같은 컬럼)
+- analysis_results INSERT / 문항 변경 시 트리거로 UPSERT (분석 삭제 시 CASCADE)
+- 트리거 내부 오류는 WARNING으로만 남기고 원래 쓰기는 그대로 진행
+- 기존 행 백필
+- fn_list_exams가 뷰 대신 테이블을 읽도록 재정의 (목록 조회 시 문항 JSON 집계 제거)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260201_add_analysis_briefs_table"
+down_revision = "20260201_add_list_exams_fn"
+branch_labels = None
+depends_on = None
+
+
+_BRIEF_COLUMNS = (
+    "analysis_id, exam_id, user_id, total_questions, total_points, avg_confidence, "
+    "essay_points, non_essay_points, difficulty_concept, difficulty_pattern, "
+    "difficulty_reasoning, difficulty_creative, difficulty_high, difficulty_medium, "
+    "difficulty_low, format_essay"
+)
+
+# fn_list_exams 본문 (분석 요약을 읽는 대상만 버전별로 다름)
+_LIST_EXAMS_SQL = """
+CREATE OR REPLACE FUNCTION fn_list_exams(
+    p_user_id varchar,
+    p_status varchar DEFAULT NULL,
+    p_limit integer DEFAULT 20,
+    p_offset integer DEFAULT 0
+)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'total', (
+            SELECT count(*)
+            FROM exams e
+            WHERE e.user_id = p_user_id
+              AND (p_status IS NULL OR e.status = p_status)
+        ),
+        'items', COALESCE((
+            SELECT jsonb_agg(
+                to_jsonb(page.*) || jsonb_build_object('analysis_brief', to_jsonb(b.*))
+                ORDER BY page.created_at DESC
+            )
+            FROM (
+                SELECT e.*
+                FROM exams e
+                WHERE e.user_id = p_user_id
+                  AND (p_status IS NULL OR e.status = p_status)
+                ORDER BY e.created_at DESC
+                LIMIT p_limit OFFSET p_offset
+            ) page
+            LEFT JOIN LATERAL (
+                SELECT v.*
+                FROM {brief_source} v
+                JOIN analysis_results a ON a.id = v.analysis_id
+                WHERE page.status = 'completed'
+                  AND v.exam_id = page.id
+                  AND v.user_id = p_user_id
+                ORDER BY a.analyzed_at DESC, a.id DESC
+                LIMIT 1
+            ) b ON true
+        ), '[]'::jsonb)
+    )
+$$
+"""
+
+
+def upgrade() -> None:
+    """Create analysis_briefs table with refresh trigger."""
+    op.create_table(
+        "analysis_briefs",
+        sa.Column(
+            "analysis_id",
+            sa.String(36),
+            sa.ForeignKey("analysis_results.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("exam_id", sa.String(36), nullable=True),
+        sa.Column("user_id", sa.String(36), nullable=False),
+        sa.Column("total_questions", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("total_points", sa.Numeric(), nullable=False, server_default="0"),
+        sa.Column("avg_confidence", sa.Numeric(), nullable=True),
+        sa.Column("essay_points", sa.Numeric(), nullable=False, server_default="0"),
+        sa.Column("non_essay_points", sa.Numeric(), nullable=False, server_default="0"),
+        sa.Column("difficulty_concept", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("difficulty_pattern", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("difficulty_reasoning", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("difficulty_creative", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("difficulty_high", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("difficulty_medium", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("difficulty_low", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("format_essay", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.create_index("ix_analysis_briefs_exam_id", "analysis_briefs", ["exam_id"])
+
+    # 분석 저장/문항 변경 시 요약 갱신
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION analysis_results_refresh_brief()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO analysis_briefs ({_BRIEF_COLUMNS})
+            SELECT {_BRIEF_COLUMNS}
+            FROM v_analysis_briefs
+            WHERE analysis_id = NEW.id
+            ON CONFLICT (analysis_id) DO UPDATE SET
+                exam_id = EXCLUDED.exam_id,
+                user_id = EXCLUDED.user_id,
+                total_questions = EXCLUDED.total_questions,
+                total_points = EXCLUDED.total_points,
+                avg_confidence = EXCLUDED.avg_confidence,
+                essay_points = EXCLUDED.essay_points,
+                non_essay_points = EXCLUDED.non_essay_points,
+                difficulty_concept = EXCLUDED.difficulty_concept,
+                difficulty_pattern = EXCLUDED.difficulty_pattern,
+                difficulty_reasoning = EXCLUDED.difficulty_reasoning,
+                difficulty_creative = EXCLUDED.difficulty_creative,
+                difficulty_high = EXCLUDED.difficulty_high,
+                difficulty_medium = EXCLUDED.difficulty_medium,
+                difficulty_low = EXCLUDED.difficulty_low,
+                format_essay = EXCLUDED.format_essay;
+            RETURN NULL;
+        EXCEPTION WHEN OTHERS THEN
+            -- 요약 갱신 실패가 분석 저장/정오답 수정을 중단시키지 않도록 경고만 남김
+            RAISE WARNING 'analysis_briefs refresh failed for %: %', NEW.id, SQLERRM;
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_analysis_results_refresh_brief
+        AFTER INSERT OR UPDATE OF questions, exam_id, user_id ON analysis_results
+        FOR EACH ROW EXECUTE FUNCTION analysis_results_refresh_brief()
+        """
+    )
+
+    # 기존 행 백필
+    op.execute(
+        f"""
+        INSERT INTO analysis_briefs ({_BRIEF_COLUMNS})
+        SELECT {_BRIEF_COLUMNS} FROM v_analysis_briefs
+        """
+    )
+
+    op.execute(_LIST_EXAMS_SQL.replace("{brief_source}", "analysis_briefs"))
+
+
+def downgrade() -> None:
+    """Drop analysis_briefs table and refresh trigger."""
+    op.execute(_LIST_EXAMS_SQL.replace("{brief_source}", "v_analysis_briefs"))
+
+    op.execute("DROP TRIGGER IF EXISTS trg_analysis_results_refresh_brief ON analysis_results")
+    op.execute("DROP FUNCTION IF EXISTS analysis_results_refresh_brief()")
+
+    op.drop_index("ix_analysis_briefs_exam_id", table_name="analysis_briefs")
+    op.drop_table("analysis_briefs")
@@ -0,0 +1,63 @@
+"""Add v_analysis_briefs view
+
+Revision ID: 20260201_add_analysis_briefs_view
+Revises: 20260131_add_patch_answers_fn
+Create Date: 2026-02-01
+
+시험지 목록용 분석 요약 집계 뷰 추가
+- 문항 JSON 배열을 DB에서 jsonb_array_elements로 펼쳐 분석 1건당 1행으로 집계
+- 목록 조회 시 questions 배열 전체 전송/파이썬 순회 제거 (집계 값만 전송)
+- exam_id는 GROUP BY 컬럼이므로 exam_id 조건이 집계 전에 적용됨
+- points/confidence는 숫자(jsonb_typeof = 'number')인 문항만 집계 (예: "3점" 문자열이 있어도 조회 실패 없음)
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260201_add_analysis_briefs_view"
+down_revision = "20260131_add_patch_answers_fn"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create v_analysis_briefs view."""
+    op.execute(
+        """
+        CREATE OR REPLACE VIEW v_analysis_briefs AS
+        SELECT
+            a.id AS analysis_id,
+            a.exam_id,
+            a.user_id,
+            count(q.value) AS total_questions,
+            COALESCE(sum((q.value->>'points')::numeric)
+                FILTER (WHERE jsonb_typeof(q.value->'points') = 'number'), 0) AS total_points,
+            avg((q.value->>'confidence')::numeric)
+                FILTER (WHERE jsonb_typeof(q.value->'confidence') = 'number') AS avg_confidence,
+            COALESCE(sum((q.value->>'points')::numeric)
+                FILTER (WHERE jsonb_typeof(q.value->'points') = 'number'
+                        AND q.value->>'question_format' = 'essay'), 0) AS essay_points,
+            COALESCE(sum((q.value->>'points')::numeric)
+                FILTER (WHERE jsonb_typeof(q.value->'points') = 'number'
+                        AND q.value->>'question_format' IS DISTINCT FROM 'essay'), 0) AS non_essay_points,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'concept') AS difficulty_concept,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'pattern') AS difficulty_pattern,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'reasoning') AS difficulty_reasoning,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'creative') AS difficulty_creative,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'high') AS difficulty_high,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'medium') AS difficulty_medium,
+            count(*) FILTER (WHERE q.value->>'difficulty' = 'low') AS difficulty_low,
+            count(*) FILTER (WHERE q.value->>'question_format' = 'essay') AS format_essay
+        FROM analysis_results a
+        LEFT JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(a.questions::jsonb) = 'array'
+                THEN a.questions::jsonb ELSE '[]'::jsonb END
+        ) AS q(value) ON true
+        GROUP BY a.id, a.exam_id, a.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop v_analysis_briefs view."""
+    op.execute("DROP VIEW IF EXISTS v_analysis_briefs")
@@ -0,0 +1,76 @@
+"""Add fn_list_exams function
+
+Revision ID: 20260201_add_list_exams_fn
+Revises: 20260201_add_analysis_briefs_view
+Create Date: 2026-02-01
+
+시험지 목록 조회를 DB 함수 1회 호출로 처리
+- 전체 개수, 페이지 시험지, 완료된 시험지의 분석 요약을 한 번에 반환
+- 기존: 개수 조회 + 목록 조회 + 분석 요약 조회 3회 왕복
+- 분석 요약은 페이지 범위로 자른 뒤 시험지별로 LATERAL 조회 (exam_id 인덱스 사용)
+- 한 시험지에 분석이 여러 건이면 (병합 분석 등) 가장 최근 analyzed_at 분석의 요약 사용
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260201_add_list_exams_fn"
+down_revision = "20260201_add_analysis_briefs_view"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create fn_list_exams function."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION fn_list_exams(
+            p_user_id varchar,
+            p_status varchar DEFAULT NULL,
+            p_limit integer DEFAULT 20,
+            p_offset integer DEFAULT 0
+        )
+        RETURNS jsonb
+        LANGUAGE sql
+        STABLE
+        AS $$
+            SELECT jsonb_build_object(
+                'total', (
+                    SELECT count(*)
+                    FROM exams e
+                    WHERE e.user_id = p_user_id
+                      AND (p_status IS NULL OR e.status = p_status)
+                ),
+                'items', COALESCE((
+                    SELECT jsonb_agg(
+                        to_jsonb(page.*) || jsonb_build_object('analysis_brief', to_jsonb(b.*))
+                        ORDER BY page.created_at DESC
+                    )
+                    FROM (
+                        SELECT e.*
+                        FROM exams e
+                        WHERE e.user_id = p_user_id
+                          AND (p_status IS NULL OR e.status = p_status)
+                        ORDER BY e.created_at DESC
+                        LIMIT p_limit OFFSET p_offset
+                    ) page
+                    LEFT JOIN LATERAL (
+                        SELECT v.*
+                        FROM v_analysis_briefs v
+                        JOIN analysis_results a ON a.id = v.analysis_id
+                        WHERE page.status = 'completed'
+                          AND v.exam_id = page.id
+                          AND v.user_id = p_user_id
+                        ORDER BY a.analyzed_at DESC, a.id DESC
+                        LIMIT 1
+                    ) b ON true
+                ), '[]'::jsonb)
+            )
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop fn_list_exams function."""
+    op.execute("DROP FUNCTION IF EXISTS fn_list_exams(varchar, varchar, integer, integer)")
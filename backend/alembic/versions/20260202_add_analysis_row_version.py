@@ -0,0 +1,70 @@
+"""Add row_version to analysis_results
+
+Revision ID: 20260202_add_analysis_row_version
+Revises: 20260202_add_list_exams_version_fn
+Create Date: 2026-02-02
+
+분석 결과 행 버전 번호 (워커별 행 캐시 재검증용)
+- 행이 UPDATE될 때마다 BEFORE UPDATE 트리거로 1 증가 (정오답 수정, 총평 저장, 시험지 유형 동기화 등 모든 경로)
+- 캐시 히트 시 row_version만 조회하여 다른 워커에서 수정된 행을 감지
+- v_full_report는 a.* 컬럼 순서를 고정하므로 DROP 후 재생성
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20260202_add_analysis_row_version"
+down_revision = "20260202_add_list_exams_version_fn"
+branch_labels = None
+depends_on = None
+
+
+_FULL_REPORT_VIEW_SQL = """
+CREATE OR REPLACE VIEW v_full_report AS
+SELECT a.*, to_jsonb(e.*) AS extension
+FROM analysis_results a
+LEFT JOIN analysis_extensions e ON e.analysis_id = a.id
+"""
+
+
+def upgrade() -> None:
+    """Add row_version column with bump trigger."""
+    op.execute("DROP VIEW IF EXISTS v_full_report")
+
+    op.add_column(
+        "analysis_results",
+        sa.Column("row_version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION analysis_results_bump_row_version()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            NEW.row_version := OLD.row_version + 1;
+            RETURN NEW;
+        END;
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_analysis_results_bump_row_version
+        BEFORE UPDATE ON analysis_results
+        FOR EACH ROW EXECUTE FUNCTION analysis_results_bump_row_version()
+        """
+    )
+
+    op.execute(_FULL_REPORT_VIEW_SQL)
+
+
+def downgrade() -> None:
+    """Drop row_version column and bump trigger."""
+    op.execute("DROP VIEW IF EXISTS v_full_report")
+    op.execute("DROP TRIGGER IF EXISTS trg_analysis_results_bump_row_version ON analysis_results")
+    op.execute("DROP FUNCTION IF EXISTS analysis_results_bump_row_version()")
+    op.drop_column("analysis_results", "row_version")
+    op.execute(_FULL_REPORT_VIEW_SQL)
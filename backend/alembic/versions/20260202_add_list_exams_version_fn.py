@@ -0,0 +1,75 @@
+"""Add fn_list_exams_version function
+
+Revision ID: 20260202_add_list_exams_version_fn
+Revises: 20260201_add_analysis_briefs_table
+Create Date: 2026-02-02
+
+시험지 목록 조건부 GET(ETag)용 버전 문자열 함수
+- fn_list_exams와 같은 조건/페이지 범위의 (전체 개수, 시험지 행, 분석 요약 행)을 텍스트로 이어 md5 해시
+- 시험지 행 전체를 포함하므로 updated_at 없이 갱신되는 analysis_step 진행 단계도 반영
+- jsonb 객체 생성/전송 없이 32자 문자열 하나만 반환 (폴링 시 변경이 없으면 목록 조회 생략)
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260202_add_list_exams_version_fn"
+down_revision = "20260201_add_analysis_briefs_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create fn_list_exams_version function."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION fn_list_exams_version(
+            p_user_id varchar,
+            p_status varchar DEFAULT NULL,
+            p_limit integer DEFAULT 20,
+            p_offset integer DEFAULT 0
+        )
+        RETURNS text
+        LANGUAGE sql
+        STABLE
+        AS $$
+            SELECT md5(
+                (
+                    SELECT count(*)
+                    FROM exams e
+                    WHERE e.user_id = p_user_id
+                      AND (p_status IS NULL OR e.status = p_status)
+                )::text
+                || '|' || COALESCE((
+                    SELECT string_agg(
+                        concat_ws(':', page::text, b::text),
+                        ',' ORDER BY page.created_at DESC
+                    )
+                    FROM (
+                        SELECT e.*
+                        FROM exams e
+                        WHERE e.user_id = p_user_id
+                          AND (p_status IS NULL OR e.status = p_status)
+                        ORDER BY e.created_at DESC
+                        LIMIT p_limit OFFSET p_offset
+                    ) page
+                    LEFT JOIN LATERAL (
+                        SELECT v.*
+                        FROM analysis_briefs v
+                        JOIN analysis_results a ON a.id = v.analysis_id
+                        WHERE page.status = 'completed'
+                          AND v.exam_id = page.id
+                          AND v.user_id = p_user_id
+                        ORDER BY a.analyzed_at DESC, a.id DESC
+                        LIMIT 1
+                    ) b ON true
+                ), '')
+            )
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop fn_list_exams_version function."""
+    op.execute("DROP FUNCTION IF EXISTS fn_list_exams_version(varchar, varchar, integer, integer)")
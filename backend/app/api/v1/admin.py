@@ -1,13 +1,20 @@
 """Admin endpoints for user management and school trends."""
 import asyncio
+import json
 import logging
 from datetime import datetime
 from typing import Literal
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.core.deps import AdminUser, DbDep
+from app.services.analysis_cache import (
+    get_analysis_cache,
+    get_exam_cache,
+    invalidate_user_analysis_caches,
+)
 from app.services.credit_log import get_credit_log_service
 from app.services.school_trends import get_school_trends_service
 
@@ -18,6 +25,19 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 # 집계 중복 실행 방지 락
 _aggregation_lock = asyncio.Lock()
 
+# 이 행 수를 넘는 목록은 Pydantic 검증을 스레드풀에서 수행 (이벤트 루프 블로킹 방지)
+_OFFLOAD_VALIDATION_ROWS = 200
+
+# 사용자 내보내기 시 한 번에 가져오는 행 수
+_EXPORT_CHUNK_SIZE = 500
+
+_USER_LIST_COLUMNS = (
+    "id, email, nickname, is_active, is_superuser, "
+    "subscription_tier, credits, "
+    "monthly_analysis_count, monthly_extended_count, "
+    "created_at, updated_at"
+)
+
 
 # ============================================
 # Credit History Schemas for Admin
@@ -127,6 +147,16 @@ class SubscriptionUpdateResponse(BaseModel):
     new_tier: str
 
 
+def _build_user_items(rows: list[dict]) -> list[UserListItem]:
+    """사용자 행 목록을 UserListItem으로 변환."""
+    return [UserListItem(**row) for row in rows]
+
+
+def _user_search_filter(search: str) -> str:
+    """이메일/닉네임 부분 일치 검색용 PostgREST or 필터."""
+    return f"email.ilike.*{search}*,nickname.ilike.*{search}*"
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -143,26 +173,25 @@ async def list_users(
     offset = (page - 1) * page_size
 
     # 기본 쿼리
-    query = db.table("users").select(
-        "id, email, nickname, is_active, is_superuser, "
-        "subscription_tier, credits, "
-        "monthly_analysis_count, monthly_extended_count, "
-        "created_at, updated_at"
-    )
+    query = db.table("users").select(_USER_LIST_COLUMNS)
 
     # 검색 조건
     if search:
-        query = query.or_(f"email.ilike.%{search}%,nickname.ilike.%{search}%")
+        query = query.or_(_user_search_filter(search))
 
     # 페이징 및 정렬
     result = await query.order("created_at", desc=True).limit(page_size).offset(offset).execute()
 
-    users = [UserListItem(**user) for user in result.data]
+    rows = result.data or []
+    if len(rows) > _OFFLOAD_VALIDATION_ROWS:
+        users = await asyncio.to_thread(_build_user_items, rows)
+    else:
+        users = _build_user_items(rows)
 
     # 전체 개수 조회 (간단히 전체 조회 후 카운트)
     count_query = db.table("users").select("id")
     if search:
-        count_query = count_query.or_(f"email.ilike.%{search}%,nickname.ilike.%{search}%")
+        count_query = count_query.or_(_user_search_filter(search))
     count_result = await count_query.execute()
     total = len(count_result.data) if count_result.data else len(users)
 
@@ -172,6 +201,64 @@ async def list_users(
     )
 
 
+@router.get("/users/export")
+async def export_users(
+    admin: AdminUser,
+    db: DbDep,
+    search: str | None = None,
+):
+    """전체 사용자 목록 내보내기 (NDJSON 스트리밍, 관리자 전용).
+
+    청크 단위로 조회하여 한 줄에 한 명씩 바로 내보내므로
+    사용자 수와 무관하게 메모리 사용량이 일정합니다.
+    """
+
+    async def fetch_chunk(offset: int):
+        query = db.table("users").select(_USER_LIST_COLUMNS)
+        if search:
+            query = query.or_(_user_search_filter(search))
+        # created_at은 중복될 수 있으므로 id를 보조 정렬 기준으로 두어 청크 경계에서 누락/중복 방지
+        return await (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .limit(_EXPORT_CHUNK_SIZE)
+            .offset(offset)
+            .execute()
+        )
+
+    # 첫 청크는 스트리밍 시작 전에 조회하여 실패 시 오류 응답 반환
+    first_result = await fetch_chunk(0)
+    if first_result.error:
+        logger.error("User export failed | offset=0 | error=%s", first_result.error)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"사용자 내보내기 실패: {first_result.error}"
+        )
+
+    async def generate():
+        result = first_result
+        offset = 0
+        while True:
+            rows = result.data or []
+            for row in rows:
+                yield UserListItem(**row).model_dump_json().encode() + b"\n"
+
+            if len(rows) < _EXPORT_CHUNK_SIZE:
+                return
+            offset += _EXPORT_CHUNK_SIZE
+
+            result = await fetch_chunk(offset)
+            if result.error:
+                # 이미 200 응답이 시작되었으므로 오류 레코드를 남기고 스트림을 중단 (잘린 파일을 정상으로 오인하지 않도록)
+                logger.error("User export failed | offset=%d | error=%s", offset, result.error)
+                yield json.dumps(
+                    {"error": "EXPORT_FAILED", "offset": offset}
+                ).encode() + b"\n"
+                raise RuntimeError(f"User export aborted at offset {offset}")
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/users/{user_id}", response_model=UserListItem)
 async def get_user(
     user_id: str,
@@ -180,10 +267,7 @@ async def get_user(
 ):
     """특정 사용자 조회 (관리자 전용)."""
     result = await db.table("users").select(
-        "id, email, nickname, is_active, is_superuser, "
-        "subscription_tier, credits, "
-        "monthly_analysis_count, monthly_extended_count, "
-        "created_at, updated_at"
+        _USER_LIST_COLUMNS
     ).eq("id", user_id).maybe_single().execute()
 
     if result.error or result.data is None:
@@ -381,47 +465,22 @@ async def get_user_exams(
             detail="사용자를 찾을 수 없습니다"
         )
 
-    # 시험지 목록 조회
-    exams_result = await (
-        db.table("exams")
-        .select("id, title, grade, subject, school_name, exam_type, status, created_at, error_message")
-        .eq("user_id", user_id)
-        .order("created_at", desc=True)
-        .limit(limit)
-        .offset(offset)
-        .execute()
-    )
-
-    # 전체 개수 조회
-    count_result = await (
-        db.table("exams")
-        .select("id")
-        .eq("user_id", user_id)
-        .execute()
-    )
-    total = len(count_result.data) if count_result.data else 0
-
-    # N+1 최적화: 완료된 시험들의 분석 결과를 한 번에 조회
-    completed_exam_ids = [e["id"] for e in (exams_result.data or []) if e.get("status") == "completed"]
-    analysis_map = {}
-
-    if completed_exam_ids:
-        ar_result = await (
-            db.table("analysis_results")
-            .select("exam_id, total_questions, total_points")
-            .in_("exam_id", completed_exam_ids)
-            .execute()
-        )
-        for ar in (ar_result.data or []):
-            analysis_map[ar["exam_id"]] = ar
+    # 시험지 목록 + 전체 개수 + 완료된 시험지의 분석 요약 (fn_list_exams RPC 1회)
+    # 완료 여부 필터와 분석 요약 조인은 DB 함수 안에서 처리
+    list_result = await db.rpc(
+        "fn_list_exams",
+        {"p_user_id": user_id, "p_limit": limit, "p_offset": offset},
+    ).execute()
+    list_data = list_result.data if not list_result.error and list_result.data else {}
+    total = list_data.get("total") or 0
 
     exams = []
-    for exam_data in (exams_result.data or []):
+    for exam_data in list_data.get("items") or []:
+        brief = exam_data.pop("analysis_brief", None)
         item = AdminExamItem(**exam_data)
-        if exam_data.get("status") == "completed" and exam_data["id"] in analysis_map:
-            ar = analysis_map[exam_data["id"]]
-            item.total_questions = ar.get("total_questions")
-            item.total_points = ar.get("total_points")
+        if brief:
+            item.total_questions = brief.get("total_questions")
+            item.total_points = brief.get("total_points")
         exams.append(item)
 
     return AdminExamsResponse(
@@ -521,6 +580,11 @@ async def reset_user_analysis(
             detail=f"데이터 초기화 실패: {str(e)}"
         )
 
+    # 초기화된 사용자의 캐시된 분석 결과 제거 (재업로드 시 새로 분석)
+    get_analysis_cache().invalidate_user(user_id)
+    invalidate_user_analysis_caches(user_id)
+    get_exam_cache().invalidate_user(user_id)
+
     return ResetAnalysisResponse(
         user_id=user_id,
         deleted_exams=deleted_counts["exams"],
@@ -1,10 +1,26 @@
 """Analysis API endpoints using Supabase REST API."""
-import uuid
+import asyncio
+import json
+import logging
+from collections.abc import Iterable, Iterator
 from datetime import datetime
-
-from fastapi import APIRouter, HTTPException, status, Body
-
-from app.core.deps import CurrentUser, DbDep
+from functools import lru_cache
+from heapq import nlargest
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from urllib.parse import quote
+from typing import Any
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response, status, Body
+from fastapi.responses import StreamingResponse
+from jinja2 import Environment, FileSystemLoader
+
+from app.core.deps import CurrentUser, DbDep, OrchestratorDep
+from app.core.etag import compute_etag, etag_matches, not_modified
+from app.core.ids import uuid7
+from app.core.timestamps import utc_now_iso
+from app.db.supabase_client import SupabaseAPIError, SupabaseClient
 from app.schemas.analysis import (
     AnalysisCreateResponse,
     AnalysisDetailResponse,
@@ -20,17 +36,33 @@ from app.schemas.analysis import (
     TopicStrategiesResponse,
     ScoreLevelPlanResponse,
     ExamPrepStrategyResponse,
+    AnalysisPlansResponse,
 )
 from app.schemas.feedback import FeedbackCreate, FeedbackResponse, BadgeEarned
-from app.services.analysis import get_analysis_service
-from app.services.agents import AnalysisOrchestrator
+from app.services.analysis import get_analysis_service, get_score_totals
 from app.services.subscription import get_subscription_service
 from app.services.exam import get_exam_service
-from app.services.ai_learning import get_ai_learning_service
+from app.services.ai_learning import get_ai_learning_service, record_feedback_for_auto_learn
 from app.services.badge import get_badge_service
+from app.services.analytics_log import get_analytics_log_service
+from app.services.analysis_cache import get_export_html_cache
+from app.services.agents.commentary_agent import get_commentary_agent
+from app.services.agents.topic_strategy_agent import get_topic_strategy_agent
+from app.services.agents.score_level_plan_agent import get_score_level_plan_agent
+from app.services.agents.exam_prep_strategy_agent import get_exam_prep_strategy_agent
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["analysis"])
 
+# 여러 엔드포인트에서 공통으로 쓰는 오류 응답 detail
+_DETAIL_ANALYSIS_NOT_FOUND = {"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+_DETAIL_EXAM_NOT_FOUND = {"code": "EXAM_NOT_FOUND", "message": "시험지를 찾을 수 없습니다."}
+_DETAIL_FORBIDDEN = {"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
+
+# 분석 결과는 총평/정오답 수정으로 갱신될 수 있으므로 매번 ETag로 재검증
+_CACHE_CONTROL = "private, no-cache"
+
 
 @router.post(
     "/exams/{exam_id}/analyze",
@@ -52,16 +84,22 @@ async def request_analysis(
     - 한도 초과 시 402 Payment Required 반환
     """
     # 시험지 조회하여 exam_type 확인
+    # 재분석 요청이면 기존 분석 조회를 시험지 조회와 동시에 수행
     exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(exam_id, current_user["id"])
+    analysis_service = get_analysis_service(db)
+    existing_analysis = None
+    if request.force_reanalyze:
+        exam, existing_analysis = await asyncio.gather(
+            exam_service.get_exam(exam_id, current_user["id"]),
+            analysis_service.get_analysis_by_exam(exam_id, current_user["id"]),
+        )
+    else:
+        exam = await exam_service.get_exam(exam_id, current_user["id"])
 
     if not exam:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "code": "EXAM_NOT_FOUND",
-                "message": "시험지를 찾을 수 없습니다."
-            }
+            detail=_DETAIL_EXAM_NOT_FOUND
         )
 
     # 사용량 체크 및 소비 (분석 모드에 따라 차등)
@@ -71,17 +109,15 @@ async def request_analysis(
 
     # 기존 분석 결과 확인 (신뢰도 < 60%면 무료 재분석)
     skip_credit_check = False
-    if request.force_reanalyze:
-        # 기존 분석 조회
-        analysis_service_temp = get_analysis_service(db)
-        existing_analysis = await analysis_service_temp.get_analysis_by_exam(exam_id)
-
-        if existing_analysis:
-            # 신뢰도 확인 (avg_confidence < 0.6이면 무료 재분석)
-            avg_confidence = existing_analysis.get("avg_confidence")
-            if avg_confidence is not None and avg_confidence < 0.6:
-                skip_credit_check = True
-                print(f"[Reanalyze] 신뢰도 {avg_confidence:.0%} < 60% - 크레딧 차감 없이 재분석 허용")
+    if existing_analysis:
+        # 신뢰도 확인 (avg_confidence < 0.6이면 무료 재분석)
+        avg_confidence = existing_analysis.get("avg_confidence")
+        if avg_confidence is not None and avg_confidence < 0.6:
+            skip_credit_check = True
+            logger.info(
+                "[Reanalyze] 신뢰도 %.0f%% < 60%% - 크레딧 차감 없이 재분석 허용",
+                avg_confidence * 100,
+            )
 
     # 크레딧 체크 (신뢰도 낮은 재분석은 무료)
     credits_consumed = 0
@@ -108,7 +144,6 @@ async def request_analysis(
         credits_consumed = consume_result["credits_consumed"]
         credits_remaining = consume_result["credits_remaining"]
 
-    analysis_service = get_analysis_service(db)
     result = await analysis_service.request_analysis(
         exam_id=exam_id,
         user_id=current_user["id"],
@@ -140,17 +175,18 @@ async def request_answer_analysis(
     - 추가 1크레딧 소비
     - 학생 답안지(answered/mixed)에서만 의미있음
     """
-    # 시험지 조회
+    # 시험지 + 기존 분석 결과 동시 조회
     exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(exam_id, current_user["id"])
+    analysis_service = get_analysis_service(db)
+    exam, existing = await asyncio.gather(
+        exam_service.get_exam(exam_id, current_user["id"]),
+        analysis_service.get_analysis_by_exam(exam_id, current_user["id"]),
+    )
 
     if not exam:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "code": "EXAM_NOT_FOUND",
-                "message": "시험지를 찾을 수 없습니다."
-            }
+            detail=_DETAIL_EXAM_NOT_FOUND
         )
 
     # 이미 정오답 분석이 완료된 경우
@@ -164,9 +200,6 @@ async def request_answer_analysis(
         )
 
     # 기존 분석 결과 확인
-    analysis_service = get_analysis_service(db)
-    existing = await analysis_service.get_analysis_by_exam(exam_id)
-
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -213,21 +246,15 @@ async def get_analysis_by_exam(
 ):
     """시험지에 연결된 분석 결과 ID를 조회합니다."""
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis_by_exam(exam_id)
+    analysis_id = await analysis_service.get_analysis_id_by_exam(exam_id, current_user["id"])
 
-    if not analysis:
+    if not analysis_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
-        )
-
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    return {"analysis_id": analysis["id"]}
+    return {"analysis_id": analysis_id}
 
 
 @router.get(
@@ -237,38 +264,48 @@ async def get_analysis_by_exam(
 )
 async def get_analysis(
     analysis_id: str,
+    request: Request,
+    response: Response,
     current_user: CurrentUser,
     db: DbDep,
-) -> AnalysisDetailResponse:
-    """분석 결과를 조회합니다."""
+) -> AnalysisDetailResponse | Response:
+    """분석 결과를 조회합니다.
+
+    If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환합니다.
+    """
 
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    # 소유권 조건을 쿼리에 포함 (타인의 분석은 404)
+    analysis = await analysis_service.get_analysis(analysis_id, current_user["id"])
 
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    # Check ownership
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
-        )
+    # 행 내용 해시는 행 캐시에 보관되어 폴링 시 행 전체를 다시 직렬화하지 않음
+    etag = compute_etag(analysis_service.get_row_digest(analysis))
+    if etag_matches(request, etag):
+        return not_modified(etag, _CACHE_CONTROL)
 
     try:
-        result_data = AnalysisResultSchema.model_validate(analysis)
+        # 같은 분석의 반복 조회 시 캐시된 검증 결과 재사용
+        result_data = analysis_service.get_validated_schema(analysis)
     except Exception as e:
-        print(f"[ERROR] Validation failed for analysis {analysis_id}: {e}")
-        print(f"  Summary: {analysis.get('summary')}")
-        print(f"  Questions: {analysis.get('questions')}")
+        logger.error("Validation failed for analysis %s: %s", analysis_id, e)
+        logger.debug(
+            "Invalid analysis payload | summary=%s | questions=%s",
+            analysis.get("summary"), analysis.get("questions"),
+        )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"code": "VALIDATION_ERROR", "message": f"데이터 검증 실패: {str(e)}"}
         )
 
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
+
     return AnalysisDetailResponse(
         data=result_data,
         meta=AnalysisMetadata(
@@ -297,22 +334,15 @@ async def generate_commentary(
     - 기존 총평이 있으면 재사용 (force_regenerate=True로 재생성 가능)
     - 크레딧 소모 없음 (기존 분석 결과 활용)
     """
-    from app.services.agents.commentary_agent import get_commentary_agent
 
-    # 분석 결과 조회 및 권한 확인
+    # 분석 결과 조회 (소유권 조건을 쿼리에 포함, 타인의 분석은 404)
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    analysis = await analysis_service.get_analysis(analysis_id, current_user["id"])
 
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
-        )
-
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
     # 기존 총평 확인
@@ -320,10 +350,8 @@ async def generate_commentary(
         # 기존 총평이 있으면 반환
         return ExamCommentary.model_validate(analysis["commentary"])
 
-    # 시험지 유형 확인
-    exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(str(analysis["exam_id"]), current_user["id"])
-    exam_type = exam.get("exam_type", "blank") if exam else "blank"
+    # 시험지 유형 확인 (분석 행에 비정규화된 값 사용)
+    exam_type = analysis.get("exam_type") or "blank"
 
     # 총평 생성
     commentary_agent = get_commentary_agent()
@@ -336,15 +364,97 @@ async def generate_commentary(
         exam_type=exam_type
     )
 
-    # 분석 결과에 총평 저장
-    commentary_dict = commentary.model_dump()
+    # 분석 결과에 총평 저장 (JSON 호환 dict로 한 번에 직렬화, null 필드는 생략)
+    commentary_dict = commentary.model_dump(mode="json", exclude_none=True)
     await db.table("analysis_results").eq("id", analysis_id).update({
         "commentary": commentary_dict
     }).execute()
+    analysis_service.invalidate_cache(analysis_id)
 
     return commentary
 
 
+def _build_topic_strategies(
+    analysis_id: str, analysis: dict, exam_type: str
+) -> TopicStrategiesResponse:
+    """영역별 학습 전략 생성 (에이전트 호출 + 응답 구성)."""
+    strategies_data = get_topic_strategy_agent().generate(
+        analysis_data={
+            "questions": analysis.get("questions", []),
+            "summary": analysis.get("summary"),
+            "exam_type": exam_type,
+        }
+    )
+
+    return TopicStrategiesResponse(
+        analysis_id=analysis_id,
+        strategies=strategies_data["strategies"],
+        overall_guidance=strategies_data["overall_guidance"],
+        study_sequence=strategies_data["study_sequence"],
+        generated_at=utc_now_iso()
+    )
+
+
+def _build_score_level_plan(
+    analysis_id: str, analysis: dict, current_score: float, total_score: float
+) -> ScoreLevelPlanResponse:
+    """점수대별 학습 계획 생성 (에이전트 호출 + 응답 구성)."""
+    plan_data = get_score_level_plan_agent().generate(
+        analysis_data={
+            "current_score": current_score,
+            "total_score": total_score,
+            "questions": analysis.get("questions", []),
+            "summary": analysis.get("summary"),
+        }
+    )
+
+    return ScoreLevelPlanResponse(
+        analysis_id=analysis_id,
+        current_score=plan_data["current_score"],
+        total_score=plan_data["total_score"],
+        score_percentage=plan_data["score_percentage"],
+        characteristics=plan_data["characteristics"],
+        improvement_goal=plan_data["improvement_goal"],
+        study_phases=plan_data["study_phases"],
+        daily_routine=plan_data["daily_routine"],
+        motivational_message=plan_data["motivational_message"],
+        generated_at=utc_now_iso()
+    )
+
+
+def _build_exam_prep_strategy(
+    analysis_id: str,
+    analysis: dict,
+    current_score: float,
+    total_score: float,
+    exam_name: str,
+    days_until_exam: int,
+) -> ExamPrepStrategyResponse:
+    """시험 대비 전략 생성 (에이전트 호출 + 응답 구성)."""
+    strategy_data = get_exam_prep_strategy_agent().generate(
+        analysis_data={
+            "questions": analysis.get("questions", []),
+            "summary": analysis.get("summary"),
+            "current_score": current_score,
+            "total_score": total_score,
+        },
+        exam_name=exam_name,
+        days_until_exam=days_until_exam
+    )
+
+    return ExamPrepStrategyResponse(
+        analysis_id=analysis_id,
+        exam_name=strategy_data["exam_name"],
+        days_until_exam=strategy_data["days_until_exam"],
+        target_score_improvement=strategy_data["target_score_improvement"],
+        priority_areas=strategy_data["priority_areas"],
+        daily_plans=strategy_data["daily_plans"],
+        exam_day_strategy=strategy_data["exam_day_strategy"],
+        final_advice=strategy_data["final_advice"],
+        generated_at=utc_now_iso()
+    )
+
+
 @router.post(
     "/analysis/{analysis_id}/topic-strategies",
     response_model=TopicStrategiesResponse,
@@ -364,11 +474,10 @@ async def generate_topic_strategies(
     - 답안지 분석에만 적용 가능 (빈 시험지는 불가)
     - 크레딧 소모 없음 (기존 분석 결과 활용)
     """
-    from app.services.agents.topic_strategy_agent import get_topic_strategy_agent
 
-    # 분석 결과 조회 및 권한 확인
+    # 분석 결과 조회 (소유권 조건을 쿼리에 포함, 타인의 분석은 404)
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    analysis = await analysis_service.get_analysis(analysis_id, current_user["id"])
 
     if not analysis:
         raise HTTPException(
@@ -376,10 +485,8 @@ async def generate_topic_strategies(
             detail="Analysis not found"
         )
 
-    # 시험지 유형 확인
-    exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(analysis["exam_id"])
-    exam_type = exam.get("exam_type", "blank") if exam else "blank"
+    # 시험지 유형 확인 (분석 행에 비정규화된 값 사용)
+    exam_type = analysis.get("exam_type") or "blank"
 
     if exam_type == "blank":
         raise HTTPException(
@@ -387,25 +494,7 @@ async def generate_topic_strategies(
             detail="Topic strategies are only available for answered exams (학생 답안지만 가능)"
         )
 
-    # 학습 전략 생성
-    strategy_agent = get_topic_strategy_agent()
-    strategies_data = strategy_agent.generate(
-        analysis_data={
-            "questions": analysis.get("questions", []),
-            "summary": analysis.get("summary"),
-            "exam_type": exam_type,
-        }
-    )
-
-    # 응답 구성
-    from datetime import datetime
-    return TopicStrategiesResponse(
-        analysis_id=analysis_id,
-        strategies=strategies_data["strategies"],
-        overall_guidance=strategies_data["overall_guidance"],
-        study_sequence=strategies_data["study_sequence"],
-        generated_at=datetime.utcnow().isoformat()
-    )
+    return _build_topic_strategies(analysis_id, analysis, exam_type)
 
 
 @router.post(
@@ -429,11 +518,10 @@ async def generate_score_level_plan(
     - 답안지 분석에만 적용 가능 (빈 시험지는 불가)
     - 크레딧 소모 없음 (기존 분석 결과 활용)
     """
-    from app.services.agents.score_level_plan_agent import get_score_level_plan_agent
 
-    # 분석 결과 조회 및 권한 확인
+    # 분석 결과 조회 (소유권 조건을 쿼리에 포함, 타인의 분석은 404)
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    analysis = await analysis_service.get_analysis(analysis_id, current_user["id"])
 
     if not analysis:
         raise HTTPException(
@@ -441,10 +529,8 @@ async def generate_score_level_plan(
             detail="Analysis not found"
         )
 
-    # 시험지 유형 확인
-    exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(analysis["exam_id"])
-    exam_type = exam.get("exam_type", "blank") if exam else "blank"
+    # 시험지 유형 확인 (분석 행에 비정규화된 값 사용)
+    exam_type = analysis.get("exam_type") or "blank"
 
     if exam_type == "blank":
         raise HTTPException(
@@ -452,10 +538,8 @@ async def generate_score_level_plan(
             detail="Score level plan is only available for answered exams (학생 답안지만 가능)"
         )
 
-    # 현재 점수 계산
-    questions = analysis.get("questions", [])
-    current_score = sum(q.get("earned_points", 0) for q in questions if q.get("earned_points") is not None)
-    total_score = sum(q.get("points", 0) for q in questions if q.get("points") is not None and q.get("points", 0) > 0)
+    # 현재 점수 (저장 시 미리 계산된 합계 사용)
+    current_score, total_score = get_score_totals(analysis)
 
     if total_score == 0:
         raise HTTPException(
@@ -463,31 +547,7 @@ async def generate_score_level_plan(
             detail="Cannot generate score level plan: total score is 0"
         )
 
-    # 점수대별 학습 계획 생성
-    plan_agent = get_score_level_plan_agent()
-    plan_data = plan_agent.generate(
-        analysis_data={
-            "current_score": current_score,
-            "total_score": total_score,
-            "questions": questions,
-            "summary": analysis.get("summary"),
-        }
-    )
-
-    # 응답 구성
-    from datetime import datetime
-    return ScoreLevelPlanResponse(
-        analysis_id=analysis_id,
-        current_score=plan_data["current_score"],
-        total_score=plan_data["total_score"],
-        score_percentage=plan_data["score_percentage"],
-        characteristics=plan_data["characteristics"],
-        improvement_goal=plan_data["improvement_goal"],
-        study_phases=plan_data["study_phases"],
-        daily_routine=plan_data["daily_routine"],
-        motivational_message=plan_data["motivational_message"],
-        generated_at=datetime.utcnow().isoformat()
-    )
+    return _build_score_level_plan(analysis_id, analysis, current_score, total_score)
 
 
 @router.post(
@@ -512,11 +572,10 @@ async def generate_exam_prep_strategy(
     - 답안지 분석에만 적용 가능 (빈 시험지는 불가)
     - 크레딧 소모 없음 (기존 분석 결과 활용)
     """
-    from app.services.agents.exam_prep_strategy_agent import get_exam_prep_strategy_agent
 
-    # 분석 결과 조회 및 권한 확인
+    # 분석 결과 조회 (소유권 조건을 쿼리에 포함, 타인의 분석은 404)
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    analysis = await analysis_service.get_analysis(analysis_id, current_user["id"])
 
     if not analysis:
         raise HTTPException(
@@ -524,10 +583,8 @@ async def generate_exam_prep_strategy(
             detail="Analysis not found"
         )
 
-    # 시험지 유형 확인
-    exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(analysis["exam_id"])
-    exam_type = exam.get("exam_type", "blank") if exam else "blank"
+    # 시험지 유형 확인 (분석 행에 비정규화된 값 사용)
+    exam_type = analysis.get("exam_type") or "blank"
 
     if exam_type == "blank":
         raise HTTPException(
@@ -535,36 +592,72 @@ async def generate_exam_prep_strategy(
             detail="Exam prep strategy is only available for answered exams (학생 답안지만 가능)"
         )
 
-    # 현재 점수 계산
-    questions = analysis.get("questions", [])
-    current_score = sum(q.get("earned_points", 0) for q in questions if q.get("earned_points") is not None)
-    total_score = sum(q.get("points", 0) for q in questions if q.get("points") is not None and q.get("points", 0) > 0)
+    # 현재 점수 (저장 시 미리 계산된 합계 사용)
+    current_score, total_score = get_score_totals(analysis)
 
-    # 시험 대비 전략 생성
-    strategy_agent = get_exam_prep_strategy_agent()
-    strategy_data = strategy_agent.generate(
-        analysis_data={
-            "questions": questions,
-            "summary": analysis.get("summary"),
-            "current_score": current_score,
-            "total_score": total_score,
-        },
-        exam_name=exam_name,
-        days_until_exam=days_until_exam
+    return _build_exam_prep_strategy(
+        analysis_id, analysis, current_score, total_score, exam_name, days_until_exam
     )
 
-    # 응답 구성
-    from datetime import datetime
-    return ExamPrepStrategyResponse(
+
+@router.post(
+    "/analysis/{analysis_id}/plans",
+    response_model=AnalysisPlansResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="학습 전략/계획 일괄 생성"
+)
+async def generate_analysis_plans(
+    analysis_id: str,
+    current_user: CurrentUser,
+    db: DbDep,
+    exam_name: str = Body(..., description="시험 이름 (예: '중간고사')"),
+    days_until_exam: int = Body(..., ge=1, le=30, description="시험까지 남은 일수 (1-30일)"),
+) -> AnalysisPlansResponse:
+    """대시보드용으로 영역별 학습 전략, 점수대별 학습 계획, 시험 대비 전략을 한 번에 생성합니다.
+
+    - 분석 조회/권한/시험지 유형 확인을 한 번만 수행
+    - 세 에이전트를 동시에 실행 (응답 시간 = 가장 느린 에이전트)
+    - 배점 정보가 없으면 점수대별 학습 계획은 null
+    - 답안지 분석에만 적용 가능 (빈 시험지는 불가)
+    - 크레딧 소모 없음 (기존 분석 결과 활용)
+    """
+    analysis = await get_analysis_service(db).get_analysis(analysis_id, current_user["id"])
+
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
+        )
+
+    exam_type = analysis.get("exam_type") or "blank"
+
+    if exam_type == "blank":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Plans are only available for answered exams (학생 답안지만 가능)"
+        )
+
+    current_score, total_score = get_score_totals(analysis)
+
+    # 에이전트는 동기 LLM 호출이므로 스레드에서 동시 실행
+    jobs = [
+        asyncio.to_thread(_build_topic_strategies, analysis_id, analysis, exam_type),
+        asyncio.to_thread(
+            _build_exam_prep_strategy,
+            analysis_id, analysis, current_score, total_score, exam_name, days_until_exam,
+        ),
+    ]
+    if total_score:
+        jobs.append(
+            asyncio.to_thread(_build_score_level_plan, analysis_id, analysis, current_score, total_score)
+        )
+    results = await asyncio.gather(*jobs)
+
+    return AnalysisPlansResponse(
         analysis_id=analysis_id,
-        exam_name=strategy_data["exam_name"],
-        days_until_exam=strategy_data["days_until_exam"],
-        target_score_improvement=strategy_data["target_score_improvement"],
-        priority_areas=strategy_data["priority_areas"],
-        daily_plans=strategy_data["daily_plans"],
-        exam_day_strategy=strategy_data["exam_day_strategy"],
-        final_advice=strategy_data["final_advice"],
-        generated_at=datetime.utcnow().isoformat()
+        topic_strategies=results[0],
+        exam_prep_strategy=results[1],
+        score_level_plan=results[2] if total_score else None,
     )
 
 
@@ -588,57 +681,38 @@ async def update_answers(
     Returns:
         업데이트된 문항 수
     """
-    from app.db import get_db
+    # 값은 boolean이거나 null이어야 함 (문항 탐색 전에 한 번에 검증)
+    for new_value in updates.values():
+        if new_value is not None and not isinstance(new_value, bool):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"code": "INVALID_VALUE", "message": f"잘못된 값: {new_value}. true/false/null만 가능합니다."}
+            )
 
-    analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    # 소유권 확인 + 대상 문항 수정 + 점수 합계 갱신을 DB 함수에서 처리
+    try:
+        patched = await get_analysis_service(db).patch_answers(
+            analysis_id, current_user["id"], updates
+        )
+    except SupabaseAPIError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"code": "DB_ERROR", "message": f"정오답 수정 실패: {e.error}"}
+        ) from e
 
-    if not analysis:
+    if patched["code"] == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    # Check ownership
-    if analysis["user_id"] != current_user["id"]:
+    if patched["code"] == "forbidden":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
+            detail=_DETAIL_FORBIDDEN
         )
 
-    # 정오답 업데이트
-    updated_count = 0
-    questions = analysis.get("questions", [])
-
-    for question in questions:
-        question_id = question.get("id")
-        if question_id in updates:
-            new_value = updates[question_id]
-            # boolean이거나 null이어야 함
-            if new_value is not None and not isinstance(new_value, bool):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail={"code": "INVALID_VALUE", "message": f"잘못된 값: {new_value}. true/false/null만 가능합니다."}
-                )
-
-            question["is_correct"] = new_value
-
-            # earned_points 재계산 (is_correct가 true이면 만점, false이면 0점)
-            if new_value is True:
-                question["earned_points"] = question.get("points", 0)
-            elif new_value is False:
-                question["earned_points"] = 0.0
-            else:
-                question["earned_points"] = None
-
-            updated_count += 1
-
-    # DB 업데이트
-    db_instance = get_db()
-    await db_instance.analysis.update_one(
-        {"id": analysis_id},
-        {"$set": {"questions": questions}}
-    )
+    updated_count = patched["updated_count"]
 
     return {
         "success": True,
@@ -662,6 +736,7 @@ async def generate_extended_analysis(
     analysis_id: str,
     current_user: CurrentUser,
     db: DbDep,
+    orchestrator: OrchestratorDep,
     force_regenerate: bool = False,
 ) -> AnalysisExtensionSchema:
     """확장 분석을 생성합니다.
@@ -672,27 +747,19 @@ async def generate_extended_analysis(
     - 사용량 한도를 체크하고 소비합니다.
     - **학생 답안지(student)만 확장 분석 가능**
     """
-    # 기본 분석 소유권 확인
-    analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    # 소유권 확인 + 시험지 유형 확인 + 크레딧 차감을 한 번의 RPC로 처리
+    subscription_service = get_subscription_service(db)
+    auth = await subscription_service.authorize_extended(analysis_id, current_user["id"])
+    code = auth.get("code")
 
-    if not analysis:
+    if code == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
-        )
-
-    # 시험지 유형 확인 (빈 시험지는 확장 분석 불가)
-    exam_service = get_exam_service(db)
-    exam = await exam_service.get_exam(str(analysis["exam_id"]), current_user["id"])
-
-    if exam and exam["exam_type"] == "blank":
+    # 빈 시험지는 확장 분석 불가
+    if code == "blank_exam":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={
@@ -701,11 +768,7 @@ async def generate_extended_analysis(
             }
         )
 
-    # 사용량 체크 및 소비
-    subscription_service = get_subscription_service(db)
-    can_use_extended = await subscription_service.consume_extended(current_user["id"])
-
-    if not can_use_extended:
+    if code != "ok":
         raise HTTPException(
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail={
@@ -715,7 +778,6 @@ async def generate_extended_analysis(
         )
 
     try:
-        orchestrator = AnalysisOrchestrator(db)
         extension = await orchestrator.generate_extended_analysis(
             analysis_id=analysis_id,
             user_id=current_user["id"],
@@ -723,7 +785,7 @@ async def generate_extended_analysis(
         )
         return extension
     except Exception as e:
-        print(f"Extended analysis failed: {e}")
+        logger.exception("Extended analysis failed | analysis_id=%s", analysis_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"code": "EXTENDED_ANALYSIS_FAILED", "message": f"확장 분석 실패: {str(e)}"}
@@ -739,25 +801,17 @@ async def get_extended_analysis(
     analysis_id: str,
     current_user: CurrentUser,
     db: DbDep,
+    orchestrator: OrchestratorDep,
 ) -> AnalysisExtensionSchema | None:
     """저장된 확장 분석을 조회합니다."""
-    # 기본 분석 소유권 확인
+    # 기본 분석 소유권 확인 (소유권 캐시 사용, 본문 조회 없음)
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
-
-    if not analysis:
+    if not await analysis_service.exists_for_user(analysis_id, current_user["id"]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
-        )
-
-    orchestrator = AnalysisOrchestrator(db)
     extension = await orchestrator.get_extended_analysis(analysis_id)
 
     # 404 대신 None 반환 (프론트엔드 콘솔 에러 방지)
@@ -771,36 +825,59 @@ async def get_extended_analysis(
 )
 async def get_full_report(
     analysis_id: str,
+    request: Request,
     current_user: CurrentUser,
     db: DbDep,
-) -> ExtendedAnalysisResponse:
-    """기본 분석 + 확장 분석 통합 보고서를 조회합니다."""
-    # 기본 분석
-    analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    orchestrator: OrchestratorDep,
+) -> Response:
+    """기본 분석 + 확장 분석 통합 보고서를 조회합니다.
+
+    If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환합니다.
+    """
+    # 기본 분석 + 확장 분석(없으면 None)을 한 번의 조인 조회로 가져옴
+    analysis, extension = await orchestrator.get_analysis_with_extension(
+        analysis_id, current_user["id"]
+    )
 
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
-        )
+    # 확장 분석은 재생성 시 새 행으로 저장되므로 id + 생성 시각으로 충분
+    analysis_service = get_analysis_service(db)
+    etag = compute_etag(
+        analysis_service.get_row_digest(analysis),
+        (extension.id, extension.generated_at) if extension else None,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag, _CACHE_CONTROL)
+
+    # 같은 분석의 검증 결과는 행 캐시에 보관되어 재사용됨
+    basic_data = analysis_service.get_validated_schema(analysis)
+
+    # 보고서는 수백 KB~수 MB이므로 기본/확장 분석을 따로 직렬화하여 스트리밍
+    # (이미 검증된 스키마라 response_model 재검증도 생략)
+    return StreamingResponse(
+        _stream_full_report(basic_data, extension),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL},
+    )
 
-    basic_data = AnalysisResultSchema.model_validate(analysis)
 
-    # 확장 분석 (없으면 None)
-    orchestrator = AnalysisOrchestrator(db)
-    extension = await orchestrator.get_extended_analysis(analysis_id)
+def _stream_full_report(
+    basic: AnalysisResultSchema, extension: AnalysisExtensionSchema | None
+) -> Iterator[str]:
+    """ExtendedAnalysisResponse와 같은 JSON을 기본/확장 분석 단위로 생성.
 
-    return ExtendedAnalysisResponse(
-        basic=basic_data,
-        extension=extension,
-    )
+    동기 제너레이터라 Starlette가 스레드풀에서 순회하므로 직렬화가 이벤트 루프를 막지 않습니다.
+    """
+    yield '{"basic":'
+    yield basic.model_dump_json()
+    yield ',"extension":'
+    yield extension.model_dump_json() if extension else "null"
+    yield "}"
 
 
 # ============================================
@@ -808,6 +885,61 @@ async def get_full_report(
 # ============================================
 
 
+# 자동 학습 트리거 피드백 임계치
+_AUTO_LEARN_THRESHOLD = 10
+
+
+async def _run_feedback_auto_learn(db: SupabaseClient) -> None:
+    """피드백 누적 시 자동 학습 실행 (응답 반환 후 백그라운드)."""
+    try:
+        learning_service = get_ai_learning_service(db)
+        learn_result = await learning_service.check_and_auto_learn(
+            threshold=_AUTO_LEARN_THRESHOLD
+        )
+        if learn_result:
+            logger.info("[Feedback] 자동 학습 완료: %s개 패턴 적용", learn_result.get("auto_applied", 0))
+    except Exception as e:
+        # 학습 실패해도 피드백 저장은 성공으로 처리
+        logger.warning("[Feedback] 자동 학습 실패 (무시됨): %s", e)
+
+
+async def _log_feedback_analytics(
+    db: SupabaseClient, user_id: str, analysis_id: str, feedback: FeedbackCreate
+) -> None:
+    """Analytics 로깅: 피드백 제출 (응답 반환 후 백그라운드, 실패해도 무시)."""
+    try:
+        analytics = get_analytics_log_service(db)
+        await analytics.log_feedback(
+            user_id=user_id,
+            analysis_id=analysis_id,
+            question_id=feedback.question_id,
+            feedback_type=feedback.feedback_type,
+            feedback_value={"comment": feedback.comment} if feedback.comment else None,
+        )
+    except Exception as log_error:
+        logger.warning("[Analytics Log Error] %s", log_error)
+
+
+async def _award_feedback_badge(db: SupabaseClient, user_id: str) -> BadgeEarned | None:
+    """피드백 카운트 증가 및 배지 지급 체크 (실패해도 무시)."""
+    try:
+        badge_service = get_badge_service(db)
+        new_badge = await badge_service.increment_feedback_count(user_id)
+        if not new_badge:
+            return None
+        logger.info("[Badge] 사용자 %s에게 '%s' 배지 지급", user_id, new_badge["name"])
+        return BadgeEarned(
+            id=new_badge["id"],
+            name=new_badge["name"],
+            icon=new_badge["icon"],
+            description=new_badge["description"],
+            tier=new_badge["tier"],
+        )
+    except Exception as e:
+        logger.warning("[Badge] 배지 지급 실패 (무시됨): %s", e)
+        return None
+
+
 @router.post(
     "/analysis/{analysis_id}/feedback",
     response_model=FeedbackResponse,
@@ -819,93 +951,55 @@ async def submit_feedback(
     feedback: FeedbackCreate,
     current_user: CurrentUser,
     db: DbDep,
+    background_tasks: BackgroundTasks,
 ) -> FeedbackResponse:
     """분석 결과에 대한 피드백을 제출합니다.
 
     - feedback_type: wrong_recognition, wrong_topic, wrong_difficulty, wrong_grading, other
     - 데이터 활용 동의한 사용자의 피드백만 AI 개선에 활용됩니다.
     """
-    # 분석 결과 소유권 확인
+    # 분석 결과 소유권 확인 (본문 없이 id만 조회)
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
-
-    if not analysis:
+    if not await analysis_service.exists_for_user(analysis_id, current_user["id"]):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
-        )
-
-    # 피드백 저장
-    now = datetime.utcnow().isoformat()
+    # 피드백 저장 (응답은 로컬 데이터로 구성하므로 삽입 행을 돌려받지 않음)
+    # updated_at은 DB 기본값 NOW() 사용, id는 시간 순서 UUID(v7)로 PK 인덱스 지역성 유지
     feedback_data = {
-        "id": str(uuid.uuid4()),
+        "id": str(uuid7()),
         "user_id": current_user["id"],
         "analysis_id": analysis_id,
         "question_id": feedback.question_id,
         "feedback_type": feedback.feedback_type,
         "comment": feedback.comment,
-        "created_at": now,
-        "updated_at": now,
+        "created_at": utc_now_iso(),
     }
 
-    result = await db.table("feedbacks").insert(feedback_data).execute()
-
-    if result.error:
+    try:
+        (await db.table("feedbacks").insert(feedback_data, returning="minimal").execute()).raise_for_error()
+    except SupabaseAPIError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={"code": "DB_ERROR", "message": f"피드백 저장 실패: {result.error}"}
-        )
+            detail={"code": "DB_ERROR", "message": f"피드백 저장 실패: {e.error}"}
+        ) from e
 
-    # Analytics 로깅: 피드백 제출
-    try:
-        from app.services.analytics_log import get_analytics_log_service
-        analytics = get_analytics_log_service(db)
-        await analytics.log_feedback(
-            user_id=current_user["id"],
-            analysis_id=analysis_id,
-            question_id=feedback.question_id,
-            feedback_type=feedback.feedback_type,
-            feedback_value={"comment": feedback.comment} if feedback.comment else None,
-        )
-    except Exception as log_error:
-        print(f"[Analytics Log Error] {log_error}")
+    # Analytics 로깅은 응답에 영향이 없으므로 응답 후 백그라운드 실행
+    background_tasks.add_task(
+        _log_feedback_analytics, db, current_user["id"], analysis_id, feedback
+    )
 
-    # 자동 학습 트리거 (피드백 10개 이상 쌓이면 자동 분석)
-    try:
-        learning_service = get_ai_learning_service(db)
-        learn_result = await learning_service.check_and_auto_learn(threshold=10)
-        if learn_result:
-            print(f"[Feedback] 자동 학습 완료: {learn_result.get('auto_applied', 0)}개 패턴 적용")
-    except Exception as e:
-        # 학습 실패해도 피드백 저장은 성공으로 처리
-        print(f"[Feedback] 자동 학습 실패 (무시됨): {e}")
+    # 자동 학습 트리거 (피드백 10개 이상 쌓이면 자동 분석) - 응답 후 백그라운드 실행
+    # 임계치 건수마다 한 번만 DB 확인
+    if record_feedback_for_auto_learn(_AUTO_LEARN_THRESHOLD):
+        background_tasks.add_task(_run_feedback_auto_learn, db)
 
-    # 배지 지급 체크
-    badge_earned = None
-    try:
-        badge_service = get_badge_service(db)
-        new_badge = await badge_service.increment_feedback_count(current_user["id"])
-        if new_badge:
-            badge_earned = BadgeEarned(
-                id=new_badge["id"],
-                name=new_badge["name"],
-                icon=new_badge["icon"],
-                description=new_badge["description"],
-                tier=new_badge["tier"],
-            )
-            print(f"[Badge] 사용자 {current_user['id']}에게 '{new_badge['name']}' 배지 지급")
-    except Exception as e:
-        print(f"[Badge] 배지 지급 실패 (무시됨): {e}")
+    # 배지 지급 체크 (응답에 포함되므로 인라인 유지)
+    badge_earned = await _award_feedback_badge(db, current_user["id"])
 
-    response_data = result.data
-    response_data["badge_earned"] = badge_earned
-    return FeedbackResponse.model_validate(response_data)
+    return FeedbackResponse(**feedback_data, badge_earned=badge_earned)
 
 
 # ============================================
@@ -933,10 +1027,13 @@ async def merge_analyses(
     """
     analysis_service = get_analysis_service(db)
 
-    # 모든 분석 조회 및 권한 확인
+    # 요청자 소유의 분석만 한 번에 조회 (타인의 분석은 찾을 수 없음으로 처리)
+    rows = await analysis_service.get_analyses_bulk(request.analysis_ids, current_user["id"])
+    analyses_by_id = {str(row["id"]): row for row in rows}
+
     analyses = []
     for analysis_id in request.analysis_ids:
-        analysis = await analysis_service.get_analysis(analysis_id)
+        analysis = analyses_by_id.get(analysis_id)
 
         if not analysis:
             raise HTTPException(
@@ -947,12 +1044,6 @@ async def merge_analyses(
                 }
             )
 
-        if analysis["user_id"] != current_user["id"]:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
-            )
-
         analyses.append(analysis)
 
     # 병합 실행
@@ -975,37 +1066,38 @@ async def merge_analyses(
 # ============================================
 
 
-@router.post(
-    "/analysis/{analysis_id}/export",
-    response_model=ExportResponse,
-    status_code=status.HTTP_200_OK,
-    summary="분석 보고서 내보내기"
-)
-async def export_analysis(
+async def _log_export_analytics(
+    db: SupabaseClient, user_id: str, analysis_id: str, sections: list[str]
+) -> None:
+    """Analytics 로깅: 내보내기 (응답 반환 후 백그라운드, 실패해도 무시)."""
+    try:
+        analytics = get_analytics_log_service(db)
+        await analytics.log_export(
+            user_id=user_id,
+            analysis_id=analysis_id,
+            export_format="html",
+            sections=sections,
+        )
+    except Exception as log_error:
+        logger.warning("[Analytics Log Error] %s", log_error)
+
+
+async def _prepare_export(
     analysis_id: str,
     request: ExportRequest,
-    current_user: CurrentUser,
-    db: DbDep,
-) -> ExportResponse:
-    """분석 결과를 HTML로 내보냅니다.
-
-    - 1 크레딧 소모
-    - 선택한 섹션만 포함: header, summary, difficulty, type, topic, scores, questions, comments
-    """
-    # 분석 결과 소유권 확인
+    current_user: dict,
+    db: SupabaseClient,
+    background_tasks: BackgroundTasks,
+) -> dict:
+    """내보내기 공통 처리: 소유권 확인, 크레딧 소비, Analytics 로깅 예약."""
     analysis_service = get_analysis_service(db)
-    analysis = await analysis_service.get_analysis(analysis_id)
+    # 소유권 조건을 쿼리에 포함 (타인의 분석은 404)
+    analysis = await analysis_service.get_analysis(analysis_id, current_user["id"])
 
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"code": "ANALYSIS_NOT_FOUND", "message": "분석 결과를 찾을 수 없습니다."}
-        )
-
-    if analysis["user_id"] != current_user["id"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"code": "FORBIDDEN", "message": "접근 권한이 없습니다."}
+            detail=_DETAIL_ANALYSIS_NOT_FOUND
         )
 
     # 크레딧 소비
@@ -1021,41 +1113,184 @@ async def export_analysis(
             }
         )
 
-    # Analytics 로깅: 내보내기
-    try:
-        from app.services.analytics_log import get_analytics_log_service
-        analytics = get_analytics_log_service(db)
-        await analytics.log_export(
-            user_id=current_user["id"],
-            analysis_id=analysis_id,
-            export_format="html",
-            sections=request.sections,
-        )
-    except Exception as log_error:
-        print(f"[Analytics Log Error] {log_error}")
-
-    # HTML 생성
-    html = generate_export_html(
-        analysis=analysis,
-        sections=request.sections,
-        exam_title=request.exam_title or "시험지",
-        exam_grade=request.exam_grade,
-        exam_subject=request.exam_subject or "수학"
+    # Analytics 로깅은 응답 반환 후 백그라운드에서
+    background_tasks.add_task(
+        _log_export_analytics, db, current_user["id"], analysis_id, request.sections
+    )
+
+    return analysis
+
+
+def _export_cache_key(analysis: dict, request: ExportRequest, db: SupabaseClient) -> str:
+    """내보내기 HTML 캐시 키 (행 내용 해시 포함 → 행이 바뀌면 자동으로 다른 키)."""
+    digest = get_analysis_service(db).get_row_digest(analysis)
+    return json.dumps(
+        [
+            str(analysis["id"]),
+            digest,
+            sorted(set(request.sections)),
+            request.exam_title,
+            request.exam_grade,
+            request.exam_subject,
+        ],
+        ensure_ascii=False,
     )
 
-    # 파일명 생성
+
+def _stream_and_cache_export(chunks: Iterable[str], cache_key: str, user_id: str) -> Iterator[str]:
+    """템플릿 출력을 그대로 흘려보내고, 끝까지 전송되면 완성된 HTML을 캐시에 저장."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    get_export_html_cache().set(cache_key, "".join(parts), user_id=user_id)
+
+
+def _export_filename(request: ExportRequest) -> str:
+    """내보내기 파일명 (제목_YYYYMMDD.html)."""
     title = request.exam_title or "분석보고서"
     date_str = datetime.now().strftime("%Y%m%d")
-    filename = f"{title}_{date_str}.html"
+    return f"{title}_{date_str}.html"
+
+
+@router.post(
+    "/analysis/{analysis_id}/export",
+    response_model=ExportResponse,
+    status_code=status.HTTP_200_OK,
+    summary="분석 보고서 내보내기"
+)
+async def export_analysis(
+    analysis_id: str,
+    request: ExportRequest,
+    current_user: CurrentUser,
+    db: DbDep,
+    background_tasks: BackgroundTasks,
+) -> ExportResponse:
+    """분석 결과를 HTML로 내보냅니다.
+
+    - 1 크레딧 소모
+    - 선택한 섹션만 포함: header, summary, difficulty, type, topic, scores, questions, comments
+    """
+    analysis = await _prepare_export(analysis_id, request, current_user, db, background_tasks)
+
+    # 같은 분석/섹션의 재내보내기는 캐시된 HTML 재사용 (크레딧은 위에서 동일하게 차감)
+    cache_key = _export_cache_key(analysis, request, db)
+    cache = get_export_html_cache()
+    html = cache.get(cache_key)
+    if html is None:
+        html = generate_export_html(
+            analysis=analysis,
+            sections=request.sections,
+            exam_title=request.exam_title or "시험지",
+            exam_grade=request.exam_grade,
+            exam_subject=request.exam_subject or "수학"
+        )
+        cache.set(cache_key, html, user_id=current_user["id"])
 
     return ExportResponse(
         success=True,
         html=html,
         image_url=None,
-        filename=filename
+        filename=_export_filename(request)
     )
 
 
+@router.post(
+    "/analysis/{analysis_id}/export.html",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    summary="분석 보고서 HTML 파일 내보내기"
+)
+async def export_analysis_html(
+    analysis_id: str,
+    request: ExportRequest,
+    current_user: CurrentUser,
+    db: DbDep,
+    background_tasks: BackgroundTasks,
+) -> StreamingResponse:
+    """분석 결과를 HTML 파일로 바로 내려받습니다.
+
+    - /export와 동일한 크레딧/섹션 규칙
+    - JSON으로 감싸지 않고 템플릿 출력을 그대로 스트리밍 (이스케이프/재파싱 없음)
+    """
+    analysis = await _prepare_export(analysis_id, request, current_user, db, background_tasks)
+
+    cache_key = _export_cache_key(analysis, request, db)
+    html = get_export_html_cache().get(cache_key)
+    if html is not None:
+        chunks: Iterable[str] = (html,)
+    else:
+        context = _build_export_context(
+            analysis=analysis,
+            sections=request.sections,
+            exam_title=request.exam_title or "시험지",
+            exam_grade=request.exam_grade,
+            exam_subject=request.exam_subject or "수학"
+        )
+        chunks = _stream_and_cache_export(
+            _EXPORT_TEMPLATE.generate(context), cache_key, current_user["id"]
+        )
+
+    # 한글 파일명은 latin-1 헤더에 넣을 수 없으므로 RFC 5987 형식 사용
+    filename = quote(_export_filename(request))
+    return StreamingResponse(
+        chunks,
+        media_type="text/html; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
+
+
+# 내보내기 HTML 템플릿 (모듈 로드 시 한 번 컴파일, 사용자/AI 텍스트는 자동 이스케이프)
+_EXPORT_TEMPLATES = Environment(
+    loader=FileSystemLoader(Path(__file__).resolve().parents[2] / "templates"),
+    autoescape=True,
+    auto_reload=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_EXPORT_TEMPLATE = _EXPORT_TEMPLATES.get_template("export.html.j2")
+
+# 유형 한글 매핑
+_EXPORT_TYPE_LABELS = {
+    "calculation": "계산", "geometry": "도형", "application": "응용",
+    "proof": "증명", "graph": "그래프", "statistics": "통계"
+}
+
+# 난이도 색상
+_DIFF_COLORS_4LEVEL = {"concept": "#22c55e", "pattern": "#3b82f6", "reasoning": "#f59e0b", "creative": "#dc2626"}
+_DIFF_COLORS_3LEVEL = {"high": "#dc2626", "medium": "#f59e0b", "low": "#22c55e"}
+
+# 문항 표/AI 코멘트 최대 표시 개수
+_EXPORT_MAX_QUESTION_ROWS = 20
+_EXPORT_MAX_COMMENTS = 3
+
+# 난이도 라벨
+_DIFF_LABELS_4LEVEL = {"concept": "개념", "pattern": "유형", "reasoning": "심화", "creative": "최상위"}
+_DIFF_LABELS_3LEVEL = {"high": "상", "medium": "중", "low": "하"}
+
+
+@lru_cache(maxsize=1024)
+def _format_analyzed_date(analyzed_at: str | None) -> str:
+    """분석 시각 문자열을 보고서 날짜(YYYY-MM-DD)로 변환 (같은 분석 반복 내보내기 시 재사용)."""
+    if not analyzed_at:
+        return ""
+    try:
+        date_obj = datetime.fromisoformat(analyzed_at.replace("Z", "+00:00").replace("+00:00", ""))
+    except Exception:
+        return ""
+    return date_obj.strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=2048)
+def _split_topic(topic: str) -> tuple[str, str]:
+    """토픽 경로("대단원 > 중단원 > 소단원")의 (첫 단계, 마지막 단계)를 반환.
+
+    같은 토픽이 문항마다 반복되므로 결과를 캐시하고, split 대신
+    partition/rpartition으로 중간 리스트 생성 없이 나눈다.
+    """
+    return topic.partition(" > ")[0], topic.rpartition(" > ")[2]
+
+
 def generate_export_html(
     analysis: dict,
     sections: list[str],
@@ -1064,42 +1299,74 @@ def generate_export_html(
     exam_subject: str
 ) -> str:
     """분석 결과를 HTML로 생성합니다."""
+    return _EXPORT_TEMPLATE.render(
+        _build_export_context(analysis, sections, exam_title, exam_grade, exam_subject)
+    )
+
+
+def _build_export_context(
+    analysis: dict,
+    sections: Iterable[str],
+    exam_title: str,
+    exam_grade: str | None,
+    exam_subject: str
+) -> dict[str, Any]:
+    """내보내기 템플릿 컨텍스트 생성 (통계 집계 + 선택된 섹션용 값)."""
+    # 섹션 포함 여부는 함수/템플릿 전체에서 반복 확인하므로 한 번만 집합으로 변환
+    sections = frozenset(sections)
     questions = analysis.get("questions", [])
     total_questions = analysis.get("total_questions", len(questions))
     analyzed_at = analysis.get("analyzed_at", "")
 
-    # 통계 계산
-    total_points = round(sum(q.get("points", 0) or 0 for q in questions), 1)
+    # 통계 계산 (문항을 한 번만 순회하며 모든 집계를 갱신)
+    total_points = 0
+    earned_points = 0
+    answered_count = 0
+    correct_count = 0
+    diff_counts: dict[str, int] = {}
+    type_dist: dict[str, int] = {}
+    topic_dist: dict[str, int] = {}
+    # 루프 안에서 반복 조회하는 메서드/전역 함수는 지역 변수로 바인딩
+    diff_counts_get = diff_counts.get
+    type_dist_get = type_dist.get
+    topic_dist_get = topic_dist.get
+    split_topic = _split_topic
+    for q in questions:
+        get = q.get
+        total_points += get("points", 0) or 0
+        earned_points += get("earned_points", 0) or 0
+
+        difficulty = get("difficulty")
+        diff_counts[difficulty] = diff_counts_get(difficulty, 0) + 1
+
+        qtype = get("question_type", "other")
+        type_dist[qtype] = type_dist_get(qtype, 0) + 1
+
+        topic = get("topic")
+        topic_head = split_topic(topic)[0] if topic else "미분류"
+        topic_dist[topic_head] = topic_dist_get(topic_head, 0) + 1
+
+        is_correct = get("is_correct")
+        if is_correct is not None:
+            answered_count += 1
+            if is_correct:
+                correct_count += 1
+
+    total_points = round(total_points, 1)
+    earned_points = round(earned_points, 1)
 
     # 4단계 난이도 분포
     diff_dist_4level = {
-        "concept": len([q for q in questions if q.get("difficulty") == "concept"]),
-        "pattern": len([q for q in questions if q.get("difficulty") == "pattern"]),
-        "reasoning": len([q for q in questions if q.get("difficulty") == "reasoning"]),
-        "creative": len([q for q in questions if q.get("difficulty") == "creative"]),
+        key: diff_counts.get(key, 0) for key in ("concept", "pattern", "reasoning", "creative")
     }
 
     # 3단계 난이도 분포 (하위 호환)
-    diff_dist_3level = {
-        "high": len([q for q in questions if q.get("difficulty") == "high"]),
-        "medium": len([q for q in questions if q.get("difficulty") == "medium"]),
-        "low": len([q for q in questions if q.get("difficulty") == "low"]),
-    }
+    diff_dist_3level = {key: diff_counts.get(key, 0) for key in ("high", "medium", "low")}
 
     # 4단계 시스템 감지
     is_4level = sum(diff_dist_4level.values()) > 0
     diff_dist = diff_dist_4level if is_4level else diff_dist_3level
 
-    type_dist = {}
-    for q in questions:
-        qtype = q.get("question_type", "other")
-        type_dist[qtype] = type_dist.get(qtype, 0) + 1
-
-    topic_dist = {}
-    for q in questions:
-        topic = (q.get("topic") or "미분류").split(" > ")[0]
-        topic_dist[topic] = topic_dist.get(topic, 0) + 1
-
     # 평균 난이도
     if is_4level:
         total_diff = sum(diff_dist_4level.values())
@@ -1118,258 +1385,89 @@ def generate_export_html(
             avg_diff = "-"
 
     # 정답률 (답안지인 경우)
-    answered_qs = [q for q in questions if q.get("is_correct") is not None]
-    correct_count = len([q for q in answered_qs if q.get("is_correct")])
-    correct_rate = round((correct_count / len(answered_qs) * 100) if answered_qs else 0)
-    earned_points = round(sum(q.get("earned_points", 0) or 0 for q in questions), 1)
-    is_answered = len(answered_qs) > 0
-
-    # 유형 한글 매핑
-    type_labels = {
-        "calculation": "계산", "geometry": "도형", "application": "응용",
-        "proof": "증명", "graph": "그래프", "statistics": "통계"
+    correct_rate = round((correct_count / answered_count * 100) if answered_count else 0)
+    is_answered = answered_count > 0
+
+    diff_colors = _DIFF_COLORS_4LEVEL if is_4level else _DIFF_COLORS_3LEVEL
+    diff_labels = _DIFF_LABELS_4LEVEL if is_4level else _DIFF_LABELS_3LEVEL
+
+    # 템플릿 컨텍스트 구성 (선택된 섹션에 필요한 값만 계산)
+    context: dict[str, Any] = {
+        "sections": sections,
+        "exam_title": exam_title,
+        "total_questions": total_questions,
+        "total_points": total_points,
+        "earned_points": earned_points,
+        "avg_diff": avg_diff,
+        "correct_rate": correct_rate,
+        "is_answered": is_answered,
     }
 
-    # 난이도 색상
-    diff_colors_4level = {"concept": "#22c55e", "pattern": "#3b82f6", "reasoning": "#f59e0b", "creative": "#dc2626"}
-    diff_colors_3level = {"high": "#dc2626", "medium": "#f59e0b", "low": "#22c55e"}
-    diff_colors = diff_colors_4level if is_4level else diff_colors_3level
-
-    # 난이도 라벨
-    diff_labels_4level = {"concept": "개념", "pattern": "유형", "reasoning": "심화", "creative": "최상위"}
-    diff_labels_3level = {"high": "상", "medium": "중", "low": "하"}
-    diff_labels = diff_labels_4level if is_4level else diff_labels_3level
-
-    # HTML 생성
-    html_parts = ["""<!DOCTYPE html>
-<html lang="ko">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-<title>분석 보고서</title>
-<style>
-* { margin: 0; padding: 0; box-sizing: border-box; }
-body { font-family: 'Pretendard Variable', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; font-size: 9pt; line-height: 1.4; color: #1f2937; background: white; }
-.page { width: 210mm; min-height: 297mm; max-height: 297mm; margin: 0 auto; padding: 10mm; overflow: hidden; }
-.header { text-align: center; border-bottom: 2px solid #4f46e5; padding-bottom: 8px; margin-bottom: 12px; }
-.header h1 { font-size: 18px; color: #312e81; }
-.header .meta { font-size: 10px; color: #6b7280; margin-top: 4px; }
-.two-column { display: flex; gap: 16px; }
-.column { flex: 1; }
-.section-row { display: flex; gap: 8px; margin-bottom: 8px; }
-.section-row .section { flex: 1; margin-bottom: 0; }
-.section { border: 1px solid #e5e7eb; border-radius: 6px; padding: 8px; margin-bottom: 8px; }
-.section-title { font-size: 10px; font-weight: 600; color: #374151; margin-bottom: 6px; }
-.summary-box { background: #eef2ff; border-radius: 6px; padding: 8px; margin-bottom: 8px; }
-.summary-grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; text-align: center; }
-.summary-item .value { font-size: 16px; font-weight: 700; color: #4f46e5; }
-.summary-item .label { font-size: 9px; color: #6b7280; }
-.diff-bar { display: flex; height: 16px; border-radius: 4px; overflow: hidden; margin-bottom: 4px; }
-.diff-bar div { display: flex; align-items: center; justify-content: center; color: white; font-size: 9px; }
-.diff-legend { display: flex; justify-content: space-between; font-size: 9px; color: #6b7280; }
-.type-tags { display: flex; flex-wrap: wrap; gap: 4px; }
-.type-tag { background: #f3f4f6; padding: 2px 6px; border-radius: 4px; font-size: 9px; }
-.topic-list { font-size: 9px; }
-.topic-row { display: flex; justify-content: space-between; padding: 2px 0; }
-.topic-name { color: #6b7280; }
-.topic-count { color: #4f46e5; font-weight: 500; }
-table { width: 100%; border-collapse: collapse; font-size: 9px; }
-th { text-align: left; padding: 4px; border-bottom: 1px solid #e5e7eb; color: #6b7280; font-weight: 500; }
-td { padding: 4px; border-bottom: 1px solid #f3f4f6; }
-.diff-badge { display: inline-block; width: 16px; height: 16px; border-radius: 4px; color: white; text-align: center; line-height: 16px; font-size: 9px; }
-.correct { color: #22c55e; }
-.wrong { color: #dc2626; }
-.score-box { display: flex; align-items: center; justify-content: center; gap: 4px; padding: 8px; }
-.score-earned { font-size: 24px; font-weight: 700; color: #4f46e5; }
-.score-total { font-size: 16px; color: #6b7280; }
-.comments { margin-top: 8px; border-top: 1px solid #e5e7eb; padding-top: 8px; }
-.comment-item { display: flex; gap: 4px; font-size: 9px; margin-bottom: 4px; }
-.comment-num { color: #4f46e5; font-weight: 500; }
-.comment-text { color: #6b7280; }
-.footer { margin-top: auto; padding-top: 8px; border-top: 1px solid #e5e7eb; text-align: center; font-size: 9px; color: #9ca3af; }
-</style>
-</head>
-<body>
-<div class="page">
-"""]
-
     # Header
     if "header" in sections:
         meta_parts = []
         if exam_grade:
             meta_parts.append(exam_grade)
         meta_parts.append(exam_subject)
-        if analyzed_at:
-            try:
-                date_obj = datetime.fromisoformat(analyzed_at.replace("Z", "+00:00").replace("+00:00", ""))
-                meta_parts.append(date_obj.strftime("%Y-%m-%d"))
-            except Exception:
-                pass
-
-        html_parts.append(f"""
-<div class="header">
-<h1>{exam_title}</h1>
-<div class="meta">{" · ".join(meta_parts)}</div>
-</div>
-""")
-
-    # Summary
-    if "summary" in sections:
-        html_parts.append(f"""
-<div class="summary-box">
-<div class="summary-grid">
-<div class="summary-item"><div class="value">{total_questions}</div><div class="label">문항</div></div>
-<div class="summary-item"><div class="value">{total_points}</div><div class="label">총점</div></div>
-<div class="summary-item"><div class="value">{avg_diff}</div><div class="label">난이도</div></div>
-""")
-        if is_answered and "scores" in sections:
-            html_parts.append(f'<div class="summary-item"><div class="value" style="color: #22c55e;">{correct_rate}%</div><div class="label">정답률</div></div>')
-        html_parts.append("</div></div>")
-
-    # Two column layout
-    html_parts.append('<div class="two-column"><div class="column">')
-
-    # Scores (answered only)
-    if "scores" in sections and is_answered:
-        html_parts.append(f"""
-<div class="section">
-<div class="section-title">점수</div>
-<div class="score-box">
-<span class="score-earned">{earned_points}</span>
-<span class="score-total">/ {total_points} 점</span>
-</div>
-</div>
-""")
+        analyzed_date = _format_analyzed_date(analyzed_at)
+        if analyzed_date:
+            meta_parts.append(analyzed_date)
+        context["meta"] = " · ".join(meta_parts)
 
     # Difficulty distribution
     if "difficulty" in sections:
         total = sum(diff_dist.values())
-
-        html_parts.append(f"""
-<div class="section">
-<div class="section-title">난이도 분포</div>
-<div class="diff-bar">
-""")
+        # 4단계: 개념 → 유형 → 심화 → 최상위, 3단계: 하 → 중 → 상
+        bar_keys = ("concept", "pattern", "reasoning", "creative") if is_4level else ("low", "medium", "high")
+        context["diff_bars"] = [
+            ((diff_dist[key] / total * 100) if total > 0 else 0, diff_colors[key], diff_dist[key])
+            for key in bar_keys if diff_dist.get(key, 0) > 0
+        ]
         if is_4level:
-            # 4단계 난이도 바 (개념 → 유형 → 심화 → 최상위)
-            for key in ["concept", "pattern", "reasoning", "creative"]:
-                if diff_dist.get(key, 0) > 0:
-                    pct = (diff_dist[key] / total * 100) if total > 0 else 0
-                    html_parts.append(f'<div style="width: {pct}%; background: {diff_colors[key]};">{diff_dist[key]}</div>')
+            context["diff_legend"] = [
+                (diff_colors[key], diff_labels[key], diff_dist[key])
+                for key in bar_keys if diff_dist.get(key, 0) > 0
+            ]
         else:
-            # 3단계 난이도 바 (하 → 중 → 상)
-            for key in ["low", "medium", "high"]:
-                if diff_dist.get(key, 0) > 0:
-                    pct = (diff_dist[key] / total * 100) if total > 0 else 0
-                    html_parts.append(f'<div style="width: {pct}%; background: {diff_colors[key]};">{diff_dist[key]}</div>')
+            context["diff_legend"] = [(None, diff_labels[key], diff_dist[key]) for key in bar_keys]
 
-        html_parts.append("</div>\n<div class=\"diff-legend\">")
+    # Type distribution
+    if "type" in sections:
+        context["type_tags"] = [
+            (_EXPORT_TYPE_LABELS.get(qtype, qtype), count)
+            for qtype, count in nlargest(6, type_dist.items(), key=itemgetter(1))
+        ]
 
-        if is_4level:
-            for key in ["concept", "pattern", "reasoning", "creative"]:
-                if diff_dist.get(key, 0) > 0:
-                    html_parts.append(f'<span style="color: {diff_colors[key]};">{diff_labels[key]} {diff_dist[key]}</span>')
-        else:
-            html_parts.append(f'<span>하 {diff_dist["low"]}</span>')
-            html_parts.append(f'<span>중 {diff_dist["medium"]}</span>')
-            html_parts.append(f'<span>상 {diff_dist["high"]}</span>')
-
-        html_parts.append("</div>\n</div>\n")
-
-    # Type & Topic distribution (2-column row)
-    if "type" in sections or "topic" in sections:
-        html_parts.append('<div class="section-row">')
-
-        # Type distribution
-        if "type" in sections:
-            html_parts.append("""
-<div class="section">
-<div class="section-title">유형 분포</div>
-<div class="type-tags">
-""")
-            for qtype, count in sorted(type_dist.items(), key=lambda x: -x[1])[:6]:
-                label = type_labels.get(qtype, qtype)
-                html_parts.append(f'<span class="type-tag">{label} {count}</span>')
-            html_parts.append("</div></div>")
-
-        # Topic distribution
-        if "topic" in sections:
-            html_parts.append("""
-<div class="section">
-<div class="section-title">단원 분포</div>
-<div class="topic-list">
-""")
-            for topic, count in sorted(topic_dist.items(), key=lambda x: -x[1])[:5]:
-                html_parts.append(f'<div class="topic-row"><span class="topic-name">{topic}</span><span class="topic-count">{count}</span></div>')
-            html_parts.append("</div></div>")
-
-        html_parts.append('</div>')  # Close section-row
-
-    html_parts.append('</div><div class="column">')
+    # Topic distribution
+    if "topic" in sections:
+        context["topic_rows"] = nlargest(5, topic_dist.items(), key=itemgetter(1))
 
     # Questions table
     if "questions" in sections:
-        html_parts.append("""
-<div class="section">
-<div class="section-title">문항별 분석</div>
-<table>
-<thead><tr>
-<th>번호</th>
-<th style="text-align: center;">난이도</th>
-<th style="text-align: center;">배점</th>
-<th>단원</th>
-""")
-        if is_answered:
-            html_parts.append('<th style="text-align: center;">정답</th>')
-        html_parts.append("</tr></thead><tbody>")
-
-        for q in questions[:20]:
-            diff = q.get("difficulty", "pattern" if is_4level else "medium")
-            diff_label = diff_labels.get(diff, diff)
-            topic = (q.get("topic") or "-").split(" > ")[-1]
-
-            html_parts.append(f"""
-<tr>
-<td style="font-weight: 500;">{q.get("question_number", "-")}</td>
-<td style="text-align: center;"><span class="diff-badge" style="background: {diff_colors.get(diff, '#6b7280')};">{diff_label}</span></td>
-<td style="text-align: center; color: #6b7280;">{q.get("points", "-")}</td>
-<td style="max-width: 80px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; color: #6b7280;">{topic}</td>
-""")
-            if is_answered:
-                is_correct = q.get("is_correct")
-                if is_correct is True:
-                    html_parts.append('<td style="text-align: center;" class="correct">O</td>')
-                elif is_correct is False:
-                    html_parts.append('<td style="text-align: center;" class="wrong">X</td>')
-                else:
-                    html_parts.append('<td style="text-align: center; color: #9ca3af;">-</td>')
-            html_parts.append("</tr>")
-
-        html_parts.append("</tbody></table>")
-        if len(questions) > 20:
-            html_parts.append(f'<div style="text-align: center; font-size: 9px; color: #9ca3af; margin-top: 4px;">... 외 {len(questions) - 20}문항</div>')
-        html_parts.append("</div>")
-
-    html_parts.append('</div></div>')  # Close two columns
-
-    # Comments
+        question_rows = []
+        append_row = question_rows.append
+        diff_colors_get = diff_colors.get
+        diff_labels_get = diff_labels.get
+        default_diff = "pattern" if is_4level else "medium"
+        for q in questions[:_EXPORT_MAX_QUESTION_ROWS]:
+            get = q.get
+            diff = get("difficulty", default_diff)
+            append_row({
+                "number": get("question_number", "-"),
+                "diff_color": diff_colors_get(diff, "#6b7280"),
+                "diff_label": diff_labels_get(diff, diff),
+                "points": get("points", "-"),
+                "topic": split_topic(topic)[1] if (topic := get("topic")) else "-",
+                "is_correct": get("is_correct"),
+            })
+        context["question_rows"] = question_rows
+        context["hidden_questions"] = max(len(questions) - _EXPORT_MAX_QUESTION_ROWS, 0)
+
+    # Comments (앞에서부터 필요한 개수만 찾고 중단)
     if "comments" in sections:
-        comments = [q for q in questions if q.get("ai_comment")][:3]
-        if comments:
-            html_parts.append("""
-<div class="comments">
-<div class="section-title">AI 분석 코멘트</div>
-""")
-            for q in comments:
-                html_parts.append(f'<div class="comment-item"><span class="comment-num">{q.get("question_number")}번:</span><span class="comment-text">{q.get("ai_comment", "")}</span></div>')
-            html_parts.append("</div>")
-
-    # Footer
-    html_parts.append("""
-<div class="footer">Powered by AI 시험지 분석</div>
-</div>
-</body>
-</html>
-""")
-
-    return "".join(html_parts)
+        context["comments"] = list(islice(
+            ((q.get("question_number"), q["ai_comment"]) for q in questions if q.get("ai_comment")),
+            _EXPORT_MAX_COMMENTS,
+        ))
+
+    return context
@@ -1,14 +1,14 @@
 """Exam API endpoints using Supabase REST API."""
-import math
+import logging
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
-from pydantic import BaseModel
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, Response, UploadFile, status
+from pydantic import BaseModel, ValidationError
 
 from app.core.deps import CurrentUser, DbDep
+from app.core.etag import compute_etag, etag_matches, not_modified
 from app.db.supabase_client import SupabaseClient
 from app.schemas.exam import (
-    AnalysisBrief,
     ExamBase,
     ExamCreateRequest,
     ExamCreateResponse,
@@ -23,8 +23,13 @@ from app.schemas.exam import (
 )
 from app.services.exam import get_exam_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/exams", tags=["exams"])
 
+# 목록은 분석 진행에 따라 바뀌므로 매번 ETag로 재검증
+_LIST_CACHE_CONTROL = "private, no-cache"
+
 
 @router.post(
     "",
@@ -65,29 +70,32 @@ async def upload_exam(
     Returns:
         업로드된 시험지 정보 (AI 자동 분류 결과는 백그라운드에서 업데이트됨)
     """
-    import json
-
-    # Parse exam_scope JSON if provided
-    parsed_exam_scope = None
-    if exam_scope:
-        try:
-            parsed_exam_scope = json.loads(exam_scope)
-        except json.JSONDecodeError:
-            pass  # Invalid JSON, ignore
-
-    # Create request object from form data
-    request = ExamCreateRequest(
-        title=title,
-        subject=subject,
-        grade=grade,
-        unit=unit,
-        category=category,
-        school_name=school_name,
-        school_region=school_region,
-        school_type=school_type,
-        exam_scope=parsed_exam_scope,
-        exam_type=ExamType(exam_type)
-    )
+    # Create request object from form data (exam_scope JSON은 스키마 validator에서 파싱)
+    try:
+        request = ExamCreateRequest(
+            title=title,
+            subject=subject,
+            grade=grade,
+            unit=unit,
+            category=category,
+            school_name=school_name,
+            school_region=school_region,
+            school_type=school_type,
+            exam_scope=exam_scope,
+            exam_type=ExamType(exam_type)
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "code": "INVALID_REQUEST",
+                "message": "요청 값이 올바르지 않습니다.",
+                "details": [
+                    {"field": ".".join(str(loc) for loc in err["loc"]), "reason": err["msg"]}
+                    for err in e.errors()
+                ]
+            }
+        ) from e
 
     # Create exam (AI 분류 없이 즉시 저장 - 속도 최적화)
     # 시험지 유형 분류는 분석 요청 시 수행됨 (analyze_exam_with_patterns)
@@ -98,7 +106,7 @@ async def upload_exam(
         files=files
     )
 
-    print(f"[Upload] Exam {exam['id']} uploaded (AI classification deferred to analysis)")
+    logger.info("[Upload] 시험지 업로드 완료 (AI 분류는 분석 시 수행): %s", exam["id"])
 
     # Convert to response
     exam_base = ExamBase.model_validate(exam)
@@ -115,18 +123,22 @@ async def upload_exam(
     summary="시험지 목록 조회"
 )
 async def get_exams(
+    request: Request,
+    response: Response,
     page: int = 1,
     page_size: int = 20,
     status: ExamStatus | None = None,
     current_user: CurrentUser = None,
     db: DbDep = None,
-) -> ExamListResponse:
+) -> ExamListResponse | Response:
     """시험지 목록을 조회합니다 (페이지네이션).
 
     - **page**: 페이지 번호 (기본값: 1)
     - **page_size**: 페이지 크기 (기본값: 20, 최대: 100)
     - **status**: 상태 필터 (pending, analyzing, completed, failed)
 
+    If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환합니다.
+
     Returns:
         시험지 목록 및 페이지네이션 메타데이터
     """
@@ -138,106 +150,36 @@ async def get_exams(
     if page_size > 100:
         page_size = 100
 
-    # Get exams
     exam_service = get_exam_service(db)
-    exams, total = await exam_service.get_exams(
+
+    # 폴링 클라이언트: 목록 버전 해시만 먼저 조회하여 변경이 없으면 304
+    version = await exam_service.get_exams_version(
+        user_id=current_user["id"],
+        page=page,
+        page_size=page_size,
+        status_filter=status
+    )
+    etag = None
+    if version:
+        etag = compute_etag(version, page, page_size, status.value if status else None)
+        if etag_matches(request, etag):
+            return not_modified(etag, _LIST_CACHE_CONTROL)
+
+    # Get exams with analysis briefs for completed exams (DB 함수 1회 왕복)
+    exams, total = await exam_service.get_exams_with_briefs(
         user_id=current_user["id"],
         page=page,
         page_size=page_size,
         status_filter=status
     )
 
-    # Get analysis briefs for completed exams
-    completed_exam_ids = [str(e["id"]) for e in exams if e.get("status") == "completed"]
-    analysis_map: dict[str, AnalysisBrief] = {}
-
-    if completed_exam_ids:
-        # Query analysis results for completed exams in a single batch query (N+1 fix)
-        results = await db.table("analysis_results").select("*").in_("exam_id", completed_exam_ids).execute()
-
-        for analysis in (results.data or []):
-            exam_id = str(analysis.get("exam_id"))
-            questions = analysis.get("questions") or []
-            total_questions = len(questions)
-            # 부동소수점 오류 방지: 소수점 1자리까지 반올림
-            total_points = round(sum(q.get("points", 0) or 0 for q in questions), 1)
-
-            # Calculate confidence
-            confidences = [q.get("confidence") for q in questions if q.get("confidence") is not None]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else None
-
-            # 배점 검증 기반 신뢰도 페널티 적용 (섹션 구분 시험지 예외 처리)
-            if avg_confidence is not None:
-                points_diff = abs(100 - total_points)
-
-                # 섹션 구분 시험지 감지 (예: 객관식 100점 + 서술형 100점 = 200점)
-                is_sectioned_exam = False
-                if total_points % 100 == 0 and total_points >= 200:
-                    # 문항 유형별 배점 합계 계산
-                    essay_points = sum(q.get("points", 0) for q in questions if q.get("question_format") == "essay")
-                    non_essay_points = sum(q.get("points", 0) for q in questions if q.get("question_format") != "essay")
-
-                    # 각 섹션이 100의 배수로 명확히 구분되면 정상 시험지로 간주
-                    if (essay_points % 100 == 0 and essay_points >= 100) or \
-                       (non_essay_points % 100 == 0 and non_essay_points >= 100):
-                        is_sectioned_exam = True
-
-                # 섹션 구분 시험지는 페널티 면제
-                if is_sectioned_exam:
-                    pass
-                elif points_diff <= 5:
-                    # 95~105점: 페널티 없음
-                    pass
-                elif points_diff <= 15:
-                    # 85~94점 또는 106~115점: 20% 감소
-                    avg_confidence *= 0.8
-                elif points_diff <= 25:
-                    # 75~84점 또는 116~125점: 40% 감소
-                    avg_confidence *= 0.6
-                elif points_diff <= 50:
-                    # 50~74점 또는 126~150점: 60% 감소
-                    avg_confidence *= 0.4
-                else:
-                    # 50점 미만 또는 150점 초과: 80% 감소 (거의 확실한 오분석)
-                    avg_confidence *= 0.2
-
-            # Calculate difficulty distribution (4단계 + 3단계 하위호환)
-            # 4단계 시스템
-            diff_concept = sum(1 for q in questions if q.get("difficulty") == "concept")
-            diff_pattern = sum(1 for q in questions if q.get("difficulty") == "pattern")
-            diff_reasoning = sum(1 for q in questions if q.get("difficulty") == "reasoning")
-            diff_creative = sum(1 for q in questions if q.get("difficulty") == "creative")
-
-            # 3단계 시스템 (하위 호환)
-            diff_high = sum(1 for q in questions if q.get("difficulty") == "high")
-            diff_medium = sum(1 for q in questions if q.get("difficulty") == "medium")
-            diff_low = sum(1 for q in questions if q.get("difficulty") == "low")
-
-            # Calculate format distribution (서술형 개수)
-            format_essay = sum(1 for q in questions if q.get("question_format") == "essay")
-
-            analysis_map[exam_id] = AnalysisBrief(
-                total_questions=total_questions,
-                total_points=total_points,
-                avg_confidence=avg_confidence,
-                difficulty_concept=diff_concept,
-                difficulty_pattern=diff_pattern,
-                difficulty_reasoning=diff_reasoning,
-                difficulty_creative=diff_creative,
-                difficulty_high=diff_high,
-                difficulty_medium=diff_medium,
-                difficulty_low=diff_low,
-                format_essay=format_essay,
-            )
-
-    # Convert to response with briefs
-    exam_list = []
-    for exam in exams:
-        exam_with_brief = ExamWithBrief.model_validate(exam)
-        exam_with_brief.analysis_brief = analysis_map.get(str(exam["id"]))
-        exam_list.append(exam_with_brief)
-
-    total_pages = math.ceil(total / page_size) if total > 0 else 0
+    exam_list = [ExamWithBrief.model_validate(exam) for exam in exams]
+
+    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = _LIST_CACHE_CONTROL
 
     return ExamListResponse(
         data=exam_list,
@@ -40,6 +40,9 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str | None = None
     SUPABASE_SERVICE_ROLE_KEY: str | None = None
     SUPABASE_JWT_SECRET: str | None = None  # Supabase Auth JWT 검증용
+    SUPABASE_MAX_CONCURRENCY: int = 100  # 프로세스당 동시 REST 요청 상한 (gather 폭주 방지용, 풀 크기 이상 권장)
+    SUPABASE_MAX_CONNECTIONS: int = 100  # HTTP 커넥션 풀 크기 (httpx 기본값)
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS: int = 20  # 유휴 keep-alive 커넥션 수 (httpx 기본값)
 
     # CORS - 쉼표로 구분된 허용 도메인 목록
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:5174,https://math-report.vercel.app"
@@ -1,6 +1,8 @@
 """Dependencies for authentication."""
+import hashlib
 import httpx
 import logging
+import time
 from typing import Annotated, Optional
 
 from fastapi import Depends, HTTPException, Request, status
@@ -10,6 +12,7 @@ from jose.exceptions import JWTError, JWKError
 
 from app.core.config import settings
 from app.db.supabase_client import SupabaseClient, get_supabase
+from app.services.agents import AnalysisOrchestrator, get_orchestrator
 from app.services.auth import UserDict, get_or_create_user_from_supabase
 from app.services.security_logger import get_security_logger
 
@@ -21,6 +24,16 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=F
 # JWKS 캐시 (앱 시작 시 한 번만 로드)
 _jwks_cache: dict | None = None
 
+# Supabase JWT 검증 파라미터 (요청마다 새로 만들지 않도록 모듈 상수로 유지)
+_ES256_ALGORITHMS = ("ES256",)
+_HS256_ALGORITHMS = ("HS256",)
+_TOKEN_AUDIENCE = "authenticated"
+_DECODE_OPTIONS = {"verify_aud": True}
+
+# 검증된 JWT 페이로드 캐시 (토큰 SHA-256 -> payload, exp까지 유효)
+_verified_token_cache: dict[bytes, dict] = {}
+_VERIFIED_TOKEN_CACHE_MAX = 10_000
+
 
 def get_db() -> SupabaseClient:
     """Get database client (Supabase REST API)."""
@@ -31,6 +44,14 @@ def get_db() -> SupabaseClient:
 DbDep = Annotated[SupabaseClient, Depends(get_db)]
 
 
+def get_orchestrator_dep(db: DbDep) -> AnalysisOrchestrator:
+    """확장 분석 오케스트레이터 (db 인스턴스별 싱글톤)."""
+    return get_orchestrator(db)
+
+
+OrchestratorDep = Annotated[AnalysisOrchestrator, Depends(get_orchestrator_dep)]
+
+
 async def get_supabase_jwks() -> dict:
     """Supabase JWKS(JSON Web Key Set) 가져오기."""
     global _jwks_cache
@@ -78,6 +99,77 @@ def get_signing_key(jwks: dict, token: str) -> str:
         raise
 
 
+def _get_verified_payload(token_hash: bytes) -> dict | None:
+    """검증 캐시에서 페이로드 조회 (만료된 토큰은 제거 후 None)."""
+    payload = _verified_token_cache.get(token_hash)
+    if payload is None:
+        return None
+    exp = payload.get("exp")
+    if exp is None or exp <= time.time():
+        _verified_token_cache.pop(token_hash, None)
+        return None
+    return payload
+
+
+def _set_verified_payload(token_hash: bytes, payload: dict) -> None:
+    """검증된 페이로드 저장 (용량 초과 시 가장 오래된 항목부터 삭제)."""
+    if len(_verified_token_cache) >= _VERIFIED_TOKEN_CACHE_MAX:
+        _verified_token_cache.pop(next(iter(_verified_token_cache)))
+    _verified_token_cache[token_hash] = payload
+
+
+async def verify_supabase_token(token: str) -> dict:
+    """Supabase JWT 서명/만료/audience 검증 후 페이로드 반환.
+
+    같은 토큰은 요청마다 반복 전송되므로 검증된 페이로드를 토큰 해시 기준으로
+    만료 시각(exp)까지 캐시하여 서명 검증과 디코딩을 생략합니다.
+
+    Raises:
+        JWTError: 서명/만료/audience 검증 실패
+        JWKError: ES256 서명 키를 찾지 못한 경우
+    """
+    token_hash = hashlib.sha256(token.encode()).digest()
+    cached = _get_verified_payload(token_hash)
+    if cached is not None:
+        return cached
+
+    # JWT 헤더 확인
+    unverified_header = jwt.get_unverified_header(token)
+    alg = unverified_header.get("alg")
+    logger.debug(f"[AUTH] Token algorithm: {alg}")
+
+    if alg == "ES256":
+        # ES256: JWKS 사용하여 검증
+        jwks = await get_supabase_jwks()
+        signing_key = get_signing_key(jwks, token)
+
+        payload = jwt.decode(
+            token,
+            signing_key,
+            algorithms=_ES256_ALGORITHMS,
+            audience=_TOKEN_AUDIENCE,
+            options=_DECODE_OPTIONS,
+        )
+        logger.debug("[AUTH] ES256 JWT verified successfully")
+
+    else:
+        # HS256: 기존 방식 (JWT Secret 사용)
+        jwt_secret = settings.SUPABASE_JWT_SECRET or settings.SECRET_KEY
+        logger.debug(f"[AUTH] Using HS256 with secret (length: {len(jwt_secret)})")
+
+        payload = jwt.decode(
+            token,
+            jwt_secret,
+            algorithms=_HS256_ALGORITHMS,
+            audience=_TOKEN_AUDIENCE,
+            options=_DECODE_OPTIONS,
+        )
+        logger.debug("[AUTH] HS256 JWT verified successfully")
+
+    _set_verified_payload(token_hash, payload)
+    return payload
+
+
 async def get_current_user(
     request: Request,
     db: DbDep,
@@ -98,38 +190,7 @@ async def get_current_user(
         raise credentials_exception
 
     try:
-        # JWT 헤더 확인
-        unverified_header = jwt.get_unverified_header(token)
-        alg = unverified_header.get("alg")
-        logger.debug(f"[AUTH] Token algorithm: {alg}")
-
-        if alg == "ES256":
-            # ES256: JWKS 사용하여 검증
-            jwks = await get_supabase_jwks()
-            signing_key = get_signing_key(jwks, token)
-
-            payload = jwt.decode(
-                token,
-                signing_key,
-                algorithms=["ES256"],
-                audience="authenticated",
-                options={"verify_aud": True}
-            )
-            logger.debug("[AUTH] ES256 JWT verified successfully")
-
-        else:
-            # HS256: 기존 방식 (JWT Secret 사용)
-            jwt_secret = settings.SUPABASE_JWT_SECRET or settings.SECRET_KEY
-            logger.debug(f"[AUTH] Using HS256 with secret (length: {len(jwt_secret)})")
-
-            payload = jwt.decode(
-                token,
-                jwt_secret,
-                algorithms=["HS256"],
-                audience="authenticated",
-                options={"verify_aud": True}
-            )
-            logger.debug("[AUTH] HS256 JWT verified successfully")
+        payload = await verify_supabase_token(token)
 
         # Supabase JWT에서 사용자 정보 추출
         user_id: str = payload.get("sub")
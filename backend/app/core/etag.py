@@ -0,0 +1,33 @@
+"""ETag 조건부 GET 유틸리티."""
+
+import hashlib
+import json
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+def compute_etag(*parts: Any) -> str:
+    """DB 원본 데이터 기반 약한 ETag 생성 (Pydantic 검증 전 단계에서 계산)."""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 헤더가 현재 ETag와 일치하는지 확인."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """304 Not Modified 응답."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,27 @@
+"""ID generation utilities."""
+
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """시간 순서 UUID(v7) 생성 (RFC 9562).
+
+    상위 48비트가 밀리초 타임스탬프라 새 ID가 인덱스 끝에 모여
+    랜덤 UUID(v4) 대비 B-tree 페이지 분할/쓰기 증폭이 적다.
+    """
+    if hasattr(uuid, "uuid7"):  # Python 3.14+
+        return uuid.uuid7()
+
+    unix_ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    rand_a = rand >> 62 & 0x0FFF
+    rand_b = rand & 0x3FFF_FFFF_FFFF_FFFF
+
+    value = (unix_ts_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76  # version
+    value |= rand_a << 64
+    value |= 0b10 << 62  # variant
+    value |= rand_b
+    return uuid.UUID(int=value)
@@ -0,0 +1,17 @@
+"""Supabase REST 호출 동시성 제한."""
+
+import asyncio
+from functools import cache
+
+from app.core.config import settings
+
+
+@cache
+def get_supabase_semaphore() -> asyncio.Semaphore:
+    """Supabase 요청 동시 실행 수 제한 세마포어 (프로세스당 1개).
+
+    asyncio.gather로 여러 조회를 한꺼번에 병렬화할 때 요청이 무제한으로
+    쌓이지 않도록 하는 상한이다. 모든 요청이 거치므로 기본값은 HTTP 커넥션
+    풀 크기(SUPABASE_MAX_CONNECTIONS) 이상으로 두어 평상시 처리량을 제한하지 않는다.
+    """
+    return asyncio.Semaphore(settings.SUPABASE_MAX_CONCURRENCY)
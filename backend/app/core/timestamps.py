@@ -0,0 +1,12 @@
+"""Timestamp utilities."""
+
+from datetime import UTC, datetime
+
+
+def utc_now_iso() -> str:
+    """현재 UTC 시각의 ISO 8601 문자열 (오프셋 "+00:00" 포함).
+
+    datetime.utcnow()는 오프셋 없는 naive 값을 반환하므로(3.12부터 deprecated)
+    DB/응답 타임스탬프는 이 함수로 생성합니다.
+    """
+    return datetime.now(UTC).isoformat()
@@ -49,9 +49,18 @@ else:
     else:
         connect_args = {}
 
+# 연결 풀 (비동기 엔진 기본 풀은 AsyncAdaptedQueuePool)
+# - 기본값(5 + overflow 10)은 동시 요청이 몰리면 풀 대기 타임아웃 발생
+# - pre_ping/recycle로 Pooler 측에서 끊긴 연결 재사용 방지
+# - SQL 로그 출력(echo)은 요청마다 I/O를 유발하므로 비활성화
 engine = create_async_engine(
     database_url,
-    echo=True,
+    echo=False,
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
     connect_args=connect_args,
 )
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -1,9 +1,20 @@
 """Supabase REST API Client for database operations."""
 import httpx
+import orjson
 from typing import Any, Optional
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.supabase_concurrency import get_supabase_semaphore
+
+
+class SupabaseAPIError(Exception):
+    """PostgREST 오류 응답 (QueryResult.raise_for_error에서 발생)"""
+
+    def __init__(self, error: dict, status_code: int):
+        self.error = error
+        self.status_code = status_code
+        super().__init__(error.get("message") or str(error))
 
 
 class SupabaseClient:
@@ -31,9 +42,22 @@ class SupabaseClient:
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create async HTTP client."""
         if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=30.0)
+            # 커넥션 풀은 동시 실행 세마포어와 별도로 설정 (세마포어가 풀보다 작으면 전체 처리량 상한이 됨)
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=settings.SUPABASE_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
         return self._client
 
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """동시 실행 수 제한(세마포어) 안에서 HTTP 요청 전송."""
+        http_client = await self._get_client()
+        async with get_supabase_semaphore():
+            return await http_client.request(method, url, **kwargs)
+
     async def close(self):
         """Close the HTTP client."""
         if self._client and not self._client.is_closed:
@@ -43,6 +67,10 @@ class SupabaseClient:
         """Start a query on a table."""
         return TableQuery(self, table_name)
 
+    def rpc(self, function_name: str, params: dict | None = None) -> "RpcQuery":
+        """Call a PostgreSQL function (POST /rpc/{function_name})."""
+        return RpcQuery(self, function_name, params or {})
+
 
 class TableQuery:
     """PostgREST 스타일 테이블 쿼리 빌더"""
@@ -116,8 +144,13 @@ class TableQuery:
         self._filters.append(f"{column}=in.({values_str})")
         return self
 
+    def or_(self, filters: str) -> "TableQuery":
+        """Filter: any of the comma-separated PostgREST filters matches."""
+        self._filters.append(f"or=({filters})")
+        return self
+
     def order(self, column: str, desc: bool = False, nullsfirst: bool = False) -> "TableQuery":
-        """Order by column."""
+        """Order by column (여러 번 호출하면 호출 순서대로 정렬 기준 추가)."""
         order_str = column
         if desc:
             order_str += ".desc"
@@ -125,7 +158,7 @@ class TableQuery:
             order_str += ".asc"
         if nullsfirst:
             order_str += ".nullsfirst"
-        self._order = order_str
+        self._order = f"{self._order},{order_str}" if self._order else order_str
         return self
 
     def limit(self, count: int) -> "TableQuery":
@@ -176,16 +209,20 @@ class TableQuery:
 
     async def execute(self) -> "QueryResult":
         """Execute the SELECT query."""
-        client = await self.client._get_client()
         url = self._build_url()
 
-        response = await client.get(url, headers=self.client.headers)
+        response = await self.client.request("GET", url, headers=self.client.headers)
 
         return QueryResult(response, single=self._single)
 
-    def insert(self, data: dict | list[dict]) -> "InsertQuery":
-        """Insert data into table. Chain with .execute() to run."""
-        return InsertQuery(self.client, self.table_name, data)
+    def insert(
+        self, data: dict | list[dict], returning: str = "representation"
+    ) -> "InsertQuery":
+        """Insert data into table. Chain with .execute() to run.
+
+        returning="minimal"이면 삽입된 행을 응답으로 받지 않습니다 (data는 None).
+        """
+        return InsertQuery(self.client, self.table_name, data, returning)
 
     def update(self, data: dict) -> "UpdateQuery":
         """Update matching rows. Chain with .execute() to run."""
@@ -213,10 +250,17 @@ class TableQuery:
 class InsertQuery:
     """INSERT 쿼리 빌더"""
 
-    def __init__(self, client: SupabaseClient, table_name: str, data: dict | list[dict]):
+    def __init__(
+        self,
+        client: SupabaseClient,
+        table_name: str,
+        data: dict | list[dict],
+        returning: str = "representation",
+    ):
         self.client = client
         self.table_name = table_name
         self.data = data
+        self.returning = returning
 
     def _convert_dates(self, data: dict) -> dict:
         result = {}
@@ -229,7 +273,6 @@ class InsertQuery:
 
     async def execute(self) -> "QueryResult":
         """Execute INSERT query."""
-        http_client = await self.client._get_client()
         url = f"{self.client.rest_url}/{self.table_name}"
 
         data = self.data
@@ -238,7 +281,11 @@ class InsertQuery:
         elif isinstance(data, list):
             data = [self._convert_dates(d) for d in data]
 
-        response = await http_client.post(url, headers=self.client.headers, json=data)
+        headers = self.client.headers
+        if self.returning != "representation":
+            headers = {**headers, "Prefer": f"return={self.returning}"}
+
+        response = await self.client.request("POST", url, headers=headers, json=data)
         return QueryResult(response, single=isinstance(self.data, dict))
 
 
@@ -269,10 +316,9 @@ class UpdateQuery:
 
     async def execute(self) -> "QueryResult":
         """Execute UPDATE query."""
-        http_client = await self.client._get_client()
         url = self._build_url()
         data = self._convert_dates(self.data)
-        response = await http_client.patch(url, headers=self.client.headers, json=data)
+        response = await self.client.request("PATCH", url, headers=self.client.headers, json=data)
         return QueryResult(response, single=self._single)
 
 
@@ -293,12 +339,26 @@ class DeleteQuery:
 
     async def execute(self) -> "QueryResult":
         """Execute DELETE query."""
-        http_client = await self.client._get_client()
         url = self._build_url()
-        response = await http_client.delete(url, headers=self.client.headers)
+        response = await self.client.request("DELETE", url, headers=self.client.headers)
         return QueryResult(response, single=self._single)
 
 
+class RpcQuery:
+    """RPC(PostgreSQL 함수) 호출 빌더"""
+
+    def __init__(self, client: SupabaseClient, function_name: str, params: dict):
+        self.client = client
+        self.function_name = function_name
+        self.params = params
+
+    async def execute(self) -> "QueryResult":
+        """Execute RPC call."""
+        url = f"{self.client.rest_url}/rpc/{self.function_name}"
+        response = await self.client.request("POST", url, headers=self.client.headers, json=self.params)
+        return QueryResult(response)
+
+
 class UpsertQuery:
     """UPSERT 쿼리 빌더"""
 
@@ -319,7 +379,6 @@ class UpsertQuery:
 
     async def execute(self) -> "QueryResult":
         """Execute UPSERT query."""
-        http_client = await self.client._get_client()
         url = f"{self.client.rest_url}/{self.table_name}"
 
         headers = {**self.client.headers}
@@ -331,7 +390,7 @@ class UpsertQuery:
         elif isinstance(data, list):
             data = [self._convert_dates(d) for d in data]
 
-        response = await http_client.post(url, headers=headers, json=data)
+        response = await self.client.request("POST", url, headers=headers, json=data)
         return QueryResult(response, single=isinstance(self.data, dict))
 
 
@@ -355,7 +414,8 @@ class QueryResult:
                 self._error = {"message": self.response.text}
         else:
             try:
-                data = self.response.json()
+                # 분석 결과(questions 등) 응답이 크므로 stdlib json 대신 orjson으로 디코딩
+                data = orjson.loads(self.response.content)
                 if self._single and isinstance(data, list):
                     self._data = data[0] if data else None
                 else:
@@ -373,6 +433,12 @@ class QueryResult:
         """Get the error if any."""
         return self._error
 
+    def raise_for_error(self) -> "QueryResult":
+        """오류 응답이면 SupabaseAPIError 발생, 아니면 self 반환 (체이닝용)."""
+        if self._error is not None:
+            raise SupabaseAPIError(self._error, self.response.status_code)
+        return self
+
     @property
     def count(self) -> int:
         """Get the count of results."""
@@ -3,7 +3,7 @@ import logging
 import traceback
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.api.v1 import auth, exam, users, analysis, subscription, ai_learning, pattern, reference, admin, trends
@@ -44,7 +44,7 @@ class ErrorHandlingMiddleware(BaseHTTPMiddleware):
             return response
 
 
-app = FastAPI(title="API", version="0.1.0")
+app = FastAPI(title="API", version="0.1.0", default_response_class=ORJSONResponse)
 
 # Add error handling middleware FIRST (outermost)
 app.add_middleware(ErrorHandlingMiddleware)
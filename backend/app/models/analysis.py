@@ -2,7 +2,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, JSON
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, String, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -26,6 +26,15 @@ class AnalysisResult(Base):
     file_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     total_questions: Mapped[int] = mapped_column(default=0)
     model_version: Mapped[str] = mapped_column(String(50), default="mock-v1")
+    # exams.exam_type 복사본 (DB 트리거로 동기화, 시험지 재조회 없이 유형 확인)
+    exam_type: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    # 문항 점수 합계 (저장/정오답 수정 시 계산)
+    current_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    total_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # 문항 분석 신뢰도 평균 (재분석 판단 시 문항 JSON 조회 없이 확인)
+    avg_confidence: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # 행 버전 (UPDATE 시 DB 트리거로 증가, 워커별 행 캐시 재검증용)
+    row_version: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
 
     # JSON Data (Complex structures)
     # summary: {
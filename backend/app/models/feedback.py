@@ -1,10 +1,10 @@
 """Feedback model for collecting user feedback on analysis."""
-import uuid
 from datetime import datetime
 
 from sqlalchemy import DateTime, String, Text, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.ids import uuid7
 from app.db.base import Base
 
 
@@ -12,7 +12,7 @@ class Feedback(Base):
     __tablename__ = "feedbacks"
 
     id: Mapped[str] = mapped_column(
-        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+        String(36), primary_key=True, default=lambda: str(uuid7())
     )
     user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
     analysis_id: Mapped[str] = mapped_column(String(36), ForeignKey("analysis_results.id"), nullable=False)
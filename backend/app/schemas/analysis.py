@@ -684,6 +684,16 @@ class ExamPrepStrategyResponse(BaseModel):
     generated_at: datetime | str
 
 
+class AnalysisPlansResponse(BaseModel):
+    """학습 전략/계획 일괄 생성 응답 (대시보드용)"""
+    analysis_id: str | UUID
+    topic_strategies: TopicStrategiesResponse
+    score_level_plan: ScoreLevelPlanResponse | None = Field(
+        None, description="점수대별 학습 계획 (배점 정보가 없으면 null)"
+    )
+    exam_prep_strategy: ExamPrepStrategyResponse
+
+
 # --- 성과 예측 ---
 
 class DifficultyHandling(BaseModel):
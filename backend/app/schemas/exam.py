@@ -11,7 +11,8 @@ from datetime import datetime
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 # ============================================
 # Enums
@@ -68,6 +69,19 @@ class ExamCreateRequest(BaseModel):
         description="시험지 유형 (blank: 빈 시험지, student: 학생 답안지)"
     )
 
+    @field_validator("exam_scope", mode="before")
+    @classmethod
+    def parse_exam_scope(cls, v):
+        """multipart 폼의 JSON 배열 문자열을 목록으로 변환 (빈 문자열은 None)"""
+        if isinstance(v, (str, bytes)):
+            if not v.strip():
+                return None
+            try:
+                return orjson.loads(v)
+            except orjson.JSONDecodeError as e:
+                raise ValueError("출제범위는 JSON 배열 형식이어야 합니다") from e
+        return v
+
     model_config = ConfigDict(json_schema_extra={
         "example": {
             "title": "2024년 1학기 중간고사",
@@ -2,11 +2,12 @@
 from .weakness_agent import WeaknessAnalysisAgent
 from .learning_agent import LearningPlanAgent
 from .prediction_agent import PerformancePredictionAgent
-from .orchestrator import AnalysisOrchestrator
+from .orchestrator import AnalysisOrchestrator, get_orchestrator
 
 __all__ = [
     "WeaknessAnalysisAgent",
     "LearningPlanAgent",
     "PerformancePredictionAgent",
     "AnalysisOrchestrator",
+    "get_orchestrator",
 ]
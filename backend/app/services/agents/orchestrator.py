@@ -1,8 +1,12 @@
 """Analysis Orchestrator - 분석 에이전트 오케스트레이터."""
+import logging
 import uuid
 from datetime import datetime
+from functools import cache
 
 from app.db.supabase_client import SupabaseClient
+from app.services.analysis import get_analysis_service
+from app.services.analysis_cache import get_analysis_extension_cache, get_analysis_row_cache
 from app.schemas.analysis import (
     AnalysisExtension as AnalysisExtensionSchema,
     WeaknessProfile,
@@ -13,6 +17,8 @@ from .weakness_agent import WeaknessAnalysisAgent
 from .learning_agent import LearningPlanAgent
 from .prediction_agent import PerformancePredictionAgent
 
+logger = logging.getLogger(__name__)
+
 
 class AnalysisOrchestrator:
     """분석 에이전트 오케스트레이터.
@@ -45,24 +51,17 @@ class AnalysisOrchestrator:
         Returns:
             확장 분석 결과
         """
-        # 1. 기본 분석 조회
-        result = await self.db.table("analysis_results").select("*").eq(
-            "id", analysis_id
-        ).maybe_single().execute()
+        # 1. 기본 분석 + 기존 확장 분석을 한 번에 조회 (v_full_report)
+        basic_analysis, existing_extension = await self.get_analysis_with_extension(
+            analysis_id, user_id
+        )
 
-        if result.error or result.data is None:
+        if basic_analysis is None:
             raise ValueError(f"분석 결과를 찾을 수 없습니다: {analysis_id}")
 
-        basic_analysis = result.data
-
-        # 2. 기존 확장 분석 확인
-        if not force_regenerate:
-            existing = await self.db.table("analysis_extensions").select("*").eq(
-                "analysis_id", analysis_id
-            ).maybe_single().execute()
-
-            if existing.data:
-                return self._to_schema(existing.data)
+        # 2. 기존 확장 분석이 있으면 재사용
+        if existing_extension and not force_regenerate:
+            return existing_extension
 
         # 3. 기본 분석 데이터 준비
         basic_data = {
@@ -72,35 +71,32 @@ class AnalysisOrchestrator:
         }
 
         # 4. 에이전트 순차 실행 (의존성 있음)
-        print(f"[Orchestrator] Starting extended analysis for {analysis_id}")
+        logger.info("[Orchestrator] Starting extended analysis for %s", analysis_id)
 
         # 4.1 취약점 분석
-        print("[Orchestrator] Running weakness analysis...")
+        logger.debug("[Orchestrator] Running weakness analysis...")
         weakness_profile = self.weakness_agent.analyze(basic_data)
 
         # 4.2 학습 계획 생성 (취약점 분석 결과 필요)
-        print("[Orchestrator] Generating learning plan...")
+        logger.debug("[Orchestrator] Generating learning plan...")
         learning_plan = self.learning_agent.generate(basic_data, weakness_profile)
 
         # 4.3 성과 예측 (취약점 + 학습 계획 필요)
-        print("[Orchestrator] Predicting performance...")
+        logger.debug("[Orchestrator] Predicting performance...")
         performance_prediction = self.prediction_agent.predict(
             basic_data, weakness_profile, learning_plan
         )
 
         # 5. 결과 저장
-        print("[Orchestrator] Saving extended analysis...")
+        logger.debug("[Orchestrator] Saving extended analysis...")
 
         # 기존 확장 분석 삭제 (force_regenerate인 경우)
-        if force_regenerate:
-            existing = await self.db.table("analysis_extensions").select("id").eq(
-                "analysis_id", analysis_id
-            ).maybe_single().execute()
-
-            if existing.data:
-                await self.db.table("analysis_extensions").eq(
-                    "id", existing.data["id"]
-                ).delete().execute()
+        extension_cache = get_analysis_extension_cache()
+        if existing_extension:
+            extension_cache.invalidate(analysis_id)
+            await self.db.table("analysis_extensions").eq(
+                "id", existing_extension.id
+            ).delete().execute()
 
         # 새 확장 분석 생성
         extension_id = str(uuid.uuid4())
@@ -124,15 +120,22 @@ class AnalysisOrchestrator:
         if insert_result.error:
             raise ValueError(f"확장 분석 저장 실패: {insert_result.error}")
 
-        print(f"[Orchestrator] Extended analysis saved: {extension_id}")
+        logger.info("[Orchestrator] Extended analysis saved: %s", extension_id)
 
-        return self._to_schema(insert_result.data)
+        extension = self._to_schema(insert_result.data)
+        extension_cache.set(analysis_id, extension, user_id=user_id)
+        return extension
 
     async def get_extended_analysis(
         self,
         analysis_id: str,
     ) -> AnalysisExtensionSchema | None:
-        """저장된 확장 분석 조회."""
+        """저장된 확장 분석 조회 (확장 분석 캐시 우선)."""
+        extension_cache = get_analysis_extension_cache()
+        extension = extension_cache.get(analysis_id)
+        if extension is not None:
+            return extension
+
         result = await self.db.table("analysis_extensions").select("*").eq(
             "analysis_id", analysis_id
         ).maybe_single().execute()
@@ -140,7 +143,54 @@ class AnalysisOrchestrator:
         if result.error or result.data is None:
             return None
 
-        return self._to_schema(result.data)
+        extension = self._to_schema(result.data)
+        extension_cache.set(analysis_id, extension, user_id=result.data.get("user_id"))
+        return extension
+
+    async def get_analysis_with_extension(
+        self,
+        analysis_id: str,
+        user_id: str,
+    ) -> tuple[dict | None, AnalysisExtensionSchema | None]:
+        """기본 분석과 확장 분석을 한 번의 요청으로 조회.
+
+        v_full_report 뷰(analysis_results LEFT JOIN analysis_extensions)를
+        사용하므로 보고서 조회 시 DB 왕복이 1회로 줄어듭니다.
+
+        Returns:
+            (기본 분석 dict, 확장 분석 스키마) 튜플. 기본 분석이 없거나
+            다른 사용자의 분석이면 (None, None)
+        """
+        # 행 캐시와 확장 분석 캐시에 모두 있으면 뷰 조회 생략
+        # (행은 get_analysis가 row_version으로 재검증하고, 수정되었으면 행만 다시 조회)
+        entry = get_analysis_row_cache().get(analysis_id)
+        extension_cache = get_analysis_extension_cache()
+        cached_extension = extension_cache.get(analysis_id)
+        if entry is not None and cached_extension is not None:
+            if entry.row.get("user_id") != user_id:
+                return None, None
+            analysis = await get_analysis_service(self.db).get_analysis(analysis_id, user_id)
+            if analysis is None:
+                return None, None
+            return analysis, cached_extension
+
+        # 단건(id + user_id) 조회 전용. 목록 조회에서 뷰/임베드 조인은 행마다 확장 분석
+        # JSON을 만들어 느려지므로 사용하지 않는다.
+        result = await self.db.table("v_full_report").select("*").eq(
+            "id", analysis_id
+        ).eq("user_id", user_id).maybe_single().execute()
+
+        if result.error or result.data is None:
+            return None, None
+
+        analysis = dict(result.data)
+        ext = analysis.pop("extension", None)
+        if not ext:
+            return analysis, None
+
+        extension = self._to_schema(ext)
+        extension_cache.set(analysis_id, extension, user_id=user_id)
+        return analysis, extension
 
     def _to_schema(self, ext: dict) -> AnalysisExtensionSchema:
         """DB 데이터를 스키마로 변환."""
@@ -165,6 +215,7 @@ class AnalysisOrchestrator:
         )
 
 
+@cache
 def get_orchestrator(db: SupabaseClient) -> AnalysisOrchestrator:
-    """오케스트레이터 인스턴스 생성."""
+    """오케스트레이터 인스턴스 반환 (db 인스턴스별로 재사용)."""
     return AnalysisOrchestrator(db)
@@ -1176,7 +1176,7 @@ class AIEngine:
 
         if file_hash:
             cache_key = compute_analysis_cache_key(file_hash, grade_level, unit)
-            cache.set(cache_key, result)
+            cache.set(cache_key, result, user_id=user_id)
             print(f"[Cache SAVE] {cache_key[:20]}... ({elapsed:.2f}초)")
             print(f"[Cache Stats] {cache.get_stats()}")
 
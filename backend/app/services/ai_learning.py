@@ -6,6 +6,21 @@ import uuid
 
 from app.db.supabase_client import SupabaseClient
 
+# 프로세스 내 피드백 제출 카운터 (자동 학습 DB 확인 빈도 제한용)
+_feedback_counter = 0
+
+
+def record_feedback_for_auto_learn(threshold: int = 10) -> bool:
+    """피드백 1건을 기록하고, threshold건마다 True를 반환합니다.
+
+    True일 때만 check_and_auto_learn을 호출하여 피드백마다 DB를 조회하지 않도록 합니다.
+    실제 임계치 판단은 check_and_auto_learn의 DB 조회가 기준이므로,
+    워커가 여러 개여도 학습 시점이 다소 늦어질 뿐 누락되지는 않습니다.
+    """
+    global _feedback_counter
+    _feedback_counter += 1
+    return _feedback_counter % threshold == 0
+
 
 class LearnedPatternDict(dict):
     """Learned pattern data wrapper."""
@@ -186,11 +201,11 @@ class AILearningService:
         # 중복 체크: 같은 type과 value를 가진 패턴이 있는지 확인
         existing = await self.db.table("learned_patterns").select("*").eq(
             "pattern_type", pattern_type
-        ).eq("pattern_value", pattern_value).execute()
+        ).eq("pattern_value", pattern_value).maybe_single().execute()
 
-        if existing.data and len(existing.data) > 0:
+        if existing.data:
             # 기존 패턴이 있으면 신뢰도가 더 높을 때만 업데이트
-            existing_pattern = existing.data[0]
+            existing_pattern = existing.data
             if confidence > existing_pattern.get("confidence", 0):
                 await self.db.table("learned_patterns").eq("id", existing_pattern["id"]).update({
                     "confidence": confidence,
@@ -230,18 +245,18 @@ class AILearningService:
         # 마지막 분석 시점 확인
         last_analysis_result = await self.db.table("feedback_analyses").select(
             "created_at"
-        ).order("created_at", desc=True).limit(1).execute()
+        ).order("created_at", desc=True).maybe_single().execute()
 
         last_analysis_time = None
         if last_analysis_result.data:
-            last_analysis_time = last_analysis_result.data[0].get("created_at")
+            last_analysis_time = last_analysis_result.data.get("created_at")
 
-        # 마지막 분석 이후 피드백 수 확인
+        # 마지막 분석 이후 피드백 수 확인 (임계치 도달 여부만 필요하므로 threshold개까지만 조회)
         query = self.db.table("feedbacks").select("id")
         if last_analysis_time:
             query = query.gt("created_at", last_analysis_time)
 
-        new_feedbacks_result = await query.execute()
+        new_feedbacks_result = await query.limit(threshold).execute()
         new_feedback_count = len(new_feedbacks_result.data) if new_feedbacks_result.data else 0
 
         print(f"[AutoLearn] 새 피드백 수: {new_feedback_count} (임계치: {threshold})")
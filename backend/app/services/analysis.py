@@ -1,7 +1,12 @@
 """Analysis service for handling AI analysis requests using Supabase REST API."""
+import hashlib
+import json
+import logging
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Any
+from functools import cache
+from typing import Any
 
 from fastapi import HTTPException, status
 
@@ -12,6 +17,14 @@ from app.schemas.analysis import (
     QuestionType
 )
 from app.core.config import settings
+from app.services.analysis_cache import (
+    get_analysis_auth_cache,
+    get_analysis_row_cache,
+    get_exam_cache,
+    invalidate_analysis_caches,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class AnalysisDict(dict):
@@ -26,6 +39,62 @@ class AnalysisDict(dict):
         self[name] = value
 
 
+def compute_score_totals(questions: list[dict]) -> tuple[float, float]:
+    """문항 목록의 (획득 점수 합계, 만점 합계) 계산.
+
+    분석 저장/정오답 수정 시점에 한 번 계산하여 current_score/total_score 컬럼에 보관합니다.
+    """
+    current_score = 0
+    total_score = 0
+    for q in questions:
+        earned = q.get("earned_points")
+        if earned is not None:
+            current_score += earned
+        points = q.get("points")
+        if points is not None and points > 0:
+            total_score += points
+    return current_score, total_score
+
+
+def compute_avg_confidence(questions: list[dict]) -> float | None:
+    """문항 분석 신뢰도 평균 (신뢰도 값이 없으면 None)."""
+    confidences = [q["confidence"] for q in questions if q.get("confidence") is not None]
+    return sum(confidences) / len(confidences) if confidences else None
+
+
+def get_score_totals(analysis: dict) -> tuple[float, float]:
+    """저장된 점수 합계 반환 (컬럼이 비어 있는 이전 행은 문항에서 계산)."""
+    current_score = analysis.get("current_score")
+    total_score = analysis.get("total_score")
+    if current_score is None or total_score is None:
+        return compute_score_totals(analysis.get("questions") or [])
+    return current_score, total_score
+
+
+@dataclass
+class CachedAnalysis:
+    """행 캐시 항목: DB 원본 행 + 최초 요청 시 검증된 스키마/내용 해시"""
+    row: dict
+    schema: AnalysisResultSchema | None = None
+    digest: str | None = None
+
+
+@dataclass(frozen=True)
+class AnalysisAuthContext:
+    """소유권/유형 캐시 항목: 분석 생성 후 바뀌지 않는 값만 보관"""
+    user_id: str
+    exam_id: str | None
+    exam_type: str | None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "AnalysisAuthContext":
+        return cls(
+            user_id=row.get("user_id"),
+            exam_id=row.get("exam_id"),
+            exam_type=row.get("exam_type"),
+        )
+
+
 class AnalysisService:
     """Service for analysis-related business logic."""
 
@@ -64,7 +133,7 @@ class AnalysisService:
 
         # 1.5. Check if already analyzing (prevent duplicate requests)
         if exam.get("status") == "analyzing":
-            print(f"[Analysis] 이미 분석 중: {exam_id}")
+            logger.info("[Analysis] 이미 분석 중: %s", exam_id)
             return {
                 "analysis_id": None,
                 "status": "analyzing",
@@ -72,7 +141,14 @@ class AnalysisService:
             }
 
         # 2. Check if already exists (unless force_reanalyze)
-        existing_result = await self.db.table("analysis_results").select("*").eq("exam_id", exam_id).maybe_single().execute()
+        # 문항 JSON 없이 필요한 스칼라 컬럼만 조회
+        existing_result = await (
+            self.db.table("analysis_results")
+            .select("id,analyzed_at,avg_confidence")
+            .eq("exam_id", exam_id)
+            .maybe_single()
+            .execute()
+        )
         existing = existing_result.data
 
         if not force_reanalyze and existing:
@@ -102,13 +178,14 @@ class AnalysisService:
                     prev_confidence=prev_confidence,
                 )
             except Exception as log_error:
-                print(f"[Analytics Log Error] {log_error}")
+                logger.warning("[Analytics Log Error] %s", log_error)
 
         # 3. Update status to ANALYZING
         await self.db.table("exams").eq("id", exam_id).update({
             "status": "analyzing",
             "updated_at": datetime.utcnow().isoformat()
         }).execute()
+        get_exam_cache().invalidate(exam_id)
 
         # 4. Perform AI Analysis with Pattern System
         from app.services.ai_engine import ai_engine
@@ -134,7 +211,7 @@ class AnalysisService:
 
             # 5. Process & Save Result
             await self.db.table("exams").eq("id", exam_id).update({"analysis_step": 4}).execute()
-            print("[Step 4] 결과 저장 중...")
+            logger.debug("[Step 4] 결과 저장 중...")
             processed_questions = []
             for q in ai_result.get("questions", []):
                 q["id"] = str(uuid.uuid4())
@@ -147,6 +224,7 @@ class AnalysisService:
             analysis_id = str(uuid.uuid4())
             now = datetime.utcnow().isoformat()
 
+            current_score, total_score = compute_score_totals(processed_questions)
             analysis_data = {
                 "id": analysis_id,
                 "exam_id": exam_id,
@@ -156,6 +234,9 @@ class AnalysisService:
                 "model_version": settings.GEMINI_MODEL_NAME,
                 "summary": summary,
                 "questions": processed_questions,
+                "current_score": current_score,
+                "total_score": total_score,
+                "avg_confidence": compute_avg_confidence(processed_questions),
                 "analyzed_at": now,
                 "created_at": now
             }
@@ -163,14 +244,13 @@ class AnalysisService:
             # force_reanalyze인 경우 기존 결과 삭제
             if existing:
                 await self.db.table("analysis_results").eq("id", existing["id"]).delete().execute()
+                self.invalidate_cache(existing["id"])
 
             # Insert new analysis result
-            insert_result = await self.db.table("analysis_results").insert(analysis_data).execute()
-
-            if insert_result.error:
-                raise Exception(f"Failed to save analysis: {insert_result.error}")
+            # 실패 시 SupabaseAPIError → 아래 except에서 시험지 상태를 failed로 처리
+            (await self.db.table("analysis_results").insert(analysis_data).execute()).raise_for_error()
 
-            print(f"[Step 4] 분석 결과 저장 완료: {analysis_id}")
+            logger.info("[Step 4] 분석 결과 저장 완료: %s", analysis_id)
 
             # 6. Update status to COMPLETED + 분석 결과에서 분류 정보 추출
             exam_update = {
@@ -215,6 +295,7 @@ class AnalysisService:
                         exam_update["extracted_grade"] = extracted_grade
 
             await self.db.table("exams").eq("id", exam_id).update(exam_update).execute()
+            get_exam_cache().invalidate(exam_id)
 
             # 7. 자동 레퍼런스 수집 (신뢰도 낮은 문제 + 상 난이도 문제)
             await self._collect_question_references(
@@ -252,7 +333,7 @@ class AnalysisService:
                     }
                 )
             except Exception as log_error:
-                print(f"[Analytics Log Error] {log_error}")
+                logger.warning("[Analytics Log Error] %s", log_error)
 
             # Update status to FAILED
             error_msg = str(e)[:500] if str(e) else "알 수 없는 오류"
@@ -261,10 +342,9 @@ class AnalysisService:
                 "error_message": error_msg,
                 "updated_at": datetime.utcnow().isoformat()
             }).execute()
+            get_exam_cache().invalidate(exam_id)
 
-            import traceback
-            print(f"Analysis failed: {e}")
-            traceback.print_exc()
+            logger.exception("Analysis failed | exam_id=%s", exam_id)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"분석 실패: {str(e)}"
@@ -314,6 +394,7 @@ class AnalysisService:
                 "status": "analyzing",
                 "updated_at": datetime.utcnow().isoformat()
             }).execute()
+            get_exam_cache().invalidate(exam_id)
 
             # 정오답 분석 전용 호출 (최적화 버전 사용)
             # - 배점 기반 검증 (Zero-token)
@@ -337,8 +418,12 @@ class AnalysisService:
 
             # 5. 분석 결과 업데이트 (최적화 통계 포함)
             now = datetime.utcnow().isoformat()
+            current_score, total_score = compute_score_totals(updated_questions)
             update_data = {
                 "questions": updated_questions,
+                "current_score": current_score,
+                "total_score": total_score,
+                "avg_confidence": compute_avg_confidence(updated_questions),
                 "analyzed_at": now,
             }
 
@@ -348,6 +433,7 @@ class AnalysisService:
             update_data["metadata"] = existing_meta
 
             await self.db.table("analysis_results").eq("id", existing_analysis_id).update(update_data).execute()
+            self.invalidate_cache(existing_analysis_id)
 
             # 6. 시험지 상태 업데이트
             await self.db.table("exams").eq("id", exam_id).update({
@@ -355,14 +441,17 @@ class AnalysisService:
                 "has_answer_analysis": True,
                 "updated_at": now
             }).execute()
+            get_exam_cache().invalidate(exam_id)
 
             # 최적화 로그
             if optimization_stats:
-                print(f"[Answer Analysis Optimization]")
-                print(f"  - 점수 기반 해결: {optimization_stats.get('resolved_by_score', 0)}개")
-                print(f"  - 탐지 기반 해결: {optimization_stats.get('resolved_by_detection', 0)}개")
-                print(f"  - AI 분석: {optimization_stats.get('resolved_by_ai', 0)}개")
-                print(f"  - 토큰 절약 추정: {optimization_stats.get('tokens_saved_estimate', 0)}개")
+                logger.info(
+                    "[Answer Analysis Optimization] 점수 기반 %s개, 탐지 기반 %s개, AI 분석 %s개, 토큰 절약 추정 %s개",
+                    optimization_stats.get("resolved_by_score", 0),
+                    optimization_stats.get("resolved_by_detection", 0),
+                    optimization_stats.get("resolved_by_ai", 0),
+                    optimization_stats.get("tokens_saved_estimate", 0),
+                )
 
             return {
                 "analysis_id": existing_analysis_id,
@@ -377,10 +466,9 @@ class AnalysisService:
                 "error_message": f"정오답 분석 실패: {error_msg}",
                 "updated_at": datetime.utcnow().isoformat()
             }).execute()
+            get_exam_cache().invalidate(exam_id)
 
-            import traceback
-            print(f"Answer analysis failed: {e}")
-            traceback.print_exc()
+            logger.exception("Answer analysis failed | exam_id=%s", exam_id)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"정오답 분석 실패: {str(e)}"
@@ -470,24 +558,201 @@ class AnalysisService:
         if references_to_insert:
             await self.db.table("question_references").insert(references_to_insert).execute()
 
-    async def get_analysis(self, analysis_id: str) -> Optional[AnalysisDict]:
-        """Get analysis result by ID."""
-        result = await self.db.table("analysis_results").select("*").eq("id", analysis_id).maybe_single().execute()
+    async def get_analysis(
+        self, analysis_id: str, user_id: str | None = None
+    ) -> AnalysisDict | None:
+        """Get analysis result by ID.
+
+        user_id를 넘기면 소유권 조건을 쿼리에 포함하므로,
+        다른 사용자의 분석은 존재하지 않는 것과 동일하게 None을 반환합니다.
+        조회 결과는 행 캐시에 짧게 보관되며, 캐시 히트 시에도 소유권을 확인합니다.
+        """
+        entry = await self._get_cached_entry(analysis_id, user_id)
+        return AnalysisDict(entry.row) if entry else None
+
+    def get_validated_schema(self, analysis: AnalysisDict) -> AnalysisResultSchema:
+        """분석 행을 AnalysisResult 스키마로 검증합니다.
+
+        행 캐시에 같은 행이 있으면 검증 결과를 항목에 함께 보관하여
+        같은 분석을 다시 조회할 때 Pydantic 검증을 반복하지 않습니다.
+        (nested 값은 캐시 행과 공유되므로 비교는 사실상 최상위 키 수준에서 끝남)
+        캐시에 없거나 다른 경로(v_full_report 등)에서 새로 읽은 행이면
+        검증 후 그 행으로 캐시 항목을 갱신합니다.
+        """
+        entry = self._entry_for_row(analysis)
+        if entry.schema is None:
+            entry.schema = AnalysisResultSchema.model_validate(entry.row)
+        return entry.schema
+
+    def get_row_digest(self, analysis: AnalysisDict) -> str:
+        """분석 행 내용의 해시 (ETag 계산용).
+
+        행 전체 직렬화는 문항이 많을수록 비싸므로 행 캐시 항목에 보관하여
+        폴링 등 반복 조회 시 다시 계산하지 않습니다.
+        행이 수정되면 캐시 항목이 무효화되어 새 해시가 계산됩니다.
+        """
+        entry = self._entry_for_row(analysis)
+        if entry.digest is None:
+            entry.digest = hashlib.blake2b(
+                json.dumps(entry.row, sort_keys=True, default=str).encode(),
+                digest_size=8,
+            ).hexdigest()
+        return entry.digest
+
+    def _entry_for_row(self, analysis: AnalysisDict) -> CachedAnalysis:
+        """행 캐시에서 같은 행의 항목을 찾고, 없거나 내용이 다르면 새 항목으로 갱신."""
+        analysis_id = str(analysis["id"])
+        cache = get_analysis_row_cache()
+        entry = cache.get(analysis_id)
+        if entry is None or entry.row != analysis:
+            entry = CachedAnalysis(row=analysis)
+            cache.set(analysis_id, entry, user_id=analysis.get("user_id"))
+        return entry
+
+    async def _get_cached_entry(
+        self, analysis_id: str, user_id: str | None
+    ) -> CachedAnalysis | None:
+        """행 캐시 조회 후 없거나 DB 행 버전과 다르면 DB에서 조회하여 캐시에 저장.
+
+        캐시는 워커별이므로 히트 시에도 row_version만 조회하여 다른 워커에서의
+        수정(정오답 수정, 총평 저장 등)을 확인합니다. 히트 시에는 문항 JSON 전송과
+        재검증/해시 계산을 생략합니다.
+        """
+        cache = get_analysis_row_cache()
+        entry = cache.get(analysis_id)
+        if entry is not None:
+            if user_id is not None and entry.row.get("user_id") != user_id:
+                return None
+            if await self._is_current(analysis_id, entry):
+                return entry
+            cache.invalidate(analysis_id)
+
+        query = self.db.table("analysis_results").select("*").eq("id", analysis_id)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        result = await query.maybe_single().execute()
 
         if result.error or result.data is None:
             return None
 
-        return AnalysisDict(result.data)
+        owner_id = result.data.get("user_id")
+        entry = CachedAnalysis(row=result.data)
+        cache.set(analysis_id, entry, user_id=owner_id)
+        get_analysis_auth_cache().set(
+            analysis_id, AnalysisAuthContext.from_row(result.data), user_id=owner_id
+        )
+        return entry
+
+    async def _is_current(self, analysis_id: str, entry: CachedAnalysis) -> bool:
+        """캐시 항목의 row_version이 DB 행과 같은지 확인 (행이 없거나 조회 실패 시 False)."""
+        result = await self.db.table("analysis_results").select("row_version").eq(
+            "id", analysis_id
+        ).maybe_single().execute()
+
+        if result.error or result.data is None:
+            return False
+        return result.data.get("row_version") == entry.row.get("row_version")
+
+    def invalidate_cache(self, analysis_id: str) -> None:
+        """분석 결과 행이 변경/삭제될 때 행/소유권 캐시에서 제거."""
+        invalidate_analysis_caches(str(analysis_id))
+
+    async def get_auth_context(self, analysis_id: str) -> AnalysisAuthContext | None:
+        """분석의 소유자/시험지 정보 조회 (소유권 캐시 → 행 캐시 → DB 순)."""
+        auth_cache = get_analysis_auth_cache()
+        context = auth_cache.get(analysis_id)
+        if context is not None:
+            return context
+
+        entry = get_analysis_row_cache().get(analysis_id)
+        if entry is not None:
+            context = AnalysisAuthContext.from_row(entry.row)
+        else:
+            result = await self.db.table("analysis_results").select(
+                "user_id,exam_id,exam_type"
+            ).eq("id", analysis_id).maybe_single().execute()
+
+            if result.error or result.data is None:
+                return None
+            context = AnalysisAuthContext.from_row(result.data)
+
+        auth_cache.set(analysis_id, context, user_id=context.user_id)
+        return context
+
+    async def exists_for_user(self, analysis_id: str, user_id: str) -> bool:
+        """사용자 소유의 분석 결과가 존재하는지 확인 (소유권 캐시 사용)."""
+        context = await self.get_auth_context(analysis_id)
+        return context is not None and context.user_id == user_id
+
+    async def patch_answers(
+        self, analysis_id: str, user_id: str, updates: dict[str, bool | None]
+    ) -> dict:
+        """정오답 수동 수정 (fn_patch_answers RPC 1회).
 
-    async def get_analysis_by_exam(self, exam_id: str) -> Optional[AnalysisDict]:
-        """Get analysis result by Exam ID."""
-        result = await self.db.table("analysis_results").select("*").eq("exam_id", exam_id).maybe_single().execute()
+        소유권 확인, 대상 문항의 is_correct/earned_points 변경, 점수 합계 갱신을
+        DB 함수에서 한 번에 처리한다.
+
+        Returns:
+            {"code": "ok" | "not_found" | "forbidden", "updated_count": int}
+        """
+        result = await self.db.rpc(
+            "fn_patch_answers",
+            {"p_analysis_id": analysis_id, "p_user_id": user_id, "p_updates": updates},
+        ).execute()
+        result.raise_for_error()
+
+        patched = result.data[0] if isinstance(result.data, list) else result.data
+        if patched["updated_count"]:
+            self.invalidate_cache(analysis_id)
+        return patched
+
+    async def get_analyses_bulk(
+        self, analysis_ids: list[str], user_id: str | None = None
+    ) -> list[AnalysisDict]:
+        """여러 분석 결과를 한 번의 IN 쿼리로 조회합니다 (순서 보장 안 됨).
+
+        user_id를 넘기면 소유권 조건을 쿼리에 포함하여 해당 사용자의 분석만 반환합니다.
+        """
+        if not analysis_ids:
+            return []
+
+        query = self.db.table("analysis_results").select("*").in_(
+            "id", list(dict.fromkeys(analysis_ids))
+        )
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        result = await query.execute()
+
+        if result.error or not result.data:
+            return []
+
+        return [AnalysisDict(row) for row in result.data]
+
+    async def get_analysis_by_exam(
+        self, exam_id: str, user_id: str | None = None
+    ) -> AnalysisDict | None:
+        """Get analysis result by Exam ID (user_id 지정 시 소유권 조건 포함)."""
+        query = self.db.table("analysis_results").select("*").eq("exam_id", exam_id)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        result = await query.maybe_single().execute()
 
         if result.error or result.data is None:
             return None
 
         return AnalysisDict(result.data)
 
+    async def get_analysis_id_by_exam(self, exam_id: str, user_id: str) -> str | None:
+        """시험지에 연결된 사용자 소유 분석 결과의 ID만 조회 (JSON 컬럼 전송 없음)."""
+        result = await self.db.table("analysis_results").select("id").eq(
+            "exam_id", exam_id
+        ).eq("user_id", user_id).maybe_single().execute()
+
+        if result.error or result.data is None:
+            return None
+
+        return str(result.data["id"])
+
     async def merge_analyses(
         self,
         analyses: list[AnalysisDict],
@@ -561,6 +826,7 @@ class AnalysisService:
         now = datetime.utcnow().isoformat()
 
         # 병합 결과 저장
+        merged_current_score, merged_total_score = compute_score_totals(merged_questions)
         merged_data = {
             "id": str(uuid.uuid4()),
             "exam_id": first_exam_id,
@@ -570,17 +836,18 @@ class AnalysisService:
             "model_version": f"merged_from_{len(analyses)}_analyses",
             "summary": summary,
             "questions": merged_questions,
+            "current_score": merged_current_score,
+            "total_score": merged_total_score,
+            "avg_confidence": compute_avg_confidence(merged_questions),
             "analyzed_at": now,
             "created_at": now
         }
 
         result = await self.db.table("analysis_results").insert(merged_data).execute()
 
-        if result.error:
-            raise Exception(f"Failed to save merged analysis: {result.error}")
-
-        return AnalysisDict(result.data)
+        return AnalysisDict(result.raise_for_error().data)
 
 
+@cache
 def get_analysis_service(db: SupabaseClient) -> AnalysisService:
     return AnalysisService(db)
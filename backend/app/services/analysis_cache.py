@@ -17,6 +17,7 @@ class CacheEntry:
     value: Any
     created_at: float = field(default_factory=time.time)
     hits: int = 0
+    user_id: str | None = None
 
     def is_expired(self, ttl_seconds: int) -> bool:
         return time.time() - self.created_at > ttl_seconds
@@ -29,6 +30,7 @@ class AnalysisCache:
     - 파일 해시 기반 중복 분석 방지
     - TTL(Time-To-Live) 기반 자동 만료
     - 캐시 히트/미스 통계
+    - 사용자 단위 무효화 (user_id -> 키 보조 인덱스)
     """
 
     def __init__(self, ttl_seconds: int = 3600, max_entries: int = 100):
@@ -38,6 +40,7 @@ class AnalysisCache:
             max_entries: 최대 캐시 항목 수
         """
         self._cache: dict[str, CacheEntry] = {}
+        self._user_keys: dict[str, set[str]] = {}
         self.ttl_seconds = ttl_seconds
         self.max_entries = max_entries
         self.stats = {"hits": 0, "misses": 0}
@@ -51,7 +54,7 @@ class AnalysisCache:
             return None
 
         if entry.is_expired(self.ttl_seconds):
-            del self._cache[key]
+            self._remove(key)
             self.stats["misses"] += 1
             return None
 
@@ -59,25 +62,69 @@ class AnalysisCache:
         self.stats["hits"] += 1
         return entry.value
 
-    def set(self, key: str, value: Any) -> None:
-        """캐시에 값 저장"""
-        # 용량 초과 시 가장 오래된 항목 삭제
-        if len(self._cache) >= self.max_entries:
+    def set(self, key: str, value: Any, user_id: str | None = None) -> None:
+        """캐시에 값 저장
+
+        Args:
+            key: 캐시 키
+            value: 저장할 값
+            user_id: 소유 사용자 ID (지정 시 invalidate_user로 일괄 삭제 가능)
+        """
+        if key in self._cache:
+            self._remove(key)
+        elif len(self._cache) >= self.max_entries:
+            # 용량 초과 시 가장 오래된 항목 삭제
             self._evict_oldest()
 
-        self._cache[key] = CacheEntry(value=value)
+        self._cache[key] = CacheEntry(value=value, user_id=user_id)
+        if user_id:
+            self._user_keys.setdefault(user_id, set()).add(key)
+
+    def invalidate(self, key: str) -> bool:
+        """특정 키 삭제. 삭제되었으면 True"""
+        return self._remove(key)
+
+    def invalidate_user(self, user_id: str) -> int:
+        """사용자에게 속한 항목 전체 삭제 (O(해당 사용자 항목 수)).
+
+        Returns:
+            삭제된 항목 수
+        """
+        keys = self._user_keys.pop(user_id, set())
+        removed = 0
+        for key in keys:
+            if self._cache.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    def _remove(self, key: str) -> bool:
+        """항목과 보조 인덱스를 함께 삭제"""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return False
+
+        if entry.user_id:
+            keys = self._user_keys.get(entry.user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._user_keys[entry.user_id]
+        return True
 
     def _evict_oldest(self) -> None:
-        """가장 오래된 항목 삭제"""
+        """가장 오래된 항목 삭제
+
+        set()은 기존 키를 삭제 후 다시 넣으므로 dict 삽입 순서가 곧 생성 순서 (O(1))
+        """
         if not self._cache:
             return
 
-        oldest_key = min(self._cache.keys(), key=lambda k: self._cache[k].created_at)
-        del self._cache[oldest_key]
+        self._remove(next(iter(self._cache)))
 
     def clear(self) -> None:
         """캐시 전체 삭제"""
         self._cache.clear()
+        self._user_keys.clear()
 
     def get_stats(self) -> dict:
         """캐시 통계 반환"""
@@ -128,6 +175,116 @@ def get_analysis_cache() -> AnalysisCache:
     return _analysis_cache
 
 
+# 분석 결과 행 조회 캐시 (analysis_id -> analysis_results 행)
+_analysis_row_cache: AnalysisCache | None = None
+
+
+def get_analysis_row_cache() -> AnalysisCache:
+    """분석 결과 행 캐시 싱글톤 인스턴스 반환
+
+    워커 프로세스 간에 공유되지 않으므로 TTL을 짧게 유지하고,
+    행을 변경하는 경로에서는 invalidate로 즉시 제거합니다.
+    """
+    global _analysis_row_cache
+    if _analysis_row_cache is None:
+        _analysis_row_cache = AnalysisCache(
+            ttl_seconds=60,      # 1분
+            max_entries=1024,
+        )
+    return _analysis_row_cache
+
+
+# 분석 소유권/유형 캐시 (analysis_id -> AnalysisAuthContext)
+_analysis_auth_cache: AnalysisCache | None = None
+
+
+def get_analysis_auth_cache() -> AnalysisCache:
+    """분석 소유권 확인용 캐시 싱글톤 인스턴스 반환
+
+    (user_id, exam_id, exam_type)만 담으므로 행 캐시보다 많은 항목을 유지합니다.
+    """
+    global _analysis_auth_cache
+    if _analysis_auth_cache is None:
+        _analysis_auth_cache = AnalysisCache(
+            ttl_seconds=60,      # 1분
+            max_entries=10_000,
+        )
+    return _analysis_auth_cache
+
+
+# 확장 분석 캐시 (analysis_id -> AnalysisExtension 스키마)
+_analysis_extension_cache: AnalysisCache | None = None
+
+
+def get_analysis_extension_cache() -> AnalysisCache:
+    """확장 분석 캐시 싱글톤 인스턴스 반환
+
+    확장 분석은 생성/재생성 시에만 바뀌므로 생성 경로에서 갱신하고,
+    다른 워커의 재생성은 짧은 TTL로 흡수합니다.
+    """
+    global _analysis_extension_cache
+    if _analysis_extension_cache is None:
+        _analysis_extension_cache = AnalysisCache(
+            ttl_seconds=60,      # 1분
+            max_entries=1024,
+        )
+    return _analysis_extension_cache
+
+
+# 내보내기 HTML 캐시 (분석 ID + 행 해시 + 섹션/시험지 정보 -> 렌더링된 HTML)
+_export_html_cache: AnalysisCache | None = None
+
+
+def get_export_html_cache() -> AnalysisCache:
+    """내보내기 HTML 캐시 싱글톤 인스턴스 반환
+
+    키에 분석 행 내용 해시가 포함되어 정오답 수정 등으로 행이 바뀌면
+    자연히 다른 키가 되므로 별도 무효화 없이 TTL로만 정리합니다.
+    """
+    global _export_html_cache
+    if _export_html_cache is None:
+        _export_html_cache = AnalysisCache(
+            ttl_seconds=600,     # 10분
+            max_entries=512,
+        )
+    return _export_html_cache
+
+
+# 시험지 상세 캐시 (exam_id -> exams 행, 분석 완료/실패 상태만 보관)
+_exam_cache: AnalysisCache | None = None
+
+
+def get_exam_cache() -> AnalysisCache:
+    """시험지 상세 캐시 싱글톤 인스턴스 반환
+
+    분석 진행 중(pending/analyzing)인 시험지는 진행 단계가 계속 바뀌므로 보관하지 않고,
+    상태를 바꾸는 경로에서는 invalidate로 즉시 제거합니다.
+    캐시는 워커별이므로 히트 시에도 ExamService.get_exam이 버전 컬럼을 DB와 비교합니다.
+    """
+    global _exam_cache
+    if _exam_cache is None:
+        _exam_cache = AnalysisCache(
+            ttl_seconds=60,      # 1분
+            max_entries=1024,
+        )
+    return _exam_cache
+
+
+def invalidate_analysis_caches(analysis_id: str) -> None:
+    """분석 결과 행/소유권/확장 분석 캐시에서 단일 분석 제거"""
+    get_analysis_row_cache().invalidate(analysis_id)
+    get_analysis_auth_cache().invalidate(analysis_id)
+    get_analysis_extension_cache().invalidate(analysis_id)
+
+
+def invalidate_user_analysis_caches(user_id: str) -> None:
+    """분석 결과 행/소유권/확장 분석 캐시에서 사용자의 분석 전체 제거"""
+    get_analysis_row_cache().invalidate_user(user_id)
+    get_analysis_auth_cache().invalidate_user(user_id)
+    get_analysis_extension_cache().invalidate_user(user_id)
+    get_export_html_cache().invalidate_user(user_id)
+
+
 class PatternMatcher:
     """고신뢰도 패턴 빠른 매칭.
 
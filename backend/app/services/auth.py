@@ -1,4 +1,5 @@
 """Authentication service using Supabase REST API."""
+import asyncio
 from enum import Enum
 from typing import Optional, Any
 from datetime import datetime
@@ -59,7 +60,8 @@ async def authenticate_user(db: SupabaseClient, email: str, password: str) -> tu
         return None, AuthError.USER_NOT_FOUND
     if not user.get("is_active", True):
         return None, AuthError.ACCOUNT_DISABLED
-    if not verify_password(password, user.get("hashed_password", "")):
+    # bcrypt는 의도적으로 느린 CPU 연산이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    if not await asyncio.to_thread(verify_password, password, user.get("hashed_password", "")):
         return None, AuthError.WRONG_PASSWORD
     return user, None
 
@@ -68,10 +70,11 @@ async def create_user(db: SupabaseClient, user_in: RegisterRequest) -> UserDict:
     """Create new user."""
     import uuid
 
+    hashed_password = await asyncio.to_thread(get_password_hash, user_in.password)
     user_data = {
         "id": str(uuid.uuid4()),
         "email": user_in.email,
-        "hashed_password": get_password_hash(user_in.password),
+        "hashed_password": hashed_password,
         "nickname": user_in.nickname,
         "is_active": True,
         "is_superuser": False,
@@ -96,7 +99,7 @@ async def create_user(db: SupabaseClient, user_in: RegisterRequest) -> UserDict:
 async def update_password(db: SupabaseClient, user: UserDict, new_password: str) -> UserDict:
     """Update user password."""
     update_data = {
-        "hashed_password": get_password_hash(new_password),
+        "hashed_password": await asyncio.to_thread(get_password_hash, new_password),
         "updated_at": datetime.utcnow().isoformat(),
     }
 
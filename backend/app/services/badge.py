@@ -78,6 +78,15 @@ BADGE_DEFINITIONS = {
     },
 }
 
+# 피드백 카운트 배지 임계값 (높은 것부터, increment_feedback_count DB 함수에도 전달)
+_FEEDBACK_BADGE_THRESHOLDS = [
+    [50, "feedback_50"],
+    [25, "feedback_25"],
+    [10, "feedback_10"],
+    [5, "feedback_5"],
+    [1, "first_feedback"],
+]
+
 # 티어별 색상
 TIER_COLORS = {
     "bronze": "#CD7F32",
@@ -140,38 +149,21 @@ class BadgeService:
     async def increment_feedback_count(self, user_id: str) -> dict | None:
         """피드백 카운트 증가 및 배지 확인
 
+        increment_feedback_count DB 함수가 카운트 증가, 임계값 확인, 배지 추가를
+        사용자 행을 잠근 상태에서 한 번에 처리하고 새 배지 ID를 반환합니다.
+
         Returns:
             새로 획득한 배지 또는 None
         """
-        # 현재 사용자 정보 조회
-        result = await self.db.table("users").select(
-            "feedback_count", "badges"
-        ).eq("id", user_id).maybe_single().execute()
+        result = await self.db.rpc(
+            "increment_feedback_count",
+            {"p_user_id": user_id, "p_thresholds": _FEEDBACK_BADGE_THRESHOLDS},
+        ).execute()
 
-        if not result.data:
+        if result.error or not result.data:
             return None
 
-        current_count = result.data.get("feedback_count", 0)
-        current_badges = result.data.get("badges", [])
-        new_count = current_count + 1
-
-        # 새 배지 확인
-        new_badge = self._check_feedback_badge(new_count, current_badges)
-
-        # 업데이트 데이터 준비
-        update_data: dict[str, Any] = {"feedback_count": new_count}
-
-        if new_badge:
-            new_badge_entry = {
-                "id": new_badge["id"],
-                "earned_at": datetime.utcnow().isoformat(),
-            }
-            update_data["badges"] = current_badges + [new_badge_entry]
-
-        # DB 업데이트
-        await self.db.table("users").eq("id", user_id).update(update_data).execute()
-
-        return new_badge
+        return BADGE_DEFINITIONS.get(result.data)
 
     async def increment_pattern_adoption(self, user_id: str, feedback_id: str | None = None) -> dict:
         """패턴 채택 카운트 증가, 배지 확인, 크레딧 지급
@@ -232,25 +224,6 @@ class BadgeService:
 
         return {"badge": new_badge, "credits_earned": PATTERN_ADOPTION_CREDIT_REWARD}
 
-    def _check_feedback_badge(self, count: int, current_badges: list) -> dict | None:
-        """피드백 카운트 기반 배지 확인"""
-        earned_ids = {b.get("id") for b in current_badges}
-
-        # 조건 확인 (역순으로 높은 것부터)
-        thresholds = [
-            (50, "feedback_50"),
-            (25, "feedback_25"),
-            (10, "feedback_10"),
-            (5, "feedback_5"),
-            (1, "first_feedback"),
-        ]
-
-        for threshold, badge_id in thresholds:
-            if count >= threshold and badge_id not in earned_ids:
-                return BADGE_DEFINITIONS[badge_id]
-
-        return None
-
     def _check_adoption_badge(self, count: int, current_badges: list) -> dict | None:
         """패턴 채택 기반 배지 확인"""
         earned_ids = {b.get("id") for b in current_badges}
@@ -1,5 +1,6 @@
 """Credit log service for tracking credit changes."""
 from datetime import datetime, timezone
+from functools import cache
 from typing import Optional, Literal
 
 from app.db.supabase_client import SupabaseClient
@@ -117,5 +118,6 @@ class CreditLogService:
             return [], 0
 
 
+@cache
 def get_credit_log_service(db: SupabaseClient) -> CreditLogService:
     return CreditLogService(db)
@@ -1,16 +1,30 @@
 """Exam service for business logic using Supabase REST API."""
 import uuid
 from datetime import datetime
+from functools import cache
 from typing import Optional, Any
 
 from fastapi import HTTPException, UploadFile, status
 
 from app.db.supabase_client import SupabaseClient
-from app.schemas.exam import ExamCreateRequest, ExamStatus
+from app.schemas.exam import AnalysisBrief, ExamCreateRequest, ExamStatus
+from app.services.analysis_cache import (
+    get_exam_cache,
+    invalidate_analysis_caches,
+    invalidate_user_analysis_caches,
+)
 from app.services.file_storage import file_storage
 from app.data.school_regions import get_school_region, format_school_region
 
 
+# 상세 캐시에 보관할 시험지 상태 (상태 변경 경로에서는 get_exam_cache().invalidate 호출)
+_CACHEABLE_EXAM_STATUSES = frozenset({ExamStatus.COMPLETED.value, ExamStatus.FAILED.value})
+
+# 캐시 히트 시 DB와 비교하는 버전 컬럼 (다른 워커의 변경 감지)
+# - 시험지 변경 경로는 모두 updated_at을 갱신하고, analysis_step만 updated_at 없이 갱신됨
+_EXAM_VERSION_COLUMNS = ("status", "analysis_step", "updated_at")
+
+
 class ExamDict(dict):
     """Exam data wrapper that allows attribute access."""
     def __getattr__(self, name: str) -> Any:
@@ -23,6 +37,68 @@ class ExamDict(dict):
         self[name] = value
 
 
+# 배점 합계와 100점의 차이별 신뢰도 배율 (차이 상한, 배율) - 오름차순
+_POINTS_PENALTY_TABLE = (
+    (5, 1.0),    # 95~105점: 페널티 없음
+    (15, 0.8),   # 85~94점 또는 106~115점: 20% 감소
+    (25, 0.6),   # 75~84점 또는 116~125점: 40% 감소
+    (50, 0.4),   # 50~74점 또는 126~150점: 60% 감소
+)
+# 50점 미만 또는 150점 초과: 80% 감소 (거의 확실한 오분석)
+_POINTS_PENALTY_FLOOR = 0.2
+
+
+def apply_points_confidence_penalty(
+    avg_confidence: float | None,
+    total_points: float,
+    essay_points: float,
+    non_essay_points: float,
+) -> float | None:
+    """배점 검증 기반 신뢰도 페널티 적용 (섹션 구분 시험지 예외 처리)."""
+    if avg_confidence is None:
+        return None
+
+    # 섹션 구분 시험지 감지 (예: 객관식 100점 + 서술형 100점 = 200점)
+    # 각 섹션이 100의 배수로 명확히 구분되면 정상 시험지로 간주하여 페널티 면제
+    if total_points % 100 == 0 and total_points >= 200:
+        if (essay_points % 100 == 0 and essay_points >= 100) or \
+           (non_essay_points % 100 == 0 and non_essay_points >= 100):
+            return avg_confidence
+
+    points_diff = abs(100 - total_points)
+    for max_diff, multiplier in _POINTS_PENALTY_TABLE:
+        if points_diff <= max_diff:
+            return avg_confidence * multiplier
+    return avg_confidence * _POINTS_PENALTY_FLOOR
+
+
+def build_analysis_brief(row: dict) -> AnalysisBrief:
+    """analysis_briefs 집계 행으로 목록용 분석 요약 생성."""
+    # 부동소수점 오류 방지: 소수점 1자리까지 반올림
+    total_points = round(float(row.get("total_points") or 0), 1)
+    avg_confidence = row.get("avg_confidence")
+    avg_confidence = apply_points_confidence_penalty(
+        float(avg_confidence) if avg_confidence is not None else None,
+        total_points,
+        float(row.get("essay_points") or 0),
+        float(row.get("non_essay_points") or 0),
+    )
+
+    return AnalysisBrief(
+        total_questions=row.get("total_questions") or 0,
+        total_points=total_points,
+        avg_confidence=avg_confidence,
+        difficulty_concept=row.get("difficulty_concept") or 0,
+        difficulty_pattern=row.get("difficulty_pattern") or 0,
+        difficulty_reasoning=row.get("difficulty_reasoning") or 0,
+        difficulty_creative=row.get("difficulty_creative") or 0,
+        difficulty_high=row.get("difficulty_high") or 0,
+        difficulty_medium=row.get("difficulty_medium") or 0,
+        difficulty_low=row.get("difficulty_low") or 0,
+        format_essay=row.get("format_essay") or 0,
+    )
+
+
 class ExamService:
     """Service for exam-related business logic."""
 
@@ -195,11 +271,30 @@ class ExamService:
         Returns:
             Exam if found, None otherwise
         """
+        cache = get_exam_cache()
+        cached = cache.get(exam_id)
+        if cached is not None:
+            if cached.get("user_id") != user_id:
+                return None
+            # 캐시는 워커별이므로 버전 컬럼만 조회하여 다른 워커에서의 재분석/수정 여부 확인
+            version = await self.db.table("exams").select(
+                ",".join(_EXAM_VERSION_COLUMNS)
+            ).eq("id", exam_id).eq("user_id", user_id).maybe_single().execute()
+            if not version.error and version.data is not None and all(
+                version.data.get(column) == cached.get(column) for column in _EXAM_VERSION_COLUMNS
+            ):
+                return ExamDict(cached)
+            cache.invalidate(exam_id)
+
         result = await self.db.table("exams").select("*").eq("id", exam_id).eq("user_id", user_id).maybe_single().execute()
 
         if result.error or result.data is None:
             return None
 
+        # 분석이 끝난 시험지만 캐시 (진행 중이면 analysis_step이 계속 바뀜)
+        if result.data.get("status") in _CACHEABLE_EXAM_STATUSES:
+            cache.set(exam_id, result.data, user_id=user_id)
+
         return ExamDict(result.data)
 
     async def get_exam_by_id(self, exam_id: str) -> Optional[ExamDict]:
@@ -218,49 +313,71 @@ class ExamService:
 
         return ExamDict(result.data)
 
-    async def get_exams(
+    async def get_exams_with_briefs(
         self,
         user_id: str,
         page: int = 1,
         page_size: int = 20,
-        status_filter: Optional[ExamStatus] = None
+        status_filter: ExamStatus | None = None
     ) -> tuple[list[ExamDict], int]:
-        """Get paginated list of exams.
+        """시험지 목록 + 완료된 시험지의 분석 요약 조회 (fn_list_exams RPC 1회).
 
-        Args:
-            user_id: User ID
-            page: Page number (1-indexed)
-            page_size: Items per page
-            status_filter: Optional status filter
+        전체 개수, 페이지 시험지, 분석 요약(analysis_briefs)을 DB 함수 한 번으로 받아
+        각 시험지의 "analysis_brief"에 AnalysisBrief(없으면 None)를 채워 반환합니다.
 
         Returns:
             Tuple of (exams list, total count)
         """
-        # Build query
-        query = self.db.table("exams").select("*").eq("user_id", user_id)
-
-        if status_filter:
-            query = query.eq("status", status_filter.value)
+        result = await self.db.rpc(
+            "fn_list_exams",
+            {
+                "p_user_id": user_id,
+                "p_status": status_filter.value if status_filter else None,
+                "p_limit": page_size,
+                "p_offset": (page - 1) * page_size,
+            },
+        ).execute()
+
+        if result.error or not result.data:
+            return [], 0
 
-        # Get all results first for count (not ideal, but PostgREST doesn't support count separately easily)
-        count_query = self.db.table("exams").select("id").eq("user_id", user_id)
-        if status_filter:
-            count_query = count_query.eq("status", status_filter.value)
-        count_result = await count_query.execute()
-        total = count_result.count if not count_result.error else 0
+        exams = []
+        for item in result.data.get("items") or []:
+            brief_row = item.pop("analysis_brief", None)
+            exam = ExamDict(item)
+            exam["analysis_brief"] = build_analysis_brief(brief_row) if brief_row else None
+            exams.append(exam)
 
-        # Get paginated results
-        offset = (page - 1) * page_size
-        query = query.order("created_at", desc=True).offset(offset).limit(page_size)
+        return exams, result.data.get("total") or 0
 
-        result = await query.execute()
+    async def get_exams_version(
+        self,
+        user_id: str,
+        page: int = 1,
+        page_size: int = 20,
+        status_filter: ExamStatus | None = None
+    ) -> str | None:
+        """get_exams_with_briefs와 같은 범위의 목록 버전 해시 (fn_list_exams_version RPC 1회).
 
-        if result.error:
-            return [], 0
+        목록 본문 없이 md5 문자열 하나만 받아 ETag 비교에 사용합니다.
 
-        exams = [ExamDict(e) for e in (result.data if isinstance(result.data, list) else [])]
+        Returns:
+            버전 문자열 (조회 실패 시 None)
+        """
+        result = await self.db.rpc(
+            "fn_list_exams_version",
+            {
+                "p_user_id": user_id,
+                "p_status": status_filter.value if status_filter else None,
+                "p_limit": page_size,
+                "p_offset": (page - 1) * page_size,
+            },
+        ).execute()
+
+        if result.error or not result.data:
+            return None
 
-        return exams, total
+        return result.data
 
     async def update_exam_type(self, exam_id: str, user_id: str, exam_type: str) -> Optional[ExamDict]:
         """Update exam type (blank/student).
@@ -284,10 +401,14 @@ class ExamService:
         }
 
         result = await self.db.table("exams").eq("id", exam_id).update(update_data).execute()
+        get_exam_cache().invalidate(exam_id)
 
         if result.error:
             return None
 
+        # analysis_results.exam_type은 트리거로 갱신되므로 캐시된 분석 행 무효화
+        invalidate_user_analysis_caches(user_id)
+
         return await self.get_exam(exam_id, user_id)
 
     async def update_exam_status(self, exam_id: str, status: str, error_message: str | None = None) -> Optional[ExamDict]:
@@ -309,6 +430,7 @@ class ExamService:
             update_data["error_message"] = error_message
 
         result = await self.db.table("exams").eq("id", exam_id).update(update_data).execute()
+        get_exam_cache().invalidate(exam_id)
 
         if result.error:
             return None
@@ -361,6 +483,7 @@ class ExamService:
             update_data["subject_confidence"] = subject_confidence
 
         result = await self.db.table("exams").eq("id", exam_id).update(update_data).execute()
+        get_exam_cache().invalidate(exam_id)
 
         if result.error:
             return None
@@ -405,16 +528,22 @@ class ExamService:
 
         # 3. Delete analysis_results
         await self.db.table("analysis_results").eq("exam_id", exam_id).delete().execute()
+        for analysis_id in analysis_ids:
+            invalidate_analysis_caches(str(analysis_id))
 
         # 4. Delete exam
         result = await self.db.table("exams").eq("id", exam_id).delete().execute()
+        get_exam_cache().invalidate(exam_id)
 
         return not result.error
 
 
+@cache
 def get_exam_service(db: SupabaseClient) -> ExamService:
     """Dependency for getting exam service.
 
+    ExamService는 db 핸들만 보관하므로 db 인스턴스별로 재사용합니다.
+
     Args:
         db: Supabase client
 
@@ -4,8 +4,10 @@ Supports:
 - Local filesystem storage (development)
 - Supabase Storage (production)
 """
+import asyncio
 import hashlib
 import httpx
+from collections.abc import AsyncIterable, AsyncIterator
 from datetime import datetime
 from pathlib import Path
 from typing import Protocol
@@ -15,11 +17,22 @@ from fastapi import UploadFile
 from app.core.config import settings
 
 
+# 업로드 파일은 이 크기 단위로 읽어 전체 내용을 메모리에 올리지 않음
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+MAX_UPLOAD_SIZE = 20 * 1024 * 1024  # 20MB
+# 여러 장 업로드 시 동시에 전송할 최대 파일 수 (스토리지 과부하 방지)
+MAX_CONCURRENT_UPLOADS = 8
+
+FileContent = bytes | AsyncIterable[bytes]
+
+
 class StorageBackend(Protocol):
     """Storage backend protocol."""
 
-    async def upload(self, content: bytes, path: str, content_type: str) -> str:
-        """Upload file and return public URL or path."""
+    async def upload(
+        self, content: FileContent, path: str, content_type: str, size: int | None = None
+    ) -> str:
+        """Upload file (bytes or async chunk stream) and return public URL or path."""
         ...
 
     async def delete(self, path: str) -> None:
@@ -38,12 +51,18 @@ class LocalStorageBackend:
     def _ensure_directories(self) -> None:
         self.exams_path.mkdir(parents=True, exist_ok=True)
 
-    async def upload(self, content: bytes, path: str, content_type: str) -> str:
+    async def upload(
+        self, content: FileContent, path: str, content_type: str, size: int | None = None
+    ) -> str:
         """Save file to local filesystem."""
         file_path = self.base_path / path
         file_path.parent.mkdir(parents=True, exist_ok=True)
         with open(file_path, "wb") as f:
-            f.write(content)
+            if isinstance(content, bytes):
+                f.write(content)
+            else:
+                async for chunk in content:
+                    f.write(chunk)
         return f"uploads/{path}"
 
     async def delete(self, path: str) -> None:
@@ -67,6 +86,9 @@ class SupabaseStorageBackend:
         self.service_key = settings.SUPABASE_SERVICE_ROLE_KEY
         if not self.url or not self.service_key:
             raise ValueError("Supabase URL과 서비스 롤 키가 필요합니다")
+        # 버킷 확인은 프로세스당 한 번만 (동시 업로드가 각자 확인/생성하지 않도록 Lock 사용)
+        self._bucket_ready = False
+        self._bucket_lock = asyncio.Lock()
 
     @property
     def storage_url(self) -> str:
@@ -81,6 +103,16 @@ class SupabaseStorageBackend:
 
     async def _ensure_bucket(self) -> None:
         """Ensure the bucket exists (create if not)."""
+        if self._bucket_ready:
+            return
+        async with self._bucket_lock:
+            if self._bucket_ready:
+                return
+            await self._check_or_create_bucket()
+            self._bucket_ready = True
+
+    async def _check_or_create_bucket(self) -> None:
+        """버킷 존재 확인 후 없으면 생성."""
         async with httpx.AsyncClient() as client:
             # Check if bucket exists
             response = await client.get(
@@ -109,21 +141,31 @@ class SupabaseStorageBackend:
                 else:
                     print(f"[Storage] Bucket created successfully")
 
-    async def upload(self, content: bytes, path: str, content_type: str) -> str:
-        """Upload file to Supabase Storage."""
+    async def upload(
+        self, content: FileContent, path: str, content_type: str, size: int | None = None
+    ) -> str:
+        """Upload file to Supabase Storage.
+
+        content가 청크 스트림이면 그대로 요청 본문으로 흘려보냅니다.
+        size를 알면 Content-Length로 보내 chunked 전송을 피합니다.
+        """
         await self._ensure_bucket()
 
         # path format: "exams/filename"
         file_path = path if not path.startswith("exams/") else path[6:]
 
+        headers = {
+            **self.headers,
+            "Content-Type": content_type,
+            "x-upsert": "true",  # 기존 파일 덮어쓰기 허용
+        }
+        if size is not None:
+            headers["Content-Length"] = str(size)
+
         async with httpx.AsyncClient() as client:
             response = await client.post(
                 f"{self.storage_url}/object/{self.BUCKET_NAME}/{file_path}",
-                headers={
-                    **self.headers,
-                    "Content-Type": content_type,
-                    "x-upsert": "true",  # 기존 파일 덮어쓰기 허용
-                },
+                headers=headers,
                 content=content,
             )
 
@@ -192,6 +234,12 @@ class SupabaseStorageBackend:
             return response.content
 
 
+async def _iter_upload_chunks(file: UploadFile) -> AsyncIterator[bytes]:
+    """UploadFile 내용을 UPLOAD_CHUNK_SIZE 단위로 읽는 비동기 이터레이터."""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
 class FileStorageService:
     """Service for handling file storage operations.
 
@@ -231,15 +279,18 @@ class FileStorageService:
         if not file.filename:
             raise ValueError("파일명이 없습니다.")
 
-        content = await file.read()
-
-        # Check file size (20MB limit)
-        max_size = 20 * 1024 * 1024
-        if len(content) > max_size:
-            raise ValueError("파일 크기가 20MB를 초과합니다.")
+        # 청크 단위로 읽으며 크기 확인/해시 계산 (20MB 초과 시 끝까지 읽지 않고 중단)
+        await file.seek(0)
+        hasher = hashlib.sha256()
+        size = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_SIZE:
+                raise ValueError("파일 크기가 20MB를 초과합니다.")
+            hasher.update(chunk)
 
         # Generate unique filename
-        file_hash = self._get_file_hash(content)
+        file_hash = hasher.hexdigest()
         file_extension = Path(file.filename).suffix.lower()
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         filename = f"{user_id}_{timestamp}_{file_hash[:8]}{file_extension}"
@@ -247,18 +298,24 @@ class FileStorageService:
         # Determine content type
         content_type = file.content_type or "application/octet-stream"
 
-        # Upload to backend
+        # Upload to backend (업로드 임시 파일에서 청크 단위로 다시 읽어 전송)
         path = f"exams/{filename}"
-        return await self._backend.upload(content, path, content_type)
+        await file.seek(0)
+        return await self._backend.upload(_iter_upload_chunks(file), path, content_type, size)
 
     async def save_files(self, files: list[UploadFile], user_id: str) -> list[str]:
-        """Save multiple uploaded files."""
-        file_paths = []
-        for i, file in enumerate(files):
-            await file.seek(0)
-            path = await self.save_file(file, f"{user_id}_p{i+1:02d}")
-            file_paths.append(path)
-        return file_paths
+        """Save multiple uploaded files.
+
+        파일별 업로드를 동시에 진행하되 MAX_CONCURRENT_UPLOADS개로 제한합니다.
+        반환 순서는 입력 파일 순서와 같습니다.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+        async def save(i: int, file: UploadFile) -> str:
+            async with semaphore:
+                return await self.save_file(file, f"{user_id}_p{i+1:02d}")
+
+        return list(await asyncio.gather(*(save(i, file) for i, file in enumerate(files))))
 
     def delete_files(self, file_paths: str) -> None:
         """Delete multiple files (sync wrapper for backward compatibility)."""
@@ -110,10 +110,10 @@ class PromptBuilder:
             "problem_type_id", "null"
         ).order(
             "priority", desc=True
-        ).limit(1).execute()
+        ).maybe_single().execute()
 
-        if result.data and len(result.data) > 0:
-            template = result.data[0]
+        if result.data:
+            template = result.data
             # 템플릿 사용 횟수 증가
             await self.db.table("prompt_templates").eq("id", template["id"]).update({
                 "usage_count": template.get("usage_count", 0) + 1
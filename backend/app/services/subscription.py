@@ -1,6 +1,7 @@
 """Subscription and usage service using Supabase REST API."""
 from datetime import datetime, timedelta, timezone
 from enum import Enum
+from functools import cache
 from typing import Optional, Any
 from fastapi import HTTPException, status
 
@@ -294,55 +295,43 @@ class SubscriptionService:
         # exam_type에 따른 크레딧 비용 결정
         credit_cost = 2 if exam_type == "student" else 1
 
+        # 주간 크레딧 지급은 일할 계산 로직 때문에 먼저 수행
         user = await self.get_user(user_id)
         await self.check_and_grant_weekly_credits(user)
 
-        weekly_analysis_count = user.get("monthly_analysis_count", 0)  # 통계용 카운터
-        credits = user.get("credits", 0)
-
-        # 로그 서비스 초기화
-        credit_log_service = get_credit_log_service(self.db)
+        # 잔액 확인 + 차감을 DB 함수에서 원자적으로 처리 (동시 요청 중복 차감 방지)
+        result = await self.db.rpc(
+            "fn_consume_analysis",
+            {"p_user_id": user_id, "p_cost": credit_cost},
+        ).execute()
 
-        # MASTER는 무제한 (크레딧 차감 없음)
-        if user.get("is_superuser", False):
-            await self._update_user(user["id"], {
-                "monthly_analysis_count": weekly_analysis_count + 1,
-            })
-            # 무료 사용 기록
-            description = "학생용 시험지 분석" if exam_type == "student" else "시험지 분석"
-            await credit_log_service.log(
-                user_id=user_id,
-                change_amount=0,
-                balance_before=credits,
-                balance_after=credits,
-                action_type="analysis",
-                reference_id=exam_id,
-                description=description,
+        if result.error or not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"크레딧 차감 실패: {result.error}"
             )
-            return {"success": True, "credits_consumed": 0, "credits_remaining": credits}
 
-        # 일반 사용자: 크레딧 차감
-        if credits >= credit_cost:
-            new_credits = credits - credit_cost
-            await self._update_user(user["id"], {
-                "credits": new_credits,
-                "monthly_analysis_count": weekly_analysis_count + 1,
-            })
-            # 크레딧 차감 기록
-            description = "학생용 시험지 분석" if exam_type == "student" else "시험지 분석"
-            await credit_log_service.log(
-                user_id=user_id,
-                change_amount=-credit_cost,
-                balance_before=credits,
-                balance_after=new_credits,
-                action_type="analysis",
-                reference_id=exam_id,
-                description=description,
-            )
-            return {"success": True, "credits_consumed": credit_cost, "credits_remaining": new_credits}
+        consumed = result.data[0] if isinstance(result.data, list) else result.data
+        credits_before = consumed["credits_before"]
+        credits_remaining = consumed["credits_remaining"]
 
         # 크레딧 부족
-        return {"success": False, "credits_consumed": 0, "credits_remaining": credits}
+        if not consumed["success"]:
+            return {"success": False, "credits_consumed": 0, "credits_remaining": credits_remaining}
+
+        # 차감 기록 (MASTER는 0 크레딧 무료 사용 기록)
+        credits_consumed = credits_before - credits_remaining
+        description = "학생용 시험지 분석" if exam_type == "student" else "시험지 분석"
+        await get_credit_log_service(self.db).log(
+            user_id=user_id,
+            change_amount=-credits_consumed,
+            balance_before=credits_before,
+            balance_after=credits_remaining,
+            action_type="analysis",
+            reference_id=exam_id,
+            description=description,
+        )
+        return {"success": True, "credits_consumed": credits_consumed, "credits_remaining": credits_remaining}
 
     async def consume_extended(self, user_id: str, exam_id: str | None = None) -> bool:
         """확장 분석 1회 소비 (2크레딧 차감, 성공 시 True)
@@ -397,6 +386,44 @@ class SubscriptionService:
         # 크레딧 부족
         return False
 
+    async def authorize_extended(self, analysis_id: str, user_id: str) -> dict:
+        """확장 분석 사전 검증 + 소비 (fn_authorize_extended RPC 1회)
+
+        분석 소유권, 시험지 유형, 크레딧 차감을 DB 함수에서 한 번에 처리한다.
+        주간 크레딧 지급은 일할 계산 로직 때문에 여기서 먼저 수행한다.
+
+        Returns:
+            {"code": "ok" | "not_found" | "blank_exam" | "insufficient_credits", ...}
+        """
+        user = await self.get_user(user_id)
+        await self.check_and_grant_weekly_credits(user)
+
+        result = await self.db.rpc(
+            "fn_authorize_extended",
+            {"p_analysis_id": analysis_id, "p_user_id": user_id},
+        ).execute()
+
+        if result.error or not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"확장 분석 권한 확인 실패: {result.error}"
+            )
+
+        auth = result.data[0] if isinstance(result.data, list) else result.data
+
+        if auth.get("code") == "ok":
+            await get_credit_log_service(self.db).log(
+                user_id=user_id,
+                change_amount=auth["credits_remaining"] - auth["credits_before"],
+                balance_before=auth["credits_before"],
+                balance_after=auth["credits_remaining"],
+                action_type="extended",
+                reference_id=auth.get("exam_id"),
+                description="확장 분석",
+            )
+
+        return auth
+
     async def purchase_credits(
         self, user_id: str, request: PurchaseCreditsRequest
     ) -> PurchaseCreditsResponse:
@@ -603,5 +630,6 @@ class SubscriptionService:
         }
 
 
+@cache
 def get_subscription_service(db: SupabaseClient) -> SubscriptionService:
     return SubscriptionService(db)
@@ -241,7 +241,7 @@ class TestGetAnalysisResult:
 
         Given: 다른 사용자의 분석 결과 ID
         When: GET /api/v1/analysis/{id}
-        Then: 403 Forbidden
+        Then: 404 Not Found (존재 여부 노출 방지)
         """
         from app.services.file_storage import file_storage
         from app.services.auth import create_user
@@ -279,9 +279,9 @@ class TestGetAnalysisResult:
                 headers={"Authorization": f"Bearer {user2_token}"}
             )
 
-            # Then: 403 Forbidden
-            assert response.status_code == 403
-            assert response.json()["detail"]["code"] == "FORBIDDEN"
+            # Then: 404 Not Found (소유권 조건이 쿼리에 포함됨)
+            assert response.status_code == 404
+            assert response.json()["detail"]["code"] == "ANALYSIS_NOT_FOUND"
 
         finally:
             file_storage.exams_path = original_path
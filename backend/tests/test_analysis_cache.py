@@ -0,0 +1,229 @@
+"""
+분석 캐시 테스트
+
+테스트 항목:
+1. 사용자 단위 무효화 (invalidate_user)
+2. 단일 키 무효화 및 보조 인덱스 정리
+3. 분석 결과 행 캐시 (get_analysis 히트/소유권/무효화)
+4. 소유권 캐시 (exists_for_user)
+5. 확장 분석 캐시 (통합 보고서)
+"""
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+import pytest
+
+from app.schemas.analysis import AnalysisResult as AnalysisResultSchema
+from app.services.agents.orchestrator import AnalysisOrchestrator
+from app.services.analysis import AnalysisService, CachedAnalysis
+from app.services.analysis_cache import (
+    AnalysisCache,
+    get_analysis_auth_cache,
+    get_analysis_extension_cache,
+    get_analysis_row_cache,
+)
+
+
+def _mock_analysis_service(row: dict | None):
+    """단일 행을 반환하는 mock DB로 AnalysisService 생성 (service, query 반환)"""
+    query = MagicMock()
+    query.select.return_value = query
+    query.eq.return_value = query
+    query.maybe_single.return_value = query
+    query.execute = AsyncMock(return_value=MagicMock(error=None, data=row))
+
+    db = MagicMock()
+    db.table.return_value = query
+    return AnalysisService(db), query
+
+
+class TestAnalysisCacheInvalidation:
+    """분석 캐시 무효화 테스트"""
+
+    def test_invalidate_user_removes_only_owned_entries(self):
+        """사용자 무효화 시 해당 사용자 항목만 삭제"""
+        cache = AnalysisCache()
+        cache.set("a", {"v": 1}, user_id="user-1")
+        cache.set("b", {"v": 2}, user_id="user-1")
+        cache.set("c", {"v": 3}, user_id="user-2")
+
+        removed = cache.invalidate_user("user-1")
+
+        assert removed == 2
+        assert cache.get("a") is None
+        assert cache.get("b") is None
+        assert cache.get("c") == {"v": 3}
+
+    def test_invalidate_key_cleans_user_index(self):
+        """단일 키 삭제 후 사용자 무효화는 남은 항목만 처리"""
+        cache = AnalysisCache()
+        cache.set("a", 1, user_id="user-1")
+        cache.set("b", 2, user_id="user-1")
+
+        assert cache.invalidate("a") is True
+        assert cache.invalidate("a") is False
+        assert cache.invalidate_user("user-1") == 1
+
+    def test_overwrite_moves_entry_to_new_owner(self):
+        """같은 키를 다른 사용자로 덮어쓰면 이전 소유자 인덱스에서 제거"""
+        cache = AnalysisCache()
+        cache.set("a", 1, user_id="user-1")
+        cache.set("a", 2, user_id="user-2")
+
+        assert cache.invalidate_user("user-1") == 0
+        assert cache.get("a") == 2
+
+    def test_eviction_keeps_index_consistent(self):
+        """용량 초과로 밀려난 항목은 인덱스에서도 제거"""
+        cache = AnalysisCache(max_entries=1)
+        cache.set("a", 1, user_id="user-1")
+        cache.set("b", 2, user_id="user-2")
+
+        assert cache.get("a") is None
+        assert cache.invalidate_user("user-1") == 0
+        assert cache.invalidate_user("user-2") == 1
+
+
+class TestAnalysisRowCache:
+    """분석 결과 행 캐시 테스트 (AnalysisService.get_analysis)"""
+
+    def setup_method(self):
+        self.cache = get_analysis_row_cache()
+        self.cache.clear()
+
+    def teardown_method(self):
+        self.cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_second_read_is_served_from_cache(self):
+        """두 번째 조회는 row_version만 확인하고 행 전체는 다시 조회하지 않음"""
+        service, query = _mock_analysis_service({"id": "a1", "user_id": "user-1", "row_version": 3})
+
+        first = await service.get_analysis("a1", "user-1")
+        second = await service.get_analysis("a1", "user-1")
+
+        assert first == second == {"id": "a1", "user_id": "user-1", "row_version": 3}
+        assert query.select.call_args_list == [call("*"), call("row_version")]
+
+    @pytest.mark.asyncio
+    async def test_changed_row_version_forces_reload(self):
+        """다른 워커에서 수정되어 row_version이 바뀌면 행 전체를 다시 조회"""
+        service, query = _mock_analysis_service(None)
+        query.execute.side_effect = [
+            MagicMock(error=None, data={"id": "a1", "user_id": "user-1", "row_version": 1}),
+            MagicMock(error=None, data={"row_version": 2}),
+            MagicMock(error=None, data={"id": "a1", "user_id": "user-1", "row_version": 2}),
+        ]
+
+        await service.get_analysis("a1", "user-1")
+        reloaded = await service.get_analysis("a1", "user-1")
+
+        assert reloaded["row_version"] == 2
+        assert query.select.call_args_list == [call("*"), call("row_version"), call("*")]
+
+    @pytest.mark.asyncio
+    async def test_cached_row_is_not_served_to_other_user(self):
+        """캐시 히트여도 다른 사용자에게는 None"""
+        service, _ = _mock_analysis_service({"id": "a1", "user_id": "user-1"})
+
+        await service.get_analysis("a1", "user-1")
+
+        assert await service.get_analysis("a1", "user-2") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reload(self):
+        """invalidate_cache 후에는 다시 DB 조회"""
+        service, query = _mock_analysis_service({"id": "a1", "user_id": "user-1"})
+
+        await service.get_analysis("a1", "user-1")
+        service.invalidate_cache("a1")
+        await service.get_analysis("a1", "user-1")
+
+        assert query.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_validated_schema_is_reused_for_cached_row(self):
+        """캐시된 행의 스키마 검증 결과는 재사용"""
+        service, _ = _mock_analysis_service({"id": "a1", "user_id": "user-1"})
+        analysis = await service.get_analysis("a1", "user-1")
+
+        with patch.object(AnalysisResultSchema, "model_validate", return_value="schema") as validate:
+            first = service.get_validated_schema(analysis)
+            second = service.get_validated_schema(await service.get_analysis("a1", "user-1"))
+
+        assert first == second == "schema"
+        assert validate.call_count == 1
+
+
+class TestAnalysisAuthCache:
+    """분석 소유권 캐시 테스트 (AnalysisService.exists_for_user)"""
+
+    def setup_method(self):
+        self.caches = (get_analysis_row_cache(), get_analysis_auth_cache())
+        for cache in self.caches:
+            cache.clear()
+
+    def teardown_method(self):
+        for cache in self.caches:
+            cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_ownership_is_cached_per_analysis(self):
+        """소유권 확인은 분석당 한 번만 DB 조회, 다른 사용자는 False"""
+        service, query = _mock_analysis_service({"user_id": "user-1", "exam_id": "e1", "exam_type": "student"})
+
+        assert await service.exists_for_user("a1", "user-1") is True
+        assert await service.exists_for_user("a1", "user-2") is False
+        assert query.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_row_fetch_populates_ownership(self):
+        """get_analysis로 읽은 분석은 추가 조회 없이 소유권 확인"""
+        service, query = _mock_analysis_service({"id": "a1", "user_id": "user-1", "exam_type": "blank"})
+
+        await service.get_analysis("a1", "user-1")
+        context = await service.get_auth_context("a1")
+
+        assert context.exam_type == "blank"
+        assert query.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_ownership(self):
+        """invalidate_cache 후에는 소유권도 다시 조회"""
+        service, query = _mock_analysis_service({"user_id": "user-1", "exam_id": "e1", "exam_type": None})
+
+        await service.exists_for_user("a1", "user-1")
+        service.invalidate_cache("a1")
+        await service.exists_for_user("a1", "user-1")
+
+        assert query.execute.await_count == 2
+
+
+class TestExtensionCache:
+    """확장 분석 캐시 테스트 (AnalysisOrchestrator.get_analysis_with_extension)"""
+
+    def setup_method(self):
+        self.caches = (get_analysis_row_cache(), get_analysis_extension_cache())
+        for cache in self.caches:
+            cache.clear()
+
+    def teardown_method(self):
+        for cache in self.caches:
+            cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_full_report_served_from_caches(self):
+        """행과 확장 분석이 모두 캐시에 있으면 뷰 조회 없이 반환, 소유자만 허용"""
+        row_cache, extension_cache = self.caches
+        row = {"id": "a1", "user_id": "user-1"}
+        extension = MagicMock()
+        row_cache.set("a1", CachedAnalysis(row=row), user_id="user-1")
+        extension_cache.set("a1", extension, user_id="user-1")
+
+        service, query = _mock_analysis_service({"row_version": None})
+        orchestrator = AnalysisOrchestrator(service.db)
+
+        assert await orchestrator.get_analysis_with_extension("a1", "user-1") == (row, extension)
+        assert await orchestrator.get_analysis_with_extension("a1", "user-2") == (None, None)
+        # 뷰 조회 없이 행 버전 확인만 수행
+        service.db.table.assert_called_once_with("analysis_results")
+        query.select.assert_called_once_with("row_version")
@@ -213,6 +213,13 @@ export interface ExamPrepStrategyResponse {
     generated_at: string;
 }
 
+export interface AnalysisPlansResponse {
+    analysis_id: string;
+    topic_strategies: TopicStrategiesResponse;
+    score_level_plan: ScoreLevelPlanResponse | null;  // 배점 정보가 없으면 null
+    exam_prep_strategy: ExamPrepStrategyResponse;
+}
+
 export interface AnalysisResult {
     id: string;
     exam_id: string;
@@ -610,6 +617,30 @@ export const analysisService = {
         );
         return response.data;
     },
+
+    /**
+     * Generate all dashboard plans at once (학습 전략/계획 일괄 생성).
+     * Runs topic strategies, score level plan and exam prep strategy concurrently.
+     * Only available for answered exams (student answer sheets).
+     * @param analysisId 분석 결과 ID
+     * @param examName 시험 이름 (예: "중간고사")
+     * @param daysUntilExam 시험까지 남은 일수 (1-30일)
+     * @returns AnalysisPlansResponse
+     */
+    async generatePlans(
+        analysisId: string,
+        examName: string,
+        daysUntilExam: number
+    ): Promise<AnalysisPlansResponse> {
+        const response = await api.post<AnalysisPlansResponse>(
+            `/api/v1/analysis/${analysisId}/plans`,
+            {
+                exam_name: examName,
+                days_until_exam: daysUntilExam
+            }
+        );
+        return response.data;
+    },
 };
 
 export default analysisService;